@@ -1,7 +1,7 @@
 """CLI entrypoint for Supply Chain Intelligence Agents."""
 import argparse
+import json
 import sys
-from langchain_core.messages import HumanMessage
 
 
 def main():
@@ -10,10 +10,85 @@ def main():
     )
     parser.add_argument("query", nargs="?", help="Query to analyze (or use --interactive for chat mode)")
     parser.add_argument("--interactive", "-i", action="store_true", help="Run in interactive chat mode")
+    parser.add_argument("--monitor", action="store_true",
+                        help="Watch the dataset for new rows and run the agents when a SKU's stockout risk worsens")
+    parser.add_argument("--interval", type=float, default=None, help="Seconds between monitor ticks")
+    parser.add_argument("--lead-time-adjusted", action="store_true",
+                        help="Monitor: also flag SKUs that run out before a reorder would arrive")
+    parser.add_argument("--health", action="store_true", help="Warm up, print a health report as JSON and exit")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Print the report once it is complete instead of streaming it")
+    parser.add_argument("--batch", metavar="FILE", help="Run every query in a JSONL or CSV file concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="Batch: queries in flight at once")
+    parser.add_argument("--output", "-o", metavar="FILE", help="Batch: write JSONL results here instead of stdout")
+    parser.add_argument("--run-id", help="Checkpoint the run under this ID (default: a new random ID)")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a failed run from its last checkpoint, reusing the agents that finished")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Print a JSON summary of latency, token and cache metrics to stderr on exit")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run a warm worker that later one-shot queries are handed to over a Unix socket")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Serve: worker processes sharing the socket (0 = one per CPU core)")
+    parser.add_argument("--no-worker", action="store_true", help="Run the query here even if a warm worker is up")
     args = parser.parse_args()
 
-    from src.graph import build_workflow
-    graph = build_workflow()
+    if args.metrics:
+        import atexit
+        from src.observability.metrics import get_metrics
+        atexit.register(lambda: print(json.dumps(get_metrics().summary(), indent=2), file=sys.stderr))
+
+    if args.serve:
+        import os
+        from src.config import SERVER_PROCESSES, WORKER_SOCKET
+        from src.worker import serve
+        processes = SERVER_PROCESSES if args.processes is None else args.processes
+        serve(WORKER_SOCKET, processes=processes or os.cpu_count() or 1)
+        return
+
+    from src.registry import get_registry
+    registry = get_registry()
+
+    if args.health:
+        timings = registry.warm_up()
+        health = registry.health()
+        print(json.dumps({**health, "warm_up_seconds": timings}, indent=2))
+        sys.exit(0 if health["ok"] else 1)
+
+    if args.batch:
+        from src.config import BATCH_WORKERS
+        from src.batch import run_batch_file
+        report = run_batch_file(args.batch, output=args.output, workers=args.workers or BATCH_WORKERS)
+        print(json.dumps(report.summary(), indent=2), file=sys.stderr)
+        sys.exit(1 if report.failed else 0)
+
+    if args.monitor:
+        from src.config import MONITOR_INTERVAL
+        from src.monitor import StockoutMonitor
+        monitor = StockoutMonitor(lead_time_adjusted=args.lead_time_adjusted)
+        print("Monitoring inventory for stockout risk. Press Ctrl+C to stop.")
+        try:
+            monitor.run(interval=args.interval or MONITOR_INTERVAL)
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        return
+
+    # A warm worker (--serve) already has everything loaded
+    if (args.query or args.resume) and not (args.interactive or args.no_worker or args.metrics):
+        from src.config import WORKER_SOCKET
+        from src.worker import WorkerUnavailable, connect
+        try:
+            sock = connect(WORKER_SOCKET)
+        except WorkerUnavailable:
+            pass
+        else:
+            ok = run_on_worker(sock, args.query, stream=not args.no_stream, run_id=args.resume or args.run_id)
+            print()
+            sys.exit(0 if ok else 1)
+
+    if args.interactive:
+        registry.warm_up()
+    graph = registry.workflow()
 
     if args.interactive:
         print("Supply Chain Intelligence Agents")
@@ -29,26 +104,67 @@ def main():
                 break
             if not query:
                 continue
-            result = graph.invoke({
-                "messages": [HumanMessage(content=query)],
-                "next_agents": [],
-                "agent_outputs": {},
-                "final_report": "",
-                "guardrail_blocked": False,
-            })
-            print(f"\n{result['final_report']}\n")
-    elif args.query:
-        result = graph.invoke({
-            "messages": [HumanMessage(content=args.query)],
-            "next_agents": [],
-            "agent_outputs": {},
-            "final_report": "",
-        })
-        print(result["final_report"])
+            print()
+            run_query(graph, query, stream=not args.no_stream)
+            print("\n")
+    elif args.query or args.resume:
+        run_query(graph, args.query, stream=not args.no_stream, run_id=args.resume or args.run_id)
+        print()
     else:
         parser.print_help()
         sys.exit(1)
 
 
+def run_query(graph, query: str | None, stream: bool = True, run_id: str | None = None) -> dict:
+    """Run one query, printing the report to stdout (token by token when streaming) and progress to stderr.
+
+    With ``query=None`` the checkpointed run ``run_id`` is resumed instead. If the run fails, its
+    ID is printed so it can be resumed with ``--resume``.
+    """
+    from src.graph.checkpoint import initial_state, invoke_run, new_run_id, pending_nodes
+    run_id = run_id or new_run_id()
+    try:
+        if not stream:
+            result = invoke_run(graph, query, run_id)
+            print(result["final_report"], end="")
+            return result
+
+        from src.graph.streaming import describe, stream_workflow
+        state = initial_state(query, run_id) if query is not None else None
+        result = state or {}
+        for event in stream_workflow(graph, state, run_id=run_id):
+            if event.kind == "progress":
+                print(f"[{describe(event)}]", file=sys.stderr, flush=True)
+            elif event.kind == "token":
+                print(event.text, end="", flush=True)
+            else:
+                result = event.update
+        return result
+    except (Exception, KeyboardInterrupt) as e:
+        if pending_nodes(graph, run_id):
+            print(f"\nRun {run_id} stopped ({type(e).__name__}: {e}). "
+                  f"Resume it with: python app.py --resume {run_id}", file=sys.stderr)
+        raise
+
+
+def run_on_worker(sock, query: str | None, stream: bool = True, run_id: str | None = None) -> bool:
+    """Hand a query to the warm worker and print its output the way run_query does. Returns False on failure."""
+    from src.worker import submit
+    for event in submit(sock, query, run_id=run_id, stream=stream):
+        if event["event"] == "progress":
+            print(f"[{event['text']}]", file=sys.stderr, flush=True)
+        elif event["event"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["event"] == "done":
+            if not stream:
+                print(event["final_report"], end="")
+        elif event["resumable"]:
+            print(f"\nRun {event['run_id']} stopped ({event['error']}). "
+                  f"Resume it with: python app.py --resume {event['run_id']}", file=sys.stderr)
+        else:
+            print(f"\nRun failed: {event['error']}", file=sys.stderr)
+    return event["event"] == "done"
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,213 @@
+"""Data-layer benchmarks: the dataset loader, the aggregates sidecar and every data tool, across catalog sizes.
+
+Times each case (best of 5) and records its peak traced memory, then compares against a
+stored baseline and exits with status 1 when a case got slower or bigger than the tolerance.
+A baseline entry may carry its own "tolerance" for cases noisier than the default allows.
+
+Run from the repository root:
+    python -m benchmarks.data_layer                      # small + medium, compare to baseline
+    python -m benchmarks.data_layer --scales large       # 10k SKUs x 3 years
+    python -m benchmarks.data_layer --format shm         # as the query server's workers read it
+    python -m benchmarks.data_layer --save-baseline      # record this machine's numbers
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable
+from src.config import DATA_DIR
+from src.tools import data_loader
+from src.tools.dataset import get_store, set_backend
+from src.tools.data_loader import get_latest_inventory, get_product_list, get_supplier_summary, query_sales_data
+from src.tools.forecasting import (
+    calculate_days_of_supply, forecast_all_products, forecast_demand, scan_inventory_risk,
+)
+from src.tools.shared_dataset import SharedDataset, SharedMemoryBackend
+from src.tools.storage import COLUMNAR_FORMATS, convert_csv_to_columnar
+from src.tools.synthetic import generate_dataset, supplier_name, write_dataset
+
+# name: (skus, suppliers, days)
+SCALES = {
+    "small": (100, 5, 90),
+    "medium": (1_000, 20, 365),
+    "large": (10_000, 50, 1_095),
+}
+DEFAULT_SCALES = "small,medium"
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DATA_CACHE = os.path.join(os.path.dirname(DATA_DIR), ".cache", "benchmarks")
+
+# Differences below these are treated as noise regardless of the relative tolerance
+MIN_SECONDS_DELTA = 0.002
+MIN_MB_DELTA = 1.0
+
+
+def dataset_path(scale: str, format: str = "csv", seed: int = 0) -> str:
+    """Generate the scale's dataset once and reuse it from .cache/benchmarks."""
+    skus, suppliers, days = SCALES[scale]
+    csv_path = os.path.join(DATA_CACHE, f"{scale}-{skus}x{days}-s{seed}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {scale} dataset ({skus} SKUs x {days} days)...", file=sys.stderr)
+        write_dataset(generate_dataset(skus, suppliers, days, seed=seed), csv_path)
+    if format == "csv":
+        return csv_path
+    dest = csv_path[:-4] + f".{format}"
+    if not os.path.isdir(dest):
+        convert_csv_to_columnar(csv_path, dest, format=format)
+    return dest
+
+
+def cases(product_id: str) -> list[tuple[str, Callable]]:
+    supplier = supplier_name(0)
+    return [
+        ("query_sales_data[product]", lambda: query_sales_data.invoke({"product_id": product_id})),
+        ("query_sales_data[supplier]", lambda: query_sales_data.invoke({"supplier": supplier})),
+        ("get_product_list", lambda: get_product_list.invoke({})),
+        ("get_latest_inventory", lambda: get_latest_inventory.invoke({})),
+        ("get_supplier_summary", lambda: get_supplier_summary.invoke({})),
+        ("forecast_demand", lambda: forecast_demand.invoke({"product_id": product_id})),
+        ("forecast_all_products", lambda: forecast_all_products.invoke({})),
+        ("calculate_days_of_supply", lambda: calculate_days_of_supply.invoke({"product_id": product_id})),
+        ("scan_inventory_risk", lambda: scan_inventory_risk.invoke({})),
+    ]
+
+
+def time_best(fn, repeat: int = 5) -> float:
+    """Best per-call seconds over ``repeat`` runs, calling often enough to fill ~0.2s per run."""
+    started = time.perf_counter()
+    fn()
+    once = time.perf_counter() - started
+    number = max(1, int(0.2 / once)) if once > 0 else 1000
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def peak_mb(fn) -> float:
+    """Peak memory allocated while running ``fn`` once, in MB (pandas/numpy buffers included)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def run_scale(scale: str, format: str, repeat: int) -> dict[str, dict]:
+    if format == "shm":
+        # The query server's worker view: the CSV published once in shared memory
+        path = dataset_path(scale)
+        shared = SharedDataset(path)
+        shared.publish()
+        try:
+            data_loader._DATA_PATH, data_loader.DATA_FORMAT = path, None
+            set_backend(path, None, SharedMemoryBackend(path, shared.pointer))
+            return _run_cases(scale, format, repeat, get_store(path))
+        finally:
+            shared.close()
+    path = dataset_path(scale, format)
+    data_loader._DATA_PATH, data_loader.DATA_FORMAT = path, format
+    return _run_cases(scale, format, repeat, get_store(path, format))
+
+
+def _run_cases(scale: str, format: str, repeat: int, store) -> dict[str, dict]:
+
+    def cold_load():
+        store.invalidate()
+        return data_loader._load_df()
+
+    def cold_aggregates():
+        store.invalidate()
+        return store.aggregates()
+
+    results = {
+        "_load_df[cold]": {"seconds": time_best(cold_load, repeat=min(repeat, 3)), "peak_mb": peak_mb(cold_load)},
+        "aggregates[sidecar]": {"seconds": time_best(cold_aggregates, repeat=min(repeat, 3)),
+                                "peak_mb": peak_mb(cold_aggregates)},
+    }
+    product_id = data_loader._load_df()["product_id"].iloc[0]
+    for name, fn in cases(product_id):
+        results[name] = {"seconds": time_best(fn, repeat), "peak_mb": peak_mb(fn)}
+    return {f"{format}/{scale}/{name}": result for name, result in results.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """Cases that got slower or use more memory than the baseline allows."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        seconds, base_seconds = result["seconds"], base["seconds"]
+        if seconds > base_seconds * (1 + base.get("tolerance", tolerance)) and seconds - base_seconds > MIN_SECONDS_DELTA:
+            regressions.append(f"{key}: {seconds * 1e3:.1f} ms vs baseline {base_seconds * 1e3:.1f} ms")
+        mb, base_mb = result["peak_mb"], base["peak_mb"]
+        if mb > base_mb * (1 + memory_tolerance) and mb - base_mb > MIN_MB_DELTA:
+            regressions.append(f"{key}: peak {mb:.1f} MB vs baseline {base_mb:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Data-layer benchmarks across synthetic catalog sizes")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Comma-separated: {', '.join(SCALES)}")
+    parser.add_argument("--format", choices=("csv", *COLUMNAR_FORMATS, "shm"), default="csv",
+                        help="Storage backend (shm: the query server's shared-memory copy of the CSV)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case (best is kept)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown (0.25 = 25%%) for cases without their own in the baseline")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="Allowed relative peak memory growth")
+    args = parser.parse_args()
+    logging.getLogger("scia").setLevel(logging.ERROR)
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(f"{'case':<44}{'ms':>10}{'baseline ms':>13}{'peak MB':>10}{'baseline MB':>13}")
+    for scale in scales:
+        scale_results = run_scale(scale, args.format, args.repeat)
+        results.update(scale_results)
+        for key, result in scale_results.items():
+            base = baseline.get(key, {})
+            base_ms = f"{base['seconds'] * 1e3:.2f}" if base else "-"
+            base_mb = f"{base['peak_mb']:.1f}" if base else "-"
+            print(f"{key:<44}{result['seconds'] * 1e3:>10.2f}{base_ms:>13}{result['peak_mb']:>10.1f}{base_mb:>13}")
+
+    if args.save_baseline:
+        # Per-case tolerances are set by hand and survive re-recording
+        merged = {**baseline, **{
+            k: {**{m: round(v, 6) for m, v in r.items()},
+                **({"tolerance": baseline[k]["tolerance"]} if "tolerance" in baseline.get(k, {}) else {})}
+            for k, r in results.items()
+        }}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "processor": platform.processor() or platform.machine()},
+                "results": dict(sorted(merged.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions:", *regressions, sep="\n  ")
+        sys.exit(1)
+    if any(key in baseline for key in results):
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
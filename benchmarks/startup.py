@@ -0,0 +1,133 @@
+"""Startup benchmarks: what each entry point imports, measured with ``python -X importtime``.
+
+Every case runs its statement in a fresh interpreter and records the cumulative import time of
+the modules it loads beyond interpreter startup (best of 5). A case fails when it imports one of
+the modules it must not load (e.g. pandas from the graph builder), or when it got slower than the
+stored baseline allows; the command then exits with status 1.
+
+Run from the repository root:
+    python -m benchmarks.startup                    # compare to benchmarks/startup_baseline.json
+    python -m benchmarks.startup --save-baseline    # record this machine's numbers
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+DATA = ("pandas", "numpy")
+PROVIDERS = ("langchain_openai", "langchain_anthropic", "langchain_groq", "langchain_ollama", "duckduckgo_search")
+FRAMEWORK = ("langchain_core", "langgraph")
+
+# name: (statement, modules it must not import)
+CASES = {
+    "app": ("import app", (*FRAMEWORK, *DATA, *PROVIDERS)),
+    "config": ("import src.config", (*FRAMEWORK, *DATA, *PROVIDERS)),
+    "tools": ("import src.tools", (*FRAMEWORK, *DATA, *PROVIDERS)),
+    "graph.checkpoint": ("import src.graph.checkpoint", ("langgraph.graph", *DATA, *PROVIDERS)),
+    "graph.workflow": ("import src.graph.workflow", ("langgraph.prebuilt", *DATA, *PROVIDERS)),
+    "tools.search": ("import src.tools.search", (*DATA, *PROVIDERS)),
+    "dataset.version": ("from src.tools.data_loader import _store; _store().version", (*DATA, *PROVIDERS)),
+    "tools.all": ("from src.tools import ALL_TOOLS", PROVIDERS),
+    "worker.client": ("import src.worker", (*FRAMEWORK, *DATA, *PROVIDERS)),
+}
+
+# Differences below this are treated as noise regardless of the relative tolerance
+MIN_SECONDS_DELTA = 0.02
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_times(statement: str) -> dict[str, tuple[int, int]]:
+    """Module -> (nesting depth, cumulative microseconds) for one fresh interpreter running ``statement``."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = ((len(match.group(3)) - 1) // 2, int(match.group(2)))
+    return modules
+
+
+def measure(statement: str, startup: set[str], repeat: int) -> tuple[float, dict[str, tuple[int, int]]]:
+    """Best total seconds over ``repeat`` runs, and the modules of the last run."""
+    best = float("inf")
+    for _ in range(repeat):
+        modules = import_times(statement)
+        total = sum(us for name, (depth, us) in modules.items() if depth == 0 and name not in startup)
+        best = min(best, total / 1e6)
+    return best, modules
+
+
+def forbidden_imports(modules: dict, forbidden: tuple[str, ...]) -> list[str]:
+    return sorted(name for name in forbidden if name in modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmarks of the CLI and library entry points")
+    parser.add_argument("--cases", default=",".join(CASES), help=f"Comma-separated: {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Interpreter runs per case (best is kept)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown (0.5 = 50%%)")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest top-level imports to list per case")
+    args = parser.parse_args()
+
+    names = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in names if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    startup = set(import_times("pass"))
+    results, regressions = {}, []
+    print(f"{'case':<20}{'ms':>9}{'baseline ms':>13}  heaviest imports")
+    for name in names:
+        statement, forbidden = CASES[name]
+        seconds, modules = measure(statement, startup, args.repeat)
+        results[name] = {"seconds": seconds}
+        top = sorted(((us, mod) for mod, (depth, us) in modules.items() if depth == 0 and mod not in startup),
+                     reverse=True)[:args.top]
+        base = baseline.get(name)
+        base_ms = f"{base['seconds'] * 1e3:.1f}" if base else "-"
+        print(f"{name:<20}{seconds * 1e3:>9.1f}{base_ms:>13}  {', '.join(f'{m} {us / 1e3:.0f}' for us, m in top)}")
+
+        leaked = forbidden_imports(modules, forbidden)
+        if leaked:
+            regressions.append(f"{name}: {statement!r} imports {', '.join(leaked)}")
+        if base and seconds > base["seconds"] * (1 + args.tolerance) and seconds - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append(f"{name}: {seconds * 1e3:.1f} ms vs baseline {base['seconds'] * 1e3:.1f} ms")
+
+    if args.save_baseline:
+        merged = {**baseline, **{k: {m: round(v, 4) for m, v in r.items()} for k, r in results.items()}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "processor": platform.processor() or platform.machine()},
+                "results": dict(sorted(merged.items())),
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions:
+        print("\nRegressions:", *regressions, sep="\n  ")
+        sys.exit(1)
+    if any(name in baseline for name in results):
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
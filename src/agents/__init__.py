@@ -1,3 +1,20 @@
-from src.agents.demand_analyst import create_demand_analyst
-from src.agents.inventory_monitor import create_inventory_monitor
-from src.agents.supplier_analyst import create_supplier_analyst
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.agents.demand_analyst import create_demand_analyst
+    from src.agents.inventory_monitor import create_inventory_monitor
+    from src.agents.supplier_analyst import create_supplier_analyst
+
+# Agent factories are imported on first use: each one pulls in LangGraph's prebuilt agents and the tools
+_FACTORIES = {
+    "create_demand_analyst": "src.agents.demand_analyst",
+    "create_inventory_monitor": "src.agents.inventory_monitor",
+    "create_supplier_analyst": "src.agents.supplier_analyst",
+}
+
+
+def __getattr__(name: str):
+    if name not in _FACTORIES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(_FACTORIES[name]), name)
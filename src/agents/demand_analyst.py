@@ -1,5 +1,6 @@
 from langgraph.prebuilt import create_react_agent
-from src.config import get_llm
+from src.agents.prefetched import create_prefetched_agent
+from src.registry import get_shared_llm
 from src.tools import DEMAND_TOOLS
 
 SYSTEM_PROMPT = """You are a Demand Analyst agent for a CPG supply chain team.
@@ -11,9 +12,16 @@ Your role:
 - Provide actionable insights about future demand
 
 Always use tools to query actual data before making conclusions.
+For questions covering many or all products, use forecast_all_products instead of calling forecast_demand per product.
 Structure your response with clear findings and a brief recommendation."""
 
+# Core data views (tool, arguments): put in the prompt up front in prefetched mode (AGENT_MODE), and
+# fetched in the background while the query is routed (SPECULATIVE_PREFETCH)
+CORE_VIEWS = [("get_product_list", {}), ("forecast_all_products", {})]
 
-def create_demand_analyst():
-    llm = get_llm()
-    return create_react_agent(llm, DEMAND_TOOLS, prompt=SYSTEM_PROMPT)
+
+def create_demand_analyst(mode: str = "react"):
+    llm = get_shared_llm()
+    if mode == "prefetched":
+        return create_prefetched_agent(llm, DEMAND_TOOLS, SYSTEM_PROMPT, CORE_VIEWS, name="demand_analyst")
+    return create_react_agent(llm, DEMAND_TOOLS, prompt=SYSTEM_PROMPT, name="demand_analyst")
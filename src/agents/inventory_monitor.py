@@ -1,5 +1,6 @@
 from langgraph.prebuilt import create_react_agent
-from src.config import get_llm
+from src.agents.prefetched import create_prefetched_agent
+from src.registry import get_shared_llm
 from src.tools import INVENTORY_TOOLS
 
 SYSTEM_PROMPT = """You are an Inventory Monitor agent for a CPG supply chain team.
@@ -12,9 +13,16 @@ Your role:
 - Recommend reorder actions with urgency levels
 
 Always use tools to check actual inventory data before making assessments.
+To find at-risk products across the catalog, use scan_inventory_risk instead of calling calculate_days_of_supply per product.
 Prioritize alerts by risk level: critical first, then warning."""
 
+# Core data views (tool, arguments): put in the prompt up front in prefetched mode (AGENT_MODE), and
+# fetched in the background while the query is routed (SPECULATIVE_PREFETCH)
+CORE_VIEWS = [("get_latest_inventory", {}), ("scan_inventory_risk", {})]
 
-def create_inventory_monitor():
-    llm = get_llm()
-    return create_react_agent(llm, INVENTORY_TOOLS, prompt=SYSTEM_PROMPT)
+
+def create_inventory_monitor(mode: str = "react"):
+    llm = get_shared_llm()
+    if mode == "prefetched":
+        return create_prefetched_agent(llm, INVENTORY_TOOLS, SYSTEM_PROMPT, CORE_VIEWS, name="inventory_monitor")
+    return create_react_agent(llm, INVENTORY_TOOLS, prompt=SYSTEM_PROMPT, name="inventory_monitor")
@@ -0,0 +1,49 @@
+"""Prefetched-context agents (AGENT_MODE=prefetched): core data in the prompt, tools for drill-downs.
+
+A ReAct agent spends a full LLM round-trip deciding on each tool call before it can answer. Here
+a specialist's ``CORE_VIEWS`` are computed before its first LLM call and put in its system
+prompt. The views are the catalog-wide tools, which are vectorized over all products and read
+the cached dataset and its aggregates. They run through the run's tool result table, so agents
+in the same run, and speculative prefetches, share them. Most questions are then answered in one
+call. The agent keeps its tools for follow-ups the views do not cover, such as one product's
+sales history or a web search.
+"""
+from langchain_core.messages import SystemMessage
+from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+CONTEXT_PROMPT = """The data below was fetched for this query before you were called. Answer from it directly.
+Only call a tool for details it does not contain (e.g. one product's daily history or forecast, a later page, market news).
+
+{context}"""
+
+
+class PrefetchedState(AgentState):
+    context: str
+
+
+def core_context(views: list[tuple[str, dict]]) -> str:
+    """The views' tool outputs, one markdown section per call."""
+    from src.tools import ALL_TOOLS
+
+    tools = {t.name: t for t in ALL_TOOLS}
+    sections = []
+    for name, arguments in views:
+        call = ", ".join(f"{key}={value!r}" for key, value in arguments.items())
+        sections.append(f"### {name}({call})\n{tools[name].invoke(arguments)}")
+    return "\n\n".join(sections)
+
+
+def create_prefetched_agent(llm, tools: list, system_prompt: str, views: list[tuple[str, dict]], name: str):
+    """A tool-calling agent whose system prompt carries ``views``, computed once per invocation."""
+
+    def load_context(state: PrefetchedState) -> dict:
+        # Runs before every LLM turn; only the first one computes the views
+        return {} if state.get("context") else {"context": core_context(views)}
+
+    def prompt(state: PrefetchedState) -> list:
+        content = f"{system_prompt}\n\n{CONTEXT_PROMPT.format(context=state['context'])}"
+        return [SystemMessage(content=content), *state["messages"]]
+
+    return create_react_agent(llm, tools, prompt=prompt, pre_model_hook=load_context,
+                              state_schema=PrefetchedState, name=name)
@@ -1,5 +1,6 @@
 from langgraph.prebuilt import create_react_agent
-from src.config import get_llm
+from src.agents.prefetched import create_prefetched_agent
+from src.registry import get_shared_llm
 from src.tools import SUPPLIER_TOOLS
 
 SYSTEM_PROMPT = """You are a Supplier Analyst agent for a CPG supply chain team.
@@ -13,7 +14,13 @@ Your role:
 Always use tools to pull supplier data and search for current market context.
 Provide a balanced assessment with both data-driven metrics and market context."""
 
+# Core data views (tool, arguments): put in the prompt up front in prefetched mode (AGENT_MODE), and
+# fetched in the background while the query is routed (SPECULATIVE_PREFETCH)
+CORE_VIEWS = [("get_supplier_summary", {})]
 
-def create_supplier_analyst():
-    llm = get_llm()
-    return create_react_agent(llm, SUPPLIER_TOOLS, prompt=SYSTEM_PROMPT)
+
+def create_supplier_analyst(mode: str = "react"):
+    llm = get_shared_llm()
+    if mode == "prefetched":
+        return create_prefetched_agent(llm, SUPPLIER_TOOLS, SYSTEM_PROMPT, CORE_VIEWS, name="supplier_analyst")
+    return create_react_agent(llm, SUPPLIER_TOOLS, prompt=SYSTEM_PROMPT, name="supplier_analyst")
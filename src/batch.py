@@ -0,0 +1,183 @@
+"""Batch mode: run many queries concurrently through one compiled workflow."""
+import asyncio
+import csv
+import itertools
+import json
+import math
+import sys
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Iterator, TextIO
+from src.graph.checkpoint import ainvoke_run
+from src.guardrails import check_inputs
+
+logger = logging.getLogger("scia")
+
+# Queries screened by the input guardrail at a time before they are queued
+SCREEN_CHUNK = 256
+
+
+@dataclass
+class BatchQuery:
+    id: str
+    query: str | None
+    error: str | None = None  # the input line could not be read as a query
+
+
+@dataclass
+class BatchReport:
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    wall_seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "throughput_qps": round(self.throughput, 3),
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p95": round(percentile(self.latencies, 95), 3),
+            "latency_p99": round(percentile(self.latencies, 99), 3),
+        }
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def read_queries(path: str) -> Iterator[BatchQuery]:
+    """Read queries from a JSONL or CSV file.
+
+    JSONL lines are either a JSON string or an object with a ``query`` field (and an optional
+    ``id``). CSV files use their ``query`` and ``id`` columns, or the first column without a header.
+    Queries without an id are numbered by their position in the file. A JSONL line that is not
+    valid JSON or has no ``query`` string is yielded with ``error`` set, so the batch reports it
+    and goes on with the other lines.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        if not rows:
+            return
+        header = [h.strip().lower() for h in rows[0]]
+        if "query" in header:
+            q_col, id_col = header.index("query"), header.index("id") if "id" in header else None
+            rows = rows[1:]
+        else:
+            q_col, id_col = 0, None
+        for i, row in enumerate(rows, start=1):
+            if len(row) > q_col and row[q_col].strip():
+                yield BatchQuery(row[id_col] if id_col is not None else str(i), row[q_col].strip())
+        return
+    with open(path, encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield BatchQuery(str(i), None, error=f"line {i}: invalid JSON: {e}")
+                continue
+            if isinstance(item, str):
+                yield BatchQuery(str(i), item)
+            elif isinstance(item, dict) and isinstance(item.get("query"), str):
+                yield BatchQuery(str(item.get("id", i)), item["query"])
+            else:
+                item_id = item.get("id", i) if isinstance(item, dict) else i
+                yield BatchQuery(str(item_id), None,
+                                 error=f'line {i}: expected a string or an object with a "query" string')
+
+
+async def run_batch(queries, graph, out: TextIO, workers: int = 4) -> BatchReport:
+    """Run queries through the graph with at most ``workers`` in flight.
+
+    Queries are screened by the input guardrail in chunks first; blocked ones are answered
+    without running the graph, and unreadable input lines are reported as errors. Each result
+    is written to ``out`` as one JSON line as soon as it completes.
+    """
+    report = BatchReport()
+    pending: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+    def write(record: dict) -> None:
+        report.total += 1
+        if not record["blocked"] and record["query"] is not None:
+            report.latencies.append(record["latency"])
+        if record["error"]:
+            report.failed += 1
+        else:
+            report.succeeded += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    async def worker():
+        while True:
+            item = await pending.get()
+            if item is None:
+                return
+            write(await _run_one(graph, item))
+
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+    queries = iter(queries)
+    while chunk := list(itertools.islice(queries, SCREEN_CHUNK)):
+        for item in chunk:
+            if item.error:
+                logger.warning(f"[BATCH] skipping query {item.id}: {item.error}")
+                write({"id": item.id, "query": None, "final_report": None, "error": item.error,
+                       "agents": [], "blocked": False, "latency": 0.0})
+        chunk = [item for item in chunk if not item.error]
+        for item, verdict in zip(chunk, check_inputs([item.query for item in chunk])):
+            if verdict.passed:
+                await pending.put(item)
+            else:
+                write({"id": item.id, "query": item.query, "final_report": verdict.message, "error": None,
+                       "agents": [], "blocked": True, "latency": 0.0})
+    for _ in tasks:
+        await pending.put(None)
+    await asyncio.gather(*tasks)
+    report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+async def _run_one(graph, item: BatchQuery) -> dict:
+    started = time.perf_counter()
+    record = {"id": item.id, "query": item.query, "final_report": None, "error": None, "blocked": False}
+    try:
+        result = await ainvoke_run(graph, item.query)
+        record["final_report"] = result["final_report"]
+        record["agents"] = sorted(result.get("agent_outputs", {}))
+        record["blocked"] = result.get("guardrail_blocked", False)
+    except Exception as e:
+        logger.warning(f"[BATCH] query {item.id} failed: {e}")
+        record["error"] = str(e)
+    record["latency"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_batch_file(path: str, output: str | None = None, workers: int = 4) -> BatchReport:
+    """Run every query in ``path`` and stream results to ``output`` (stdout if omitted)."""
+    from src.registry import get_registry
+    registry = get_registry()
+    registry.warm_up()
+    graph = registry.workflow()
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    try:
+        return asyncio.run(run_batch(read_queries(path), graph, out, workers))
+    finally:
+        if output:
+            out.close()
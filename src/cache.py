@@ -0,0 +1,165 @@
+"""Disk-backed caches: a SQLite key/value store and the LLM response cache built on it."""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+import warnings
+from typing import Callable
+from langchain_core.caches import BaseCache
+
+logger = logging.getLogger("scia")
+
+
+class SQLiteStore:
+    """Key/value table in a SQLite file with TTL expiry, LRU eviction and a version tag.
+
+    An entry written under a different ``version`` than the one looked up is treated as
+    stale and removed, which is how cached values are invalidated when the dataset changes.
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 5000, ttl_seconds: float = 86400):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, version TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+
+    def get(self, key: str, version: str = "") -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, version, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, stored_version, created_at = row
+            if stored_version != version or (self.ttl_seconds and now - created_at > self.ttl_seconds):
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str, version: str = "") -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, version, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, version, now, now),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+_VOLATILE_KWARGS = ("response_metadata", "usage_metadata", "id")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Canonical form of a serialized chat prompt.
+
+    Drops per-call metadata and collapses whitespace, so prompts that differ only in spacing
+    share an entry. Case is kept: product IDs are case-sensitive in the data tools.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return " ".join(prompt.split())
+    for message in messages if isinstance(messages, list) else []:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        for name in _VOLATILE_KWARGS:
+            kwargs.pop(name, None)
+        content = kwargs.get("content")
+        if isinstance(content, str):
+            kwargs["content"] = " ".join(content.split())
+    return json.dumps(messages, sort_keys=True, separators=(",", ":"))
+
+
+def _dataset_version() -> str:
+    from src.tools.data_loader import _store
+    return str(_store().version)
+
+
+class LLMResponseCache(BaseCache):
+    """LangChain cache that persists chat model generations in SQLite.
+
+    Entries are keyed by provider, the model's llm_string (model, temperature, bound tools)
+    and the normalized messages, and are tied to the dataset version at write time.
+    """
+
+    def __init__(self, store: SQLiteStore, provider: str, version_fn: Callable[[], str] = _dataset_version):
+        self.store = store
+        self.provider = provider
+        self.version_fn = version_fn
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        raw = "\x00".join((self.provider, llm_string, normalize_prompt(prompt)))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        value = self.store.get(self._key(prompt, llm_string), self.version_fn())
+        if value is None:
+            return None
+        from langchain_core.load import loads
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            generations = loads(value)
+        for generation in generations:
+            # Lets callbacks tell replayed responses from provider calls
+            generation.generation_info = {**(generation.generation_info or {}), "cache_hit": True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        from langchain_core.load import dumps
+        self.store.set(self._key(prompt, llm_string), dumps(return_val), self.version_fn())
+
+    def clear(self, **kwargs) -> None:
+        self.store.clear()
+
+
+_llm_cache: LLMResponseCache | None = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide LLM response cache configured from environment variables."""
+    global _llm_cache
+    if _llm_cache is None:
+        from src.config import LLM_PROVIDER, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                store = SQLiteStore(LLM_CACHE_PATH, "llm_responses", LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL)
+                _llm_cache = LLMResponseCache(store, LLM_PROVIDER)
+                logger.info(f"LLM response cache at {LLM_CACHE_PATH} ({len(store)} entries)")
+    return _llm_cache
@@ -1,6 +1,9 @@
 import os
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from langchain_core.language_models.chat_models import BaseChatModel
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
 
 load_dotenv()
 
@@ -12,27 +15,124 @@ ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+# Dataset location: a CSV file, or a Parquet / Arrow IPC dataset (file or partitioned directory)
+DATA_PATH = os.getenv("DATA_PATH", os.path.join(DATA_DIR, "sample_data.csv"))
+DATA_FORMAT = os.getenv("DATA_FORMAT", "") or None  # "csv", "parquet" or "ipc"; inferred from the path if unset
+# Keep per-product/per-supplier aggregates in a <dataset>.aggregates.json file next to the data,
+# rebuilt when the data changes, so inventory tools answer without reading the history
+AGGREGATES_SIDECAR = os.getenv("AGGREGATES_SIDECAR", "true").lower() == "true"
+
+# Persistent LLM response cache (SQLite), invalidated when the dataset changes
+LLM_CACHE = os.getenv("LLM_CACHE", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(DATA_DIR), ".cache", "llm_cache.sqlite"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds; 0 disables expiry
+
+# Checkpoint every graph step under the run ID so failed runs can resume (SQLite when
+# langgraph-checkpoint-sqlite is installed, in memory otherwise)
+CHECKPOINTS = os.getenv("CHECKPOINTS", "true").lower() == "true"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(os.path.dirname(DATA_DIR), ".cache", "checkpoints.sqlite"))
+
+# Async execution: max concurrent LLM-bound graph nodes per provider on one event loop
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "15"))  # seconds; deadline for one web_search call
+
+# Web search: "duckduckgo", or "http" for a SearxNG-style JSON endpoint at SEARCH_URL (e.g. a local stub)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "duckduckgo")
+SEARCH_URL = os.getenv("SEARCH_URL", "http://127.0.0.1:8888/search")
+SEARCH_MAX_PARALLEL = int(os.getenv("SEARCH_MAX_PARALLEL", "4"))  # queries in flight per web_search call
+# Disk cache of search results keyed by normalized query
+SEARCH_CACHE = os.getenv("SEARCH_CACHE", "true").lower() == "true"
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(os.path.dirname(DATA_DIR), ".cache", "search_cache.sqlite"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "21600"))  # seconds; 0 disables expiry
+
+# Approximate token budget for one data tool output; larger results are summarized and paged
+TOOL_OUTPUT_TOKEN_BUDGET = int(os.getenv("TOOL_OUTPUT_TOKEN_BUDGET", "2000"))
+
+# Fast-path router: route confident queries locally and only ask the LLM router when unsure
+FAST_ROUTER = os.getenv("FAST_ROUTER", "true").lower() == "true"
+FAST_ROUTER_THRESHOLD = float(os.getenv("FAST_ROUTER_THRESHOLD", "0.75"))
+ROUTER_MODEL_PATH = os.getenv("ROUTER_MODEL_PATH", os.path.join(DATA_DIR, "router_model.json"))
+
+# Synthesis: with FAST_SYNTHESIS a single agent's report is returned as is, without the
+# synthesizer LLM call; SYNTHESIS_MODEL runs multi-agent synthesis on another (e.g. smaller)
+# model of the same provider (empty = the provider's model above)
+FAST_SYNTHESIS = os.getenv("FAST_SYNTHESIS", "false").lower() == "true"
+SYNTHESIS_MODEL = os.getenv("SYNTHESIS_MODEL", "")
+
+# Speculative prefetch: once the input guardrail passes, the core data tools of the agents the
+# routing rules score at least SPECULATION_MIN_SCORE for (0 = every agent) start in the
+# background, overlapping the router and the agents' first LLM turn
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "false").lower() == "true"
+SPECULATION_MIN_SCORE = float(os.getenv("SPECULATION_MIN_SCORE", "1.5"))
+
+# Stockout monitor (app.py --monitor)
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", "60"))  # seconds between ticks
+MONITOR_ALERT_LEVEL = os.getenv("MONITOR_ALERT_LEVEL", "warning")  # "warning" or "critical"
+
+# Batch mode: queries in flight at once
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+
+# Warm worker (app.py --serve): one-shot CLI queries are handed to it over this Unix socket
+WORKER_SOCKET = os.getenv("WORKER_SOCKET", os.path.join(os.path.dirname(DATA_DIR), ".cache", "worker.sock"))
+# Worker processes behind that socket (0 = one per CPU core); with more than one the dataset is
+# published once in shared memory and re-published when the source changes, checked this often
+SERVER_PROCESSES = int(os.getenv("SERVER_PROCESSES", "1"))
+SERVER_DATA_POLL = float(os.getenv("SERVER_DATA_POLL", "5"))  # seconds
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "4"))  # queries each worker process runs at once
 
 # Detect if running on Streamlit Cloud (sets this env var automatically)
 IS_STREAMLIT_CLOUD = os.path.exists("/mount/src")
 IS_FREE_TIER = IS_STREAMLIT_CLOUD and LLM_PROVIDER == "groq"
 
+# Client-side rate limits shared by all LLM calls to the provider (0 = unlimited); the Groq
+# free tier defaults to its published limits
+LLM_RPM = float(os.getenv("LLM_RPM", "30" if IS_FREE_TIER else "0"))
+LLM_TPM = float(os.getenv("LLM_TPM", "6000" if IS_FREE_TIER else "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))  # retries of a throttled node
+# Run selected agents one after another instead of fanning out in parallel
+SEQUENTIAL_AGENTS = os.getenv("SEQUENTIAL_AGENTS", "false").lower() == "true"
+# "react": agents call tools turn by turn; "prefetched": each agent's core data views are computed
+# up front and put in its prompt, so most queries take one LLM call (tools remain for drill-downs)
+AGENT_MODE = os.getenv("AGENT_MODE", "react")
+
+# Metrics export: Prometheus text file rewritten after every run (JSON summary if it ends in
+# .json), and a local /metrics endpoint (0 = disabled)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+
+def get_llm(temperature: float = 0.0, model: str | None = None) -> "BaseChatModel":
+    """Factory function that returns a chat model based on LLM_PROVIDER env var.
+
+    ``model`` overrides the provider's configured model (e.g. SYNTHESIS_MODEL).
+
+    When LLM_CACHE is enabled the model reads and writes the persistent response cache.
+    All models for the provider share one client-side rate limiter.
+    """
+    cache = None
+    if LLM_CACHE:
+        from src.cache import get_llm_cache
+        cache = get_llm_cache()
+    from src.ratelimit import UsageCallback, get_rate_limiter
+    limiter = get_rate_limiter(LLM_PROVIDER)
+    limits = {"rate_limiter": limiter, "callbacks": [UsageCallback(limiter)]}
 
-def get_llm(temperature: float = 0.0) -> BaseChatModel:
-    """Factory function that returns a chat model based on LLM_PROVIDER env var."""
     if LLM_PROVIDER == "openai":
         from langchain_openai import ChatOpenAI
-        return ChatOpenAI(model=OPENAI_MODEL, temperature=temperature)
+        return ChatOpenAI(model=model or OPENAI_MODEL, temperature=temperature, cache=cache, **limits)
     elif LLM_PROVIDER == "anthropic":
         from langchain_anthropic import ChatAnthropic
-        return ChatAnthropic(model=ANTHROPIC_MODEL, temperature=temperature)
+        return ChatAnthropic(model=model or ANTHROPIC_MODEL, temperature=temperature, cache=cache, **limits)
     elif LLM_PROVIDER == "groq":
         from langchain_groq import ChatGroq
-        return ChatGroq(model=GROQ_MODEL, temperature=temperature)
+        return ChatGroq(model=model or GROQ_MODEL, temperature=temperature, cache=cache, **limits)
     else:
         from langchain_ollama import ChatOllama
         return ChatOllama(
-            model=OLLAMA_MODEL,
+            model=model or OLLAMA_MODEL,
             base_url=OLLAMA_BASE_URL,
             temperature=temperature,
+            cache=cache,
+            **limits,
         )
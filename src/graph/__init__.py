@@ -1 +1,12 @@
-from src.graph.workflow import build_workflow
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.graph.workflow import build_workflow
+
+
+def __getattr__(name: str):
+    # Imported on first use, so src.graph.checkpoint and friends load without LangGraph's graph builder
+    if name == "build_workflow":
+        from src.graph.workflow import build_workflow
+        return build_workflow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,147 @@
+"""Checkpointing of workflow runs, so a failed or interrupted run can resume where it stopped."""
+import asyncio
+import threading
+import uuid
+import logging
+from langchain_core.messages import HumanMessage
+
+logger = logging.getLogger("scia")
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def _sqlite_saver(path: str):
+    """SqliteSaver whose async methods run the sync ones in a worker thread.
+
+    The stock SqliteSaver only implements the sync interface; this keeps ``ainvoke`` and batch
+    mode working on the same database file.
+    """
+    import os
+    import sqlite3
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    class ThreadedSqliteSaver(SqliteSaver):
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        async def adelete_thread(self, thread_id):
+            return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return ThreadedSqliteSaver(conn)
+
+
+def get_checkpointer():
+    """Process-wide checkpoint saver, or None when CHECKPOINTS is disabled.
+
+    Checkpoints go to a SQLite file when langgraph-checkpoint-sqlite is installed
+    (``pip install -e ".[checkpoint]"``) and are kept in memory otherwise, which still lets a
+    failed run resume within the same process.
+    """
+    global _checkpointer
+    from src.config import CHECKPOINTS, CHECKPOINT_PATH
+    if not CHECKPOINTS:
+        return None
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                try:
+                    _checkpointer = _sqlite_saver(CHECKPOINT_PATH)
+                    logger.info(f"[CHECKPOINT] saving run checkpoints to {CHECKPOINT_PATH}")
+                except ImportError:
+                    from langgraph.checkpoint.memory import InMemorySaver
+                    _checkpointer = InMemorySaver()
+                    logger.info("[CHECKPOINT] langgraph-checkpoint-sqlite not installed; keeping checkpoints in memory")
+    return _checkpointer
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+
+def run_config(run_id: str) -> dict:
+    """Graph config for a run: its checkpoints are stored under the run ID."""
+    return {"configurable": {"thread_id": run_id}}
+
+
+def initial_state(query: str, run_id: str) -> dict:
+    return {
+        "messages": [HumanMessage(content=query)],
+        "next_agents": [],
+        "agent_outputs": {},
+        "final_report": "",
+        "guardrail_blocked": False,
+        "run_id": run_id,
+    }
+
+
+def pending_nodes(graph, run_id: str) -> tuple[str, ...] | None:
+    """Nodes a checkpointed run still has to execute: None if the run is unknown, () if it finished."""
+    if getattr(graph, "checkpointer", None) is None:
+        return None
+    snapshot = graph.get_state(run_config(run_id))
+    if not snapshot.values:
+        return None
+    return tuple(snapshot.next)
+
+
+def release_run(run_id: str) -> None:
+    """Drop a finished run's checkpoints; only failed runs are kept for resuming."""
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        checkpointer.delete_thread(run_id)
+
+
+async def arelease_run(run_id: str) -> None:
+    checkpointer = get_checkpointer()
+    if checkpointer is not None:
+        await checkpointer.adelete_thread(run_id)
+
+
+def invoke_run(graph, query: str | None, run_id: str | None = None) -> dict:
+    """Run a query under ``run_id``, or resume that run when ``query`` is None.
+
+    Resuming re-executes only the nodes that had not completed, so finished agents' outputs
+    are reused. Checkpoints are deleted once the run completes.
+    """
+    run_id = run_id or new_run_id()
+    if query is None:
+        saved_state(graph, run_id)
+    state = initial_state(query, run_id) if query is not None else None
+    result = graph.invoke(state, run_config(run_id))
+    release_run(run_id)
+    return result
+
+
+async def ainvoke_run(graph, query: str | None, run_id: str | None = None) -> dict:
+    """Async counterpart of invoke_run."""
+    run_id = run_id or new_run_id()
+    if query is None:
+        saved_state(graph, run_id)
+    state = initial_state(query, run_id) if query is not None else None
+    result = await graph.ainvoke(state, run_config(run_id))
+    await arelease_run(run_id)
+    return result
+
+
+def saved_state(graph, run_id: str) -> dict:
+    """State at the run's last checkpoint, before resuming it. Raises ValueError for unknown runs."""
+    pending = pending_nodes(graph, run_id)
+    if pending is None:
+        raise ValueError(f"No checkpoint found for run {run_id}")
+    logger.info(f"[CHECKPOINT] resuming run {run_id} at {', '.join(pending) or 'end'}")
+    return dict(graph.get_state(run_config(run_id)).values)
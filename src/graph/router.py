@@ -0,0 +1,248 @@
+"""Local query classifier that routes unambiguous queries without an LLM call."""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("scia")
+
+AGENT_NAMES = ["demand_analyst", "inventory_monitor", "supplier_analyst"]
+
+# (pattern, weight) per agent. Weights around 2 are strong signals on their own.
+ROUTING_RULES: dict[str, list[tuple[str, float]]] = {
+    "inventory_monitor": [
+        (r"\bstock\s*-?\s*outs?\b", 2.5),
+        (r"\binventory\b", 2.0),
+        (r"\bre-?order(s|ing)?\b", 2.0),
+        (r"\bdays?\s+of\s+supply\b", 2.5),
+        (r"\bstock(\s+levels?)?\b", 1.5),
+        (r"\b(at\s+risk|running\s+(out|low)|run\s+out)\b", 1.5),
+        (r"\b(shortages?|surplus|overstock(ed)?|warehouse)\b", 1.5),
+        (r"\brisks?\b", 0.75),
+    ],
+    "demand_analyst": [
+        (r"\bdemand\b", 2.5),
+        (r"\bforecast(s|ing)?\b", 2.5),
+        (r"\bseason(al|ality)?\b", 2.0),
+        (r"\bsales\b", 1.5),
+        (r"\b(trends?|trending)\b", 1.5),
+        (r"\b(selling|sold|sell|spikes?|decline|declining|growth)\b", 1.0),
+    ],
+    "supplier_analyst": [
+        (r"\bsuppliers?\b", 2.5),
+        (r"\b(vendors?|procurement|sourcing)\b", 2.0),
+        (r"\blead\s+times?\b", 2.0),
+        (r"\b(unit\s+)?costs?\b|\bpric(e|es|ing)\b", 1.5),
+        (r"\b(market|disruptions?|news|diversif(y|ication))\b", 1.5),
+        (r"\breliab(le|ility)\b", 1.0),
+    ],
+}
+
+# Queries asking for everything go to every agent
+ALL_AGENTS_PATTERNS = [
+    r"\bfull\s+(supply\s+chain\s+)?(report|analysis|review|overview)\b",
+    r"\b(complete|comprehensive|overall|end-to-end)\s+(supply\s+chain\s+)?(report|analysis|review|overview)\b",
+    r"\bexecutive\s+summary\b",
+    r"\beverything\b",
+]
+
+# Example queries used to train the optional TF-IDF model
+ROUTER_EXAMPLES = [
+    ("What products are at risk?", ["inventory_monitor"]),
+    ("What products are at risk of stockout?", ["inventory_monitor"]),
+    ("Which items need to be reordered?", ["inventory_monitor"]),
+    ("Analyze demand for P001", ["demand_analyst"]),
+    ("Analyze demand trends for all products", ["demand_analyst"]),
+    ("Forecast next week's sales", ["demand_analyst"]),
+    ("How are our suppliers doing?", ["supplier_analyst"]),
+    ("How are our suppliers performing?", ["supplier_analyst"]),
+    ("Compare lead times and costs across vendors", ["supplier_analyst"]),
+    ("Full supply chain report", AGENT_NAMES),
+    ("Give me a full supply chain report", AGENT_NAMES),
+]
+
+
+@dataclass
+class RouteDecision:
+    agents: list[str]
+    confidence: float
+    source: str
+    scores: dict[str, float] = field(default_factory=dict)
+
+
+class RuleClassifier:
+    """Weighted regex rules compiled once per process."""
+
+    def __init__(self, rules=ROUTING_RULES, all_patterns=ALL_AGENTS_PATTERNS, strong_score: float = 2.0,
+                 select_ratio: float = 0.5):
+        self.rules = {agent: [(re.compile(p), w) for p, w in patterns] for agent, patterns in rules.items()}
+        self.all_agents = re.compile("|".join(f"(?:{p})" for p in all_patterns))
+        self.strong_score = strong_score
+        self.select_ratio = select_ratio
+
+    def classify(self, query: str) -> RouteDecision:
+        text = query.lower()
+        if self.all_agents.search(text):
+            return RouteDecision(list(AGENT_NAMES), 1.0, "rules")
+        scores = {
+            agent: sum(weight for pattern, weight in patterns if pattern.search(text))
+            for agent, patterns in self.rules.items()
+        }
+        top = max(scores.values())
+        if top <= 0:
+            return RouteDecision([], 0.0, "rules", scores)
+        selected = [a for a in AGENT_NAMES if scores[a] >= self.select_ratio * top]
+        weakest_selected = min(scores[a] for a in selected)
+        strongest_other = max((scores[a] for a in AGENT_NAMES if a not in selected), default=0.0)
+        # Confident when every selected agent has a strong signal and the rest are clearly weaker
+        strength = min(1.0, weakest_selected / self.strong_score)
+        separation = 1.0 - strongest_other / weakest_selected
+        return RouteDecision(selected, round(strength * separation, 3), "rules", scores)
+
+
+def _tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+class TfidfRouter:
+    """Nearest-example TF-IDF classifier, small enough to keep as a JSON file."""
+
+    def __init__(self, idf: dict[str, float], examples: list[tuple[dict[str, float], list[str]]]):
+        self.idf = idf
+        self.examples = examples
+
+    def _vector(self, text: str) -> dict[str, float]:
+        counts = Counter(t for t in _tokenize(text) if t in self.idf)
+        vec = {t: c * self.idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    @classmethod
+    def train(cls, examples: list[tuple[str, list[str]]]) -> TfidfRouter:
+        docs = [set(_tokenize(q)) for q, _ in examples]
+        df = Counter(t for doc in docs for t in doc)
+        n = len(docs)
+        idf = {t: math.log((1 + n) / (1 + c)) + 1.0 for t, c in df.items()}
+        router = cls(idf, [])
+        router.examples = [(router._vector(q), list(agents)) for q, agents in examples]
+        return router
+
+    def classify(self, query: str) -> RouteDecision:
+        vec = self._vector(query)
+        best, best_agents = 0.0, []
+        for example, agents in self.examples:
+            sim = sum(w * example.get(t, 0.0) for t, w in vec.items())
+            if sim > best:
+                best, best_agents = sim, agents
+        return RouteDecision(list(best_agents), round(best, 3), "tfidf")
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"idf": self.idf, "examples": [[vec, agents] for vec, agents in self.examples]}, f)
+
+    @classmethod
+    def load(cls, path: str) -> TfidfRouter:
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["idf"], [(vec, agents) for vec, agents in data["examples"]])
+
+
+class RouterStats:
+    """Counts how many routing decisions skipped the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast_hits = 0
+        self.llm_fallbacks = 0
+
+    def record(self, fast: bool) -> None:
+        with self._lock:
+            if fast:
+                self.fast_hits += 1
+            else:
+                self.llm_fallbacks += 1
+
+    @property
+    def total(self) -> int:
+        return self.fast_hits + self.llm_fallbacks
+
+    @property
+    def hit_rate(self) -> float:
+        return self.fast_hits / self.total if self.total else 0.0
+
+    def as_dict(self) -> dict:
+        return {"fast_hits": self.fast_hits, "llm_fallbacks": self.llm_fallbacks, "hit_rate": round(self.hit_rate, 3)}
+
+
+class FastRouter:
+    """Rule classifier, optionally backed by a TF-IDF model, with an LLM fallback threshold."""
+
+    def __init__(self, threshold: float, model_path: str | None = None):
+        self.threshold = threshold
+        self.rules = RuleClassifier()
+        self.tfidf = None
+        if model_path and os.path.exists(model_path):
+            self.tfidf = TfidfRouter.load(model_path)
+        self.stats = RouterStats()
+
+    def classify(self, query: str) -> RouteDecision:
+        decision = self.rules.classify(query)
+        if decision.confidence < self.threshold and self.tfidf is not None:
+            alternative = self.tfidf.classify(query)
+            if alternative.confidence > decision.confidence:
+                decision = alternative
+        return decision
+
+    def route(self, query: str) -> list[str] | None:
+        """Agents for a confident decision, or None when the LLM router should decide."""
+        decision = self.classify(query)
+        fast = bool(decision.agents) and decision.confidence >= self.threshold
+        self.stats.record(fast)
+        path = "fast path" if fast else "LLM fallback"
+        logger.info(f"[ROUTER] {path}: {decision.agents} (confidence={decision.confidence}, "
+                    f"source={decision.source}); hit rate {self.stats.fast_hits}/{self.stats.total}")
+        return decision.agents if fast else None
+
+
+_router: FastRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_fast_router() -> FastRouter:
+    global _router
+    if _router is None:
+        from src.config import FAST_ROUTER_THRESHOLD, ROUTER_MODEL_PATH
+        with _router_lock:
+            if _router is None:
+                _router = FastRouter(FAST_ROUTER_THRESHOLD, ROUTER_MODEL_PATH)
+    return _router
+
+
+def get_router_stats() -> dict:
+    return get_fast_router().stats.as_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the TF-IDF fast-path router")
+    parser.add_argument("examples", nargs="?", help='JSONL file of {"query": ..., "agents": [...]} (default: built-in)')
+    parser.add_argument("--output", "-o", default=None, help="Model path (default: ROUTER_MODEL_PATH)")
+    args = parser.parse_args()
+    from src.config import ROUTER_MODEL_PATH
+
+    examples = list(ROUTER_EXAMPLES)
+    if args.examples:
+        with open(args.examples) as f:
+            examples = [(row["query"], row["agents"]) for row in map(json.loads, filter(str.strip, f))]
+    output = args.output or ROUTER_MODEL_PATH
+    TfidfRouter.train(examples).save(output)
+    print(f"Trained router on {len(examples)} examples -> {output}")
+
+
+if __name__ == "__main__":
+    main()
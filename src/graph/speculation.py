@@ -0,0 +1,128 @@
+"""Speculative prefetch: the likely agents' core data tools run while the router decides.
+
+Once the input guardrail passes, the agents the fast router's rules score highest for the
+query get their ``CORE_VIEWS`` (declared in each agent module) started on a background
+pool, inside the run's tool result table. Routing, and each agent's first LLM turn, overlap
+with that work; an agent that then calls the same tool gets the prefetched result. When the
+router has decided, prefetches queued only for agents it did not select are cancelled, and at
+the end of the run, once its remaining prefetches have stopped, the table reports which were
+used and how much time they saved.
+"""
+import importlib
+import json
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from src.config import SPECULATION_MIN_SCORE
+from src.graph.router import AGENT_NAMES, get_fast_router
+from src.observability.metrics import get_metrics
+from src.tools.results import release_table, speculative, use_table
+
+logger = logging.getLogger("scia")
+
+# Prefetches running at once per process
+MAX_WORKERS = 4
+# Runs whose prefetches were never settled (e.g. the router failed) are dropped oldest-first
+MAX_PENDING_RUNS = 256
+
+_CALLS_HELP = "Speculative tool prefetches by outcome"
+_SECONDS_HELP = "Tool time prefetched before an agent asked (saved) or for nothing (wasted)"
+
+_executor: ThreadPoolExecutor | None = None
+_pending: dict[str, list[tuple[set[str], Future]]] = {}
+_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="scia-prefetch")
+    return _executor
+
+
+def likely_agents(query: str, min_score: float = SPECULATION_MIN_SCORE) -> list[str]:
+    """Agents whose routing rules score at least ``min_score`` for the query (all of them for 0)."""
+    decision = get_fast_router().rules.classify(query)
+    if not decision.scores:  # a "full report" query
+        return list(decision.agents)
+    return [agent for agent in AGENT_NAMES if decision.scores[agent] >= min_score]
+
+
+def prefetch_plan(agents: list[str]) -> dict[tuple[str, str], set[str]]:
+    """(tool name, JSON arguments) -> the agents that declared it, for the given agents."""
+    plan: dict[tuple[str, str], set[str]] = {}
+    for agent in agents:
+        module = importlib.import_module(f"src.agents.{agent}")
+        for name, arguments in getattr(module, "CORE_VIEWS", []):
+            plan.setdefault((name, json.dumps(arguments, sort_keys=True)), set()).add(agent)
+    return plan
+
+
+def speculate(run_id: str, query: str) -> list[str]:
+    """Start prefetching for the query's likely agents. Returns those agents."""
+    from src.tools import ALL_TOOLS
+
+    agents = likely_agents(query)
+    if not agents:
+        return []
+    tools = {t.name: t for t in ALL_TOOLS}
+    futures = [
+        (owners, _pool().submit(_prefetch, run_id, tools[name], json.loads(arguments)))
+        for (name, arguments), owners in prefetch_plan(agents).items()
+        if name in tools
+    ]
+    with _lock:
+        _pending[run_id] = futures
+        while len(_pending) > MAX_PENDING_RUNS:
+            _pending.pop(next(iter(_pending)))
+    logger.info(f"[SPECULATION] run_id={run_id}: prefetching {len(futures)} tool calls for {agents}")
+    return agents
+
+
+def _prefetch(run_id: str, tool, arguments: dict) -> None:
+    try:
+        with use_table(run_id), speculative():
+            tool.invoke(arguments)
+    except Exception as e:
+        logger.debug(f"[SPECULATION] {tool.name}{arguments} failed: {type(e).__name__}: {e}")
+
+
+def settle(run_id: str, selected: list[str]) -> int:
+    """The router chose ``selected``: cancel prefetches queued only for other agents. Returns how many."""
+    with _lock:
+        futures = _pending.get(run_id, [])
+        keep = [(owners, future) for owners, future in futures if owners & set(selected)]
+        if run_id in _pending:
+            _pending[run_id] = keep
+    return _cancel(future for owners, future in futures if not owners & set(selected))
+
+
+def finish(run_id: str) -> dict:
+    """The run ended: cancel its prefetches that never started and wait for the running ones, then
+    release its tool result table and export the prefetches' outcome. Returns the table's counters.
+
+    Safe to call again for a finished run. Waiting first keeps a late prefetch from opening a new
+    table for the run after it was released.
+    """
+    with _lock:
+        futures = [future for _, future in _pending.pop(run_id, [])]
+    _cancel(futures)
+    wait(futures)
+    stats = release_table(run_id)
+    if not stats.get("speculated"):
+        return stats
+    metrics = get_metrics()
+    metrics.inc("speculative_calls_total", stats["prefetched"], help=_CALLS_HELP, outcome="used")
+    metrics.inc("speculative_calls_total", stats["speculative_wasted"], help=_CALLS_HELP, outcome="wasted")
+    metrics.inc("speculative_seconds_total", stats["seconds_saved"], help=_SECONDS_HELP, kind="saved")
+    metrics.inc("speculative_seconds_total", stats["seconds_wasted"], help=_SECONDS_HELP, kind="wasted")
+    return stats
+
+
+def _cancel(futures) -> int:
+    cancelled = sum(1 for future in futures if future.cancel())
+    if cancelled:
+        get_metrics().inc("speculative_calls_total", cancelled, help=_CALLS_HELP, outcome="cancelled")
+    return cancelled
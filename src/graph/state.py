@@ -18,3 +18,7 @@ class SupervisorState(TypedDict):
     agent_outputs: Annotated[dict[str, str], merge_dicts]
     final_report: str
     guardrail_blocked: bool
+    run_id: str
+    tool_stats: dict[str, int]
+    # How the final report was produced: "synthesized", "single_agent" (FAST_SYNTHESIS) or "blocked"
+    report_path: str
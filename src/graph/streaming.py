@@ -0,0 +1,112 @@
+"""Streamed workflow runs: per-node progress events and guarded synthesizer tokens."""
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Iterator
+from langgraph.graph.message import add_messages
+from src.guardrails import OutputGuard
+from src.graph.checkpoint import new_run_id, release_run, run_config, saved_state
+from src.graph.state import merge_dicts
+from src.observability.metrics import get_metrics
+
+logger = logging.getLogger("scia")
+
+STREAMED_NODE = "synthesizer"
+
+
+@dataclass
+class StreamEvent:
+    """One item of a streamed run.
+
+    ``kind`` is "progress" when a graph node finished (``node`` and its state ``update``),
+    "token" for a piece of the guarded final report (``text``), or "done" with the final
+    state in ``update`` and timings in ``metrics``.
+    """
+    kind: str
+    node: str = ""
+    text: str = ""
+    update: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    metrics: dict = field(default_factory=dict)
+
+
+def stream_workflow(graph, state: dict | None, run_id: str | None = None) -> Iterator[StreamEvent]:
+    """Run the workflow, yielding progress as nodes finish and the report as it is generated.
+
+    Synthesizer tokens pass through an OutputGuard, so the streamed text matches the
+    final_report that output_guardrail produces. Time to first token (the first
+    character of the report shown to the user) is logged as ``[TTFT]``.
+
+    The run is checkpointed under ``run_id`` (the state's run_id or a new one). With
+    ``state=None`` the run is resumed from its last checkpoint instead.
+    """
+    started = time.perf_counter()
+    guard = OutputGuard()
+    run_id = run_id or (state or {}).get("run_id") or new_run_id()
+    if state is None:
+        final = saved_state(graph, run_id)
+    else:
+        state = {**state, "run_id": run_id}
+        final = dict(state)
+    streamed = False
+    ttft = None
+
+    def emit(text: str) -> Iterator[StreamEvent]:
+        nonlocal ttft
+        if text:
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            yield StreamEvent("token", node=STREAMED_NODE, text=text, elapsed=time.perf_counter() - started)
+
+    for mode, chunk in graph.stream(state, run_config(run_id), stream_mode=["updates", "messages"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == STREAMED_NODE and isinstance(message.content, str):
+                streamed = streamed or bool(message.content)
+                yield from emit(guard.feed(message.content))
+            continue
+        for node, update in chunk.items():
+            if node.startswith("__"):
+                # e.g. "__metadata__" next to the writes of tasks replayed from a checkpoint
+                continue
+            update = update or {}
+            _apply(final, update)
+            if node == STREAMED_NODE and not streamed:
+                # Nothing was streamed (e.g. a cached response): release the report in one piece
+                yield from emit(guard.feed(update.get("final_report", "")))
+            yield StreamEvent("progress", node=node, update=update, elapsed=time.perf_counter() - started)
+
+    if final.get("guardrail_blocked"):
+        yield from emit(final.get("final_report", ""))
+    else:
+        yield from emit(guard.finish())
+    release_run(run_id)
+    total = time.perf_counter() - started
+    metrics = {"ttft_seconds": round(ttft, 3) if ttft is not None else None, "total_seconds": round(total, 3)}
+    logger.info(f"[TTFT] run_id={final.get('run_id', '')}: first token after {metrics['ttft_seconds']}s, "
+                f"total {metrics['total_seconds']}s")
+    if ttft is not None:
+        get_metrics().observe("ttft_seconds", ttft, help="Time to the first streamed report token")
+    yield StreamEvent("done", update=final, elapsed=total, metrics=metrics)
+
+
+def _apply(state: dict, update: dict) -> None:
+    """Fold a node's update into the accumulated state using the graph's reducers."""
+    for key, value in update.items():
+        if key == "agent_outputs":
+            state[key] = merge_dicts(state.get(key, {}), value)
+        elif key == "messages":
+            state[key] = add_messages(state.get(key, []), value)
+        else:
+            state[key] = value
+
+
+def describe(event: StreamEvent) -> str:
+    """One-line progress message for a "progress" event."""
+    label = event.node.replace("_", " ").title()
+    if event.node == "router" and event.update.get("next_agents"):
+        agents = ", ".join(name.replace("_", " ").title() for name in event.update["next_agents"])
+        return f"Routing to: {agents}"
+    if event.node == "agents":
+        label = ", ".join(name.replace("_", " ").title() for name in event.update.get("agent_outputs", {}))
+    return f"{label} finished ({event.elapsed:.1f}s)"
@@ -1,15 +1,30 @@
-import time
+import asyncio
+import functools
 import logging
+import weakref
+from contextlib import asynccontextmanager
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableLambda
 from src.graph.state import SupervisorState
-from src.config import get_llm, IS_FREE_TIER
-from src.agents import create_demand_analyst, create_inventory_monitor, create_supplier_analyst
+from src.config import (
+    AGENT_MODE, SEQUENTIAL_AGENTS, FAST_ROUTER, FAST_SYNTHESIS, LLM_PROVIDER, LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES, METRICS_FILE,
+    SPECULATIVE_PREFETCH, SYNTHESIS_MODEL,
+)
+from src.registry import get_registry, get_shared_llm
+from src.graph.router import AGENT_NAMES, get_fast_router
+from src.graph import speculation
 from src.guardrails import check_input, check_output
+from src.tools.results import release_table, use_table
+from src.ratelimit import is_rate_limit_error
+from src.observability.callbacks import AgentTraceCallback
+from src.observability.metrics import get_metrics, start_exporters
+from src.graph.checkpoint import arelease_run, get_checkpointer, new_run_id, release_run, run_config
 
 logger = logging.getLogger("scia")
 
-AGENT_NAMES = ["demand_analyst", "inventory_monitor", "supplier_analyst"]
+AGENT_MODES = ("react", "prefetched")
 
 ROUTER_PROMPT = """You are a supply chain coordinator. Given the user's query, decide which specialist agents to invoke.
 
@@ -26,21 +41,51 @@ For broad queries, invoke all relevant agents. Examples:
 - "How are our suppliers doing?" -> supplier_analyst"""
 
 
-def _invoke_with_retry(fn, *args, max_retries=3, **kwargs):
-    """Invoke with exponential backoff on rate limit errors. Only retries on free-tier APIs."""
+def _invoke_with_retry(fn, *args, max_retries=LLM_MAX_RETRIES, **kwargs):
+    """Invoke, retrying when the provider throttled the call (HTTP 429).
+
+    There is no sleep here: the throttle was reported to the provider's shared rate limiter,
+    which holds back every caller until Retry-After has passed and then releases them at a
+    reduced rate.
+    """
     for attempt in range(max_retries):
         try:
             return fn(*args, **kwargs)
         except Exception as e:
-            if IS_FREE_TIER and ("429" in str(e) or "rate_limit" in str(e).lower()):
-                wait = 2 ** attempt * 30
-                logger.warning(f"Rate limited, retrying in {wait}s (attempt {attempt + 1}/{max_retries})")
-                time.sleep(wait)
-            else:
+            if not is_rate_limit_error(e):
                 raise
+            logger.warning(f"Rate limited, retrying (attempt {attempt + 1}/{max_retries})")
+            get_metrics().inc("llm_retries_total", help="Node calls retried after a provider throttle")
     return fn(*args, **kwargs)
 
 
+async def _ainvoke_with_retry(fn, *args, max_retries=LLM_MAX_RETRIES, **kwargs):
+    """Async counterpart of _invoke_with_retry."""
+    for attempt in range(max_retries):
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            logger.warning(f"Rate limited, retrying (attempt {attempt + 1}/{max_retries})")
+            get_metrics().inc("llm_retries_total", help="Node calls retried after a provider throttle")
+    return await fn(*args, **kwargs)
+
+
+_provider_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def _llm_slot():
+    """Bound how many LLM-bound nodes run at once per provider on the current event loop."""
+    slots = _provider_slots.setdefault(asyncio.get_running_loop(), {})
+    semaphore = slots.get(LLM_PROVIDER)
+    if semaphore is None:
+        semaphore = slots[LLM_PROVIDER] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    async with semaphore:
+        yield
+
+
 # --- Guardrail nodes ---
 
 def input_guardrail(state: SupervisorState) -> dict:
@@ -48,13 +93,37 @@ def input_guardrail(state: SupervisorState) -> dict:
     query = state["messages"][-1].content
     result = check_input(query)
     if not result.passed:
-        return {"final_report": result.message, "guardrail_blocked": True}
+        return {"final_report": result.message, "guardrail_blocked": True, "report_path": "blocked"}
+    if SPECULATIVE_PREFETCH:
+        speculation.speculate(state["run_id"], query)
     return {"guardrail_blocked": False}
 
 
 def output_guardrail(state: SupervisorState) -> dict:
     """Sanitize and validate output before returning to user."""
-    return {"final_report": check_output(state["final_report"])}
+    tool_stats = _end_run(state.get("run_id", ""))
+    if tool_stats:
+        logger.info(f"[TOOL_DEDUP] run_id={state['run_id']}: {tool_stats['deduplicated']}/{tool_stats['calls']} "
+                    f"tool calls deduplicated ({tool_stats['waited']} waited on an in-flight call)")
+    if tool_stats.get("speculated"):
+        logger.info(f"[SPECULATION] run_id={state['run_id']}: {tool_stats['prefetched']}/{tool_stats['speculated']} "
+                    f"prefetches used, {tool_stats['seconds_saved']:.2f}s saved, "
+                    f"{tool_stats['seconds_wasted']:.2f}s wasted")
+    return {"final_report": check_output(state["final_report"]), "tool_stats": tool_stats}
+
+
+def _end_run(run_id: str) -> dict:
+    """Release the run's tool result table, after its prefetches have stopped, and return its counters."""
+    return speculation.finish(run_id) if SPECULATIVE_PREFETCH else release_table(run_id)
+
+
+async def ainput_guardrail(state: SupervisorState) -> dict:
+    return input_guardrail(state)
+
+
+async def aoutput_guardrail(state: SupervisorState) -> dict:
+    # May wait for the run's last prefetches
+    return await asyncio.to_thread(output_guardrail, state)
 
 
 def after_input_guardrail(state: SupervisorState) -> str:
@@ -67,65 +136,123 @@ def after_input_guardrail(state: SupervisorState) -> str:
 # --- Core nodes ---
 
 def route_query(state: SupervisorState) -> dict:
-    """Coordinator node: classify query and decide which agents to call."""
-    llm = get_llm()
-    messages = [
+    """Coordinator node: classify query and decide which agents to call.
+
+    Unambiguous queries are routed by the local fast-path classifier; the LLM is only
+    asked when it is not confident.
+    """
+    if FAST_ROUTER:
+        selected = get_fast_router().route(state["messages"][-1].content)
+        if selected:
+            return _routed(state, selected)
+    response = _invoke_with_retry(get_shared_llm().invoke, _router_messages(state))
+    return _routed(state, _parse_route(response.content))
+
+
+async def aroute_query(state: SupervisorState) -> dict:
+    if FAST_ROUTER:
+        selected = get_fast_router().route(state["messages"][-1].content)
+        if selected:
+            return _routed(state, selected)
+    async with _llm_slot():
+        response = await _ainvoke_with_retry(get_shared_llm().ainvoke, _router_messages(state))
+    return _routed(state, _parse_route(response.content))
+
+
+def _routed(state: SupervisorState, selected: list[str]) -> dict:
+    if SPECULATIVE_PREFETCH:
+        speculation.settle(state.get("run_id", ""), selected)
+    return {"next_agents": selected}
+
+
+def _router_messages(state: SupervisorState) -> list:
+    return [
         SystemMessage(content=ROUTER_PROMPT),
         state["messages"][-1],
     ]
-    response = _invoke_with_retry(llm.invoke, messages)
-    raw = response.content.strip().lower()
+
+
+def _parse_route(content: str) -> list[str]:
+    raw = content.strip().lower()
     selected = [name.strip() for name in raw.split(",") if name.strip() in AGENT_NAMES]
-    if not selected:
-        selected = AGENT_NAMES
-    return {"next_agents": selected}
+    return selected or AGENT_NAMES
 
 
-def _run_agent(state, create_fn, name):
-    agent = create_fn()
-    result = _invoke_with_retry(agent.invoke, {"messages": state["messages"]})
+def _run_agent(state, name, mode=AGENT_MODE):
+    agent = get_registry().agent(name, mode)
+    # Identical tool calls from agents in the same run share one result
+    with use_table(state.get("run_id")):
+        result = _invoke_with_retry(agent.invoke, {"messages": state["messages"]})
     last_msg = result["messages"][-1].content
     return {"agent_outputs": {name: last_msg}}
 
 
-# --- Sequential execution (free-tier / Streamlit Cloud) ---
+async def _arun_agent(state, name, mode=AGENT_MODE):
+    agent = get_registry().agent(name, mode)
+    with use_table(state.get("run_id")):
+        async with _llm_slot():
+            result = await _ainvoke_with_retry(agent.ainvoke, {"messages": state["messages"]})
+    last_msg = result["messages"][-1].content
+    return {"agent_outputs": {name: last_msg}}
+
 
-def run_agents_sequentially(state: SupervisorState) -> dict:
-    """Run selected agents one at a time to stay within free-tier rate limits."""
-    agent_map = {
-        "demand_analyst": create_demand_analyst,
-        "inventory_monitor": create_inventory_monitor,
-        "supplier_analyst": create_supplier_analyst,
-    }
+# --- Sequential execution (SEQUENTIAL_AGENTS) ---
+
+def run_agents_sequentially(state: SupervisorState, mode: str = AGENT_MODE) -> dict:
+    """Run selected agents one at a time."""
     outputs = {}
     for name in state.get("next_agents", AGENT_NAMES):
-        if name in agent_map:
-            result = _run_agent(state, agent_map[name], name)
+        if name in AGENT_NAMES:
+            result = _run_agent(state, name, mode)
             outputs.update(result["agent_outputs"])
     return {"agent_outputs": outputs}
 
 
-# --- Parallel execution (local development) ---
+async def arun_agents_sequentially(state: SupervisorState, mode: str = AGENT_MODE) -> dict:
+    outputs = {}
+    for name in state.get("next_agents", AGENT_NAMES):
+        if name in AGENT_NAMES:
+            result = await _arun_agent(state, name, mode)
+            outputs.update(result["agent_outputs"])
+    return {"agent_outputs": outputs}
 
-def run_demand_analyst(state: SupervisorState) -> dict:
-    return _run_agent(state, create_demand_analyst, "demand_analyst")
 
+def synthesize(state: SupervisorState) -> dict:
+    """Combine agent outputs into a final report (with FAST_SYNTHESIS, a single agent's output is used as is)."""
+    if _single_agent(state):
+        return _single_agent_report(state)
+    response = _invoke_with_retry(_synthesis_llm().invoke, _synthesis_messages(state))
+    return {"final_report": response.content, "report_path": "synthesized"}
 
-def run_inventory_monitor(state: SupervisorState) -> dict:
-    return _run_agent(state, create_inventory_monitor, "inventory_monitor")
 
+async def asynthesize(state: SupervisorState) -> dict:
+    if _single_agent(state):
+        return _single_agent_report(state)
+    async with _llm_slot():
+        response = await _ainvoke_with_retry(_synthesis_llm().ainvoke, _synthesis_messages(state))
+    return {"final_report": response.content, "report_path": "synthesized"}
 
-def run_supplier_analyst(state: SupervisorState) -> dict:
-    return _run_agent(state, create_supplier_analyst, "supplier_analyst")
 
+def _single_agent(state: SupervisorState) -> bool:
+    """FAST_SYNTHESIS: one agent's report needs no executive summary on top."""
+    return FAST_SYNTHESIS and len(state["agent_outputs"]) == 1
 
-def synthesize(state: SupervisorState) -> dict:
-    """Combine agent outputs into a final report."""
-    llm = get_llm()
-    agent_results = "\n\n".join(
-        f"## {name.replace('_', ' ').title()} Report\n{output}"
-        for name, output in state["agent_outputs"].items()
-    )
+
+def _single_agent_report(state: SupervisorState) -> dict:
+    (name, output), = state["agent_outputs"].items()
+    return {"final_report": _report_section(name, output), "report_path": "single_agent"}
+
+
+def _synthesis_llm():
+    return get_shared_llm(model=SYNTHESIS_MODEL or None)
+
+
+def _report_section(name: str, output: str) -> str:
+    return f"## {name.replace('_', ' ').title()} Report\n{output}"
+
+
+def _synthesis_messages(state: SupervisorState) -> list:
+    agent_results = "\n\n".join(_report_section(name, output) for name, output in state["agent_outputs"].items())
     messages = [
         SystemMessage(content=(
             "You are a supply chain coordinator. Synthesize the following specialist agent "
@@ -134,18 +261,125 @@ def synthesize(state: SupervisorState) -> dict:
         )),
         HumanMessage(content=f"Original query: {state['messages'][0].content}\n\nAgent Reports:\n{agent_results}"),
     ]
-    response = _invoke_with_retry(llm.invoke, messages)
-    return {"final_report": response.content}
+    return messages
+
+
+def _node(name: str, func, afunc) -> RunnableLambda:
+    """Graph node with a sync implementation for invoke() and an async one for ainvoke()."""
+    return RunnableLambda(func, afunc=afunc, name=name)
+
+
+class RunGraph(Runnable):
+    """Wraps the compiled workflow so it tidies up after every run and checkpoints plain calls too.
 
+    A call without ``run_config(run_id)`` is filed under ``state["run_id"]`` (a new ID when the
+    state has none), and a plain ``invoke`` drops its checkpoints once it completes, as invoke_run
+    does. However a run ends, its prefetches are stopped and its tool result table released;
+    output_guardrail does this for runs that get that far. Anything else (``checkpointer``,
+    ``get_state``, ...) is the compiled graph's.
+    """
 
-def build_workflow():
+    def __init__(self, graph: CompiledStateGraph):
+        self.graph = graph
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    @property
+    def InputType(self):
+        return self.graph.InputType
+
+    @property
+    def OutputType(self):
+        return self.graph.OutputType
+
+    @property
+    def config_specs(self):
+        return self.graph.config_specs
+
+    def get_input_schema(self, config=None):
+        return self.graph.get_input_schema(config)
+
+    def get_output_schema(self, config=None):
+        return self.graph.get_output_schema(config)
+
+    def get_graph(self, config=None):
+        return self.graph.get_graph(config)
+
+    def invoke(self, input, config=None, **kwargs):
+        input, config, filled = _run_input(self.graph, input, config)
+        try:
+            result = self.graph.invoke(input, config, **kwargs)
+        finally:
+            _end_run(_run_id(input, config))
+        if filled:
+            release_run(config["configurable"]["thread_id"])
+        return result
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        input, config, filled = _run_input(self.graph, input, config)
+        try:
+            result = await self.graph.ainvoke(input, config, **kwargs)
+        finally:
+            await asyncio.to_thread(_end_run, _run_id(input, config))
+        if filled:
+            await arelease_run(config["configurable"]["thread_id"])
+        return result
+
+    def stream(self, input, config=None, **kwargs):
+        input, config, _ = _run_input(self.graph, input, config)
+        try:
+            yield from self.graph.stream(input, config, **kwargs)
+        finally:
+            _end_run(_run_id(input, config))
+
+    async def astream(self, input, config=None, **kwargs):
+        input, config, _ = _run_input(self.graph, input, config)
+        try:
+            async for chunk in self.graph.astream(input, config, **kwargs):
+                yield chunk
+        finally:
+            await asyncio.to_thread(_end_run, _run_id(input, config))
+
+
+def _run_input(graph, input, config) -> tuple:
+    """The input with a run_id and, for a checkpointed graph, the config with that run's thread_id.
+
+    The third value says whether the thread_id was filled in here.
+    """
+    configurable = (config or {}).get("configurable") or {}
+    if isinstance(input, dict) and not input.get("run_id"):
+        input = {**input, "run_id": configurable.get("thread_id") or new_run_id()}
+    if not graph.checkpointer or input is None or "thread_id" in configurable:
+        return input, config, False
+    config = {**(config or {}), "configurable": {**configurable, **run_config(_run_id(input, config))["configurable"]}}
+    return input, config, True
+
+
+def _run_id(input, config) -> str:
+    if isinstance(input, dict) and input.get("run_id"):
+        return input["run_id"]
+    return ((config or {}).get("configurable") or {}).get("thread_id", "")
+
+
+def build_workflow(checkpoint: bool = True, agent_mode: str | None = None):
+    """Compile the supervisor graph.
+
+    With ``checkpoint`` (and CHECKPOINTS enabled) every step is saved under the run's
+    thread_id: ``run_config(run_id)`` if passed, else the state's run_id; see src/graph/checkpoint.py.
+    ``agent_mode`` picks the agents: "react" or "prefetched" (see src/agents/prefetched.py;
+    AGENT_MODE if unset).
+    """
+    mode = agent_mode or AGENT_MODE
+    if mode not in AGENT_MODES:
+        raise ValueError(f"Unknown agent mode {mode!r}; expected one of {', '.join(AGENT_MODES)}")
     workflow = StateGraph(SupervisorState)
 
     # Guardrail + core nodes
-    workflow.add_node("input_guardrail", input_guardrail)
-    workflow.add_node("router", route_query)
-    workflow.add_node("synthesizer", synthesize)
-    workflow.add_node("output_guardrail", output_guardrail)
+    workflow.add_node("input_guardrail", _node("input_guardrail", input_guardrail, ainput_guardrail))
+    workflow.add_node("router", _node("router", route_query, aroute_query))
+    workflow.add_node("synthesizer", _node("synthesizer", synthesize, asynthesize))
+    workflow.add_node("output_guardrail", _node("output_guardrail", output_guardrail, aoutput_guardrail))
 
     # Entry: input guardrail first
     workflow.add_edge(START, "input_guardrail")
@@ -154,16 +388,17 @@ def build_workflow():
         "router": "router",
     })
 
-    if IS_FREE_TIER:
+    if SEQUENTIAL_AGENTS:
         # Sequential: router -> agents (one node) -> synthesizer
-        workflow.add_node("agents", run_agents_sequentially)
+        workflow.add_node("agents", _node("agents", functools.partial(run_agents_sequentially, mode=mode),
+                                          functools.partial(arun_agents_sequentially, mode=mode)))
         workflow.add_edge("router", "agents")
         workflow.add_edge("agents", "synthesizer")
     else:
         # Parallel: router -> fan-out to agent nodes -> synthesizer
-        workflow.add_node("demand_analyst", run_demand_analyst)
-        workflow.add_node("inventory_monitor", run_inventory_monitor)
-        workflow.add_node("supplier_analyst", run_supplier_analyst)
+        for agent_name in AGENT_NAMES:
+            workflow.add_node(agent_name, _node(agent_name, functools.partial(_run_agent, name=agent_name, mode=mode),
+                                                functools.partial(_arun_agent, name=agent_name, mode=mode)))
 
         def route_to_agents(state: SupervisorState) -> list[str]:
             return state.get("next_agents", AGENT_NAMES)
@@ -177,4 +412,8 @@ def build_workflow():
     workflow.add_edge("synthesizer", "output_guardrail")
     workflow.add_edge("output_guardrail", END)
 
-    return workflow.compile()
+    # Every run is measured; see src/observability/metrics.py for the exporters
+    start_exporters()
+    trace = AgentTraceCallback(agent_names=AGENT_NAMES, export_path=METRICS_FILE or None)
+    checkpointer = get_checkpointer() if checkpoint else None
+    return RunGraph(workflow.compile(checkpointer=checkpointer)).with_config(callbacks=[trace])
@@ -41,34 +41,12 @@ class GuardrailResult:
 
 def check_input(query: str) -> GuardrailResult:
     """Validate user input before sending to agents."""
-    if not query or not query.strip():
-        return GuardrailResult(False, "Please enter a query about your supply chain.")
-
-    if len(query) > MAX_INPUT_LENGTH:
-        return GuardrailResult(
-            False,
-            f"Query too long ({len(query)} chars). Please keep it under {MAX_INPUT_LENGTH} characters."
-        )
-
-    # Check for prompt injection attempts
-    query_lower = query.lower()
-    for pattern in PROMPT_INJECTION_PATTERNS:
-        if re.search(pattern, query_lower):
-            logger.warning(f"Prompt injection attempt blocked: {query[:100]}")
-            return GuardrailResult(
-                False,
-                "Your query was blocked by our safety filter. Please ask a question about supply chain operations."
-            )
+    return get_engine().check_input(query)
 
-    # Check domain relevance
-    if not any(kw in query_lower for kw in SUPPLY_CHAIN_KEYWORDS):
-        return GuardrailResult(
-            False,
-            "This system is designed for supply chain analysis. "
-            "Please ask about inventory, demand, suppliers, products, or logistics."
-        )
 
-    return GuardrailResult(True)
+def check_inputs(queries: list[str]) -> list[GuardrailResult]:
+    """Validate many queries at once; repeated queries are checked once."""
+    return get_engine().check_inputs(queries)
 
 
 # --- Output Guardrails ---
@@ -89,6 +67,10 @@ HALLUCINATION_INDICATORS = [
     "i don't actually know",
 ]
 
+HALLUCINATION_NOTE = (
+    "\n\n> **Note:** Some parts of this response may contain uncertain information. Please verify against actual data."
+)
+
 DISCLAIMER = (
     "\n\n---\n*This analysis is based on sample data and AI-generated insights. "
     "Verify findings against actual systems before making business decisions.*"
@@ -97,22 +79,196 @@ DISCLAIMER = (
 
 def check_output(response: str) -> str:
     """Sanitize and validate agent output before returning to user."""
-    if not response or not response.strip():
-        return "The agents were unable to generate a response. Please try rephrasing your query."
+    return get_engine().check_output(response)
+
+
+def _literal_matcher(words: list[str]) -> re.Pattern:
+    # One alternation, longest first, so the scan runs in the regex engine instead of a Python loop
+    return re.compile("|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True)))
+
+
+class GuardrailEngine:
+    """Guardrail rules compiled once.
+
+    Injection patterns form a single alternation and the keyword and hallucination lists a
+    literal matcher each. Sensitive-data patterns stay one pass each, in their listed order:
+    a later pattern sees the earlier ones' replacements, as with sequential re.sub calls.
+    """
+
+    def __init__(self, injection_patterns=None, keywords=None, sensitive_patterns=None, hallucination_indicators=None):
+        injection_patterns = injection_patterns or PROMPT_INJECTION_PATTERNS
+        sensitive_patterns = sensitive_patterns or SENSITIVE_PATTERNS
+        self._injection = re.compile("|".join(f"(?:{p})" for p in injection_patterns))
+        self._keywords = _literal_matcher(keywords or SUPPLY_CHAIN_KEYWORDS)
+        self._hallucination = _literal_matcher(hallucination_indicators or HALLUCINATION_INDICATORS)
+        self._redaction = [(re.compile(pattern), replacement) for pattern, replacement in sensitive_patterns]
+
+    def check_input(self, query: str) -> GuardrailResult:
+        if not query or not query.strip():
+            return GuardrailResult(False, "Please enter a query about your supply chain.")
+
+        if len(query) > MAX_INPUT_LENGTH:
+            return GuardrailResult(
+                False,
+                f"Query too long ({len(query)} chars). Please keep it under {MAX_INPUT_LENGTH} characters."
+            )
+
+        # Check for prompt injection attempts
+        query_lower = query.lower()
+        if self._injection.search(query_lower):
+            logger.warning(f"Prompt injection attempt blocked: {query[:100]}")
+            return GuardrailResult(
+                False,
+                "Your query was blocked by our safety filter. Please ask a question about supply chain operations."
+            )
+
+        # Check domain relevance
+        if not self._keywords.search(query_lower):
+            return GuardrailResult(
+                False,
+                "This system is designed for supply chain analysis. "
+                "Please ask about inventory, demand, suppliers, products, or logistics."
+            )
+
+        return GuardrailResult(True)
+
+    def check_inputs(self, queries: list[str]) -> list[GuardrailResult]:
+        results: dict[str, GuardrailResult] = {}
+        for query in queries:
+            if query not in results:
+                results[query] = self.check_input(query)
+        return [results[query] for query in queries]
+
+    def redact(self, text: str) -> str:
+        for pattern, replacement in self._redaction:
+            text = pattern.sub(replacement, text)
+        return text
+
+    def finditer_sensitive(self, text: str):
+        for pattern, _ in self._redaction:
+            yield from pattern.finditer(text)
+
+    def has_hallucination(self, text: str) -> bool:
+        return self._hallucination.search(text.lower()) is not None
+
+    def check_output(self, response: str) -> str:
+        if not response or not response.strip():
+            return "The agents were unable to generate a response. Please try rephrasing your query."
+
+        # Redact sensitive information
+        response = self.redact(response)
+
+        # Flag potential hallucinations
+        if self.has_hallucination(response):
+            logger.warning("Potential hallucination detected in output")
+            response += HALLUCINATION_NOTE
+
+        # Add disclaimer
+        if not response.endswith(DISCLAIMER):
+            response += DISCLAIMER
+
+        return response
+
+
+_engine: GuardrailEngine | None = None
+
+
+def get_engine() -> GuardrailEngine:
+    """Process-wide engine built from the module-level rule lists."""
+    global _engine
+    if _engine is None:
+        _engine = GuardrailEngine()
+    return _engine
+
+
+# A text ending like this may continue a credential past the cut, so the cut moves before it
+_CREDENTIAL_TAIL = re.compile(r"(?i)(api|secret|api[_\s]?key|secret[_\s]?key|password)\s*[:=]?\s*$")
+
+
+class StreamingRedactor:
+    """Chunk-wise redaction that never lets a match straddle the text already released.
+
+    The last ``holdback`` characters are kept back, and text is only released up to a
+    whitespace boundary. A cut is moved earlier when a sensitive match would span it, or
+    when the text before it ends like the start of a credential. The pending text is only
+    rescanned once another ``holdback`` characters have arrived, so a stream of small chunks
+    costs about as much as one redact() of the whole text, whose output it equals.
+    """
+
+    def __init__(self, engine: GuardrailEngine | None = None, holdback: int = 64):
+        self.engine = engine or get_engine()
+        self.holdback = holdback
+        self._pending = ""
+        self._unscanned = 0
+
+    def feed(self, text: str) -> str:
+        """Add streamed text and return the redacted part that is safe to show now."""
+        self._pending += text
+        self._unscanned += len(text)
+        if self._unscanned < self.holdback:
+            return ""
+        self._unscanned = 0
+        cut = self._safe_cut(len(self._pending) - self.holdback)
+        if cut <= 0:
+            return ""
+        ready, self._pending = self._pending[:cut], self._pending[cut:]
+        return self.engine.redact(ready)
+
+    def flush(self) -> str:
+        ready, self._pending = self._pending, ""
+        self._unscanned = 0
+        return self.engine.redact(ready)
+
+    def _safe_cut(self, limit: int) -> int:
+        text = self._pending
+        cut = _whitespace_cut(text, limit)
+        while cut > 0:
+            spanning = [m.start() for m in self.engine.finditer_sensitive(text) if m.start() < cut < m.end()]
+            tail = _CREDENTIAL_TAIL.search(text, 0, cut)
+            if spanning:
+                cut = _whitespace_cut(text, min(spanning) - 1)
+            elif tail:
+                cut = _whitespace_cut(text, tail.start() - 1)
+            else:
+                return cut
+        return 0
+
+
+def _whitespace_cut(text: str, limit: int) -> int:
+    """Position just after the last space or newline at or before ``limit`` (0 if there is none)."""
+    if limit < 0:
+        return 0
+    return max(text.rfind(" ", 0, limit + 1), text.rfind("\n", 0, limit + 1)) + 1
+
+
+class OutputGuard:
+    """Incremental check_output for streamed text.
 
-    # Redact sensitive information
-    for pattern, replacement in SENSITIVE_PATTERNS:
-        response = re.sub(pattern, replacement, response)
+    Text is redacted chunk-wise by a StreamingRedactor; the hallucination note and
+    disclaimer are added by finish(). The concatenated output equals check_output() of
+    the full response.
+    """
 
-    # Flag potential hallucinations
-    response_lower = response.lower()
-    has_hallucination_flag = any(ind in response_lower for ind in HALLUCINATION_INDICATORS)
-    if has_hallucination_flag:
-        logger.warning("Potential hallucination detected in output")
-        response += "\n\n> **Note:** Some parts of this response may contain uncertain information. Please verify against actual data."
+    def __init__(self, engine: GuardrailEngine | None = None):
+        self.engine = engine or get_engine()
+        self._redactor = StreamingRedactor(self.engine)
+        self._raw = []
+        self._released = []
 
-    # Add disclaimer
-    if not response.endswith(DISCLAIMER):
-        response += DISCLAIMER
+    def feed(self, text: str) -> str:
+        """Add streamed text and return the part that is safe to show now."""
+        self._raw.append(text)
+        out = self._redactor.feed(text)
+        self._released.append(out)
+        return out
 
-    return response
+    def finish(self) -> str:
+        """Flush the remaining text and append the closing notes."""
+        if not "".join(self._raw).strip():
+            return "The agents were unable to generate a response. Please try rephrasing your query."
+        tail = self._redactor.flush()
+        released = "".join(self._released) + tail
+        if self.engine.has_hallucination(released):
+            logger.warning("Potential hallucination detected in output")
+            return tail + HALLUCINATION_NOTE + DISCLAIMER
+        return tail if released.endswith(DISCLAIMER) else tail + DISCLAIMER
@@ -0,0 +1,264 @@
+"""Continuous stockout monitor that tails the dataset and re-evaluates only changed SKUs."""
+import io
+import os
+import time
+import logging
+from collections import deque
+from typing import Callable
+import pandas as pd
+from src.config import DATA_PATH, DATA_FORMAT, MONITOR_INTERVAL, MONITOR_ALERT_LEVEL
+from src.guardrails import MAX_INPUT_LENGTH
+from src.models import InventoryAlert
+from src.tools.forecasting import RISK_COLUMNS, RISK_LEVELS, format_days, risk_frame, risk_recommendation
+from src.tools.storage import StorageBackend, open_backend
+
+logger = logging.getLogger("scia")
+
+SALES_WINDOW = 7
+_ROW_COLUMNS = ["date", *RISK_COLUMNS]
+
+
+class CSVTailer:
+    """Reads rows appended to a CSV file since the previous call.
+
+    Only complete lines are consumed, so a row that is still being written is picked
+    up on the next call. If the file shrinks or is replaced, reading restarts from the top.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = 0
+        self._inode = None
+        self._header = b""
+
+    def read_new(self) -> tuple[pd.DataFrame, bool]:
+        """Return (new rows, reset) where reset means the file was rewritten."""
+        st = os.stat(self.path)
+        reset = False
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            if self._inode is not None:
+                logger.warning(f"{self.path} was truncated or replaced; re-reading from the start")
+                reset = True
+            self._inode, self._offset, self._header = st.st_ino, 0, b""
+        if st.st_size == self._offset:
+            return _empty(), reset
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(st.st_size - self._offset)
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return _empty(), reset
+        chunk = chunk[:end + 1]
+        self._offset += len(chunk)
+        if not self._header:
+            newline = chunk.index(b"\n")
+            self._header, chunk = chunk[:newline + 1], chunk[newline + 1:]
+        if not chunk.strip():
+            return _empty(), reset
+        return pd.read_csv(io.BytesIO(self._header + chunk), parse_dates=["date"]), reset
+
+
+class ScanTailer:
+    """Reads new rows from a columnar dataset by pushing a date filter down to the scan.
+
+    Each product's latest date seen so far is kept as its high-water mark. A scan starts at
+    the oldest mark, so rows appended for a product that lags the others are still found, and
+    rows not newer than their product's mark are dropped. A new product is picked up from
+    rows dated on or after that oldest mark. If the dataset shrinks (fewer bytes or files) it
+    was rewritten rather than appended to, and it is re-read from the start.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self._fingerprint = None
+        self._high_water: dict[str, pd.Timestamp] = {}
+
+    def read_new(self) -> tuple[pd.DataFrame, bool]:
+        """Return (new rows, reset) where reset means the dataset was rewritten."""
+        fingerprint = self.backend.fingerprint()
+        if fingerprint == self._fingerprint:
+            return _empty(), False
+        # (mtime, bytes, files): an append never makes the dataset smaller
+        reset = self._fingerprint is not None and (
+            fingerprint[1] < self._fingerprint[1] or fingerprint[2] < self._fingerprint[2])
+        if reset:
+            logger.warning(f"{self.backend.path} shrank or was replaced; re-reading from the start")
+            self._high_water.clear()
+        self._fingerprint = fingerprint
+        start = min(self._high_water.values()) if self._high_water else None
+        df = self.backend.scan(columns=_ROW_COLUMNS, start=start)
+        if self._high_water and not df.empty:
+            marks = df["product_id"].map(self._high_water)
+            df = df[marks.isna() | (df["date"] > marks)]
+        if not df.empty:
+            self._high_water.update(df.groupby("product_id")["date"].max().to_dict())
+        return df, reset
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame(columns=_ROW_COLUMNS)
+
+
+def open_tailer(path: str, format: str | None = None):
+    backend = open_backend(path, format)
+    if backend.format == "csv":
+        return CSVTailer(path)
+    return ScanTailer(backend)
+
+
+class RollingAggregates:
+    """Per-SKU trailing window of the latest rows, updated incrementally from new rows."""
+
+    def __init__(self, window: int = SALES_WINDOW):
+        self.window = window
+        self.rows: dict[str, deque] = {}
+        self.last_date: dict[str, pd.Timestamp] = {}
+
+    def clear(self) -> None:
+        self.rows.clear()
+        self.last_date.clear()
+
+    def update(self, new_rows: pd.DataFrame) -> set[str]:
+        """Fold new rows into the windows and return the product ids that changed."""
+        if new_rows.empty:
+            return set()
+        new_rows = new_rows.sort_values(["product_id", "date"], kind="stable")
+        changed = set()
+        for product_id, group in new_rows.groupby("product_id", sort=False):
+            last = self.last_date.get(product_id)
+            if last is not None:
+                group = group[group["date"] > last]
+            if group.empty:
+                continue
+            window = self.rows.setdefault(product_id, deque(maxlen=self.window))
+            window.extend(group[_ROW_COLUMNS].tail(self.window).itertuples(index=False, name=None))
+            self.last_date[product_id] = group["date"].iloc[-1]
+            changed.add(product_id)
+        return changed
+
+    def frame(self, product_ids) -> pd.DataFrame:
+        """Trailing rows for the given products in (product_id, date) order."""
+        records = [row for pid in sorted(product_ids) for row in self.rows[pid]]
+        return pd.DataFrame.from_records(records, columns=_ROW_COLUMNS)
+
+
+class StockoutMonitor:
+    """Tails the dataset, keeps rolling aggregates and raises alerts when a SKU's risk worsens.
+
+    Each tick reads only rows appended since the last tick, re-evaluates risk for the SKUs
+    those rows touched, and calls ``on_alert`` with the SKUs whose risk crossed ``alert_level``.
+    """
+
+    def __init__(
+        self,
+        path: str = DATA_PATH,
+        format: str | None = DATA_FORMAT,
+        alert_level: str = MONITOR_ALERT_LEVEL,
+        lead_time_adjusted: bool = False,
+        alert_on_start: bool = False,
+        on_alert: Callable[[list[InventoryAlert]], None] | None = None,
+    ):
+        if alert_level not in RISK_LEVELS:
+            raise ValueError(f"alert_level must be one of {RISK_LEVELS}")
+        self.tailer = open_tailer(path, format)
+        self.aggregates = RollingAggregates()
+        self.alert_level = alert_level
+        self.lead_time_adjusted = lead_time_adjusted
+        self.alert_on_start = alert_on_start
+        self.on_alert = on_alert or run_workflow_for_alerts
+        self.risk: dict[str, str] = {}
+        self.ticks = 0
+
+    def _severity(self, level: str | None) -> int:
+        return RISK_LEVELS.index(level) if level in RISK_LEVELS else len(RISK_LEVELS)
+
+    def tick(self) -> list[InventoryAlert]:
+        """Process newly appended rows and return alerts for SKUs that crossed the threshold."""
+        new_rows, reset = self.tailer.read_new()
+        if reset:
+            self.aggregates.clear()
+        changed = self.aggregates.update(new_rows)
+        first_tick = self.ticks == 0
+        self.ticks += 1
+        if not changed:
+            return []
+
+        frame = risk_frame(self.aggregates.frame(changed), sales_window=self.aggregates.window,
+                           lead_time_adjusted=self.lead_time_adjusted)
+        threshold = self._severity(self.alert_level)
+        alerts = []
+        for row in frame.itertuples(index=False):
+            previous = self.risk.get(row.product_id)
+            self.risk[row.product_id] = row.risk_level
+            severity = self._severity(row.risk_level)
+            if severity <= threshold and severity < self._severity(previous) and (
+                    not first_tick or self.alert_on_start):
+                alerts.append(InventoryAlert(
+                    product_id=row.product_id,
+                    product_name=row.product_name,
+                    current_stock=int(row.current_stock),
+                    reorder_point=int(row.reorder_point),
+                    avg_daily_sales=round(float(row.avg_daily_sales), 2),
+                    days_of_supply=round(float(row.days_of_supply), 1),
+                    risk_level=row.risk_level,
+                    recommendation=risk_recommendation(row),
+                ))
+        logger.info(f"[MONITOR] tick {self.ticks}: {len(new_rows)} new rows, {len(changed)} SKUs re-evaluated, "
+                    f"{len(alerts)} alerts")
+        if alerts:
+            self.on_alert(alerts)
+        return alerts
+
+    def run(self, interval: float = MONITOR_INTERVAL, max_ticks: int | None = None) -> None:
+        while max_ticks is None or self.ticks < max_ticks:
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"[MONITOR] tick failed: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def alert_query(alerts: list[InventoryAlert], max_length: int = MAX_INPUT_LENGTH) -> str:
+    """Build the workflow query describing the SKUs that crossed the risk threshold.
+
+    The most severe alerts are listed, as many as fit in ``max_length`` (the input guardrail's
+    limit). The rest are counted in one closing line, so a broad stockout still reaches the agents.
+    """
+    ranked = sorted(alerts, key=lambda a: (RISK_LEVELS.index(a.risk_level), a.days_of_supply))
+    # Every line is longer than this, which bounds how many can fit
+    shown = min(len(ranked), max_length // 60)
+    query = _compose_alert_query(ranked, shown)
+    while shown and len(query) > max_length:
+        shown -= 1
+        query = _compose_alert_query(ranked, shown)
+    return query
+
+
+def _compose_alert_query(ranked: list[InventoryAlert], shown: int) -> str:
+    lines = [
+        f"- {a.product_name} ({a.product_id}): {a.risk_level} risk, stock {a.current_stock} "
+        f"(reorder point {a.reorder_point}), days of supply: {format_days(a.days_of_supply)}"
+        for a in ranked[:shown]
+    ]
+    rest = ranked[shown:]
+    if rest:
+        counts = ", ".join(f"{n} {level}" for level in RISK_LEVELS
+                           if (n := sum(a.risk_level == level for a in rest)))
+        lines.append(f"- ...and {len(rest)} more products ({counts}); use scan_inventory_risk for the full list")
+    return (
+        "Stockout risk alert. The following products just crossed the inventory risk threshold:\n"
+        + "\n".join(lines)
+        + "\nAssess the stockout risk for these products and recommend reorder actions."
+    )
+
+
+def run_workflow_for_alerts(alerts: list[InventoryAlert]) -> str:
+    """Default alert handler: run the agent workflow on the alerted SKUs and print its report."""
+    from src.graph.checkpoint import invoke_run
+    from src.registry import get_registry
+
+    result = invoke_run(get_registry().workflow(), alert_query(alerts))
+    print(result["final_report"], flush=True)
+    return result["final_report"]
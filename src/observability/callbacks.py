@@ -1,36 +1,146 @@
 import logging
-import time
 from typing import Any
 from langchain_core.callbacks import BaseCallbackHandler
+from src.observability.metrics import MetricsRegistry, Timer, get_metrics
 
 logger = logging.getLogger("scia")
 
+LATENCY_HELP = {
+    "run_latency_seconds": "Workflow run latency",
+    "node_latency_seconds": "Graph node latency",
+    "agent_latency_seconds": "Agent (ReAct loop) latency",
+    "tool_latency_seconds": "Tool call latency",
+    "llm_latency_seconds": "LLM call latency",
+}
+
 
 class AgentTraceCallback(BaseCallbackHandler):
-    """Logs agent activity for observability and debugging."""
+    """Logs agent activity and records it as metrics.
+
+    Latency histograms are kept per workflow run, graph node, agent, tool and LLM call,
+    with counters for prompt/completion tokens, LLM cache hits and errors. Attached to
+    every compiled workflow by build_workflow().
+    """
+
+    def __init__(self, metrics: MetricsRegistry | None = None, agent_names: list[str] | None = None,
+                 export_path: str | None = None):
+        self.metrics = metrics or get_metrics()
+        self.agent_names = set(agent_names or [])
+        self.export_path = export_path
+        self._timers: dict[str, Timer] = {}
+
+    def _start(self, run_id, metric: str | None = None, **labels):
+        self._timers[str(run_id)] = Timer(self.metrics, metric, help=LATENCY_HELP.get(metric, ""), **labels)
 
-    def __init__(self):
-        self.start_times: dict[str, float] = {}
+    def _finish(self, run_id) -> float:
+        timer = self._timers.pop(str(run_id), None)
+        return timer.stop() if timer else 0.0
 
-    def on_chain_start(self, serialized: dict[str, Any], inputs: dict[str, Any], *, run_id, **kwargs):
-        name = serialized.get("name", "unknown")
-        self.start_times[str(run_id)] = time.time()
-        logger.info(f"[START] {name} (run_id={run_id})")
+    def _label(self, run_id, name: str) -> str:
+        timer = self._timers.get(str(run_id))
+        return timer.labels.get(name, "unknown") if timer else "unknown"
 
-    def on_chain_end(self, outputs: dict[str, Any], *, run_id, **kwargs):
-        elapsed = time.time() - self.start_times.pop(str(run_id), time.time())
-        logger.info(f"[END] run_id={run_id} ({elapsed:.2f}s)")
+    def on_chain_start(self, serialized: dict[str, Any], inputs: dict[str, Any], *, run_id, parent_run_id=None,
+                       tags=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        metadata = metadata or {}
+        tags = tags or []
+        if parent_run_id is None:
+            self._start(run_id, "run_latency_seconds")
+        elif any(t.startswith("graph:step:") for t in tags) and "|" not in metadata.get("langgraph_checkpoint_ns", ""):
+            self._start(run_id, "node_latency_seconds", node=name)
+        elif name in self.agent_names and not any(t.startswith(("graph:step:", "seq:step:")) for t in tags):
+            self._start(run_id, "agent_latency_seconds", agent=name)
+        else:
+            self._start(run_id)
+        logger.debug(f"[START] {name} (run_id={run_id})")
+
+    def on_chain_end(self, outputs: dict[str, Any], *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None and isinstance(outputs, dict) and outputs.get("report_path"):
+            # Label the run with how its report was produced, so the paths' latencies compare
+            timer = self._timers.get(str(run_id))
+            if timer:
+                timer.labels["path"] = outputs["report_path"]
+        elapsed = self._finish(run_id)
+        logger.debug(f"[END] run_id={run_id} ({elapsed:.2f}s)")
+        if parent_run_id is None:
+            self.metrics.inc("runs_total", help="Workflow runs", status="ok")
+            self._export()
+
+    def on_chain_error(self, error: BaseException, *, run_id, parent_run_id=None, **kwargs):
+        self._finish(run_id)
+        if parent_run_id is None:
+            self.metrics.inc("runs_total", help="Workflow runs", status="error")
+            self._export()
 
     def on_tool_start(self, serialized: dict[str, Any], input_str: str, *, run_id, **kwargs):
-        tool_name = serialized.get("name", "unknown")
+        tool_name = (serialized or {}).get("name", "unknown")
+        self._start(run_id, "tool_latency_seconds", tool=tool_name)
         logger.info(f"[TOOL] {tool_name} called (run_id={run_id})")
 
     def on_tool_end(self, output: str, *, run_id, **kwargs):
+        self._finish(run_id)
         preview = output[:200] if isinstance(output, str) else str(output)[:200]
         logger.info(f"[TOOL_RESULT] run_id={run_id}: {preview}")
 
+    def on_chat_model_start(self, serialized: dict[str, Any], messages, *, run_id, metadata=None, **kwargs):
+        self._start_llm(run_id, metadata, kwargs.get("invocation_params") or {})
+
+    def on_llm_start(self, serialized: dict[str, Any], prompts, *, run_id, metadata=None, **kwargs):
+        self._start_llm(run_id, metadata, kwargs.get("invocation_params") or {})
+
+    def _start_llm(self, run_id, metadata, params):
+        metadata = metadata or {}
+        model = params.get("model") or params.get("model_name") or params.get("_type", "unknown")
+        # The top-level graph node the call belongs to (an agent's inner nodes report their parent)
+        node = metadata.get("langgraph_checkpoint_ns", "").split(":")[0] or metadata.get("langgraph_node", "")
+        self._start(run_id, "llm_latency_seconds", model=model, node=node)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        model = self._label(run_id, "model")
+        self._finish(run_id)
+        generations = [g for batch in response.generations for g in batch]
+        if any((g.generation_info or {}).get("cache_hit") for g in generations):
+            self.metrics.inc("llm_cache_hits_total", help="LLM calls answered from the response cache", model=model)
+            return
+        self.metrics.inc("llm_requests_total", help="LLM calls sent to the provider", model=model)
+        prompt_tokens, completion_tokens = _token_counts(response, generations)
+        if prompt_tokens:
+            self.metrics.inc("llm_tokens_total", prompt_tokens, help="LLM tokens", model=model, type="prompt")
+        if completion_tokens:
+            self.metrics.inc("llm_tokens_total", completion_tokens, help="LLM tokens", model=model, type="completion")
+
     def on_llm_error(self, error: BaseException, *, run_id, **kwargs):
+        model = self._label(run_id, "model")
+        self._finish(run_id)
+        self.metrics.inc("llm_errors_total", help="Failed LLM calls", model=model)
         logger.error(f"[LLM_ERROR] run_id={run_id}: {error}")
 
     def on_tool_error(self, error: BaseException, *, run_id, **kwargs):
+        tool = self._label(run_id, "tool")
+        self._finish(run_id)
+        self.metrics.inc("tool_errors_total", help="Failed tool calls", tool=tool)
         logger.error(f"[TOOL_ERROR] run_id={run_id}: {error}")
+
+    def _export(self):
+        if not self.export_path:
+            return
+        try:
+            if self.export_path.endswith(".json"):
+                self.metrics.write_json(self.export_path)
+            else:
+                self.metrics.write_prometheus(self.export_path)
+        except OSError as e:
+            logger.warning(f"[METRICS] could not write {self.export_path}: {e}")
+
+
+def _token_counts(response, generations) -> tuple[int, int]:
+    prompt = completion = 0
+    for generation in generations:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        prompt += usage.get("input_tokens", 0)
+        completion += usage.get("output_tokens", 0)
+    if not (prompt or completion):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt, completion = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    return prompt, completion
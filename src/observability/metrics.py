@@ -0,0 +1,283 @@
+"""In-process metrics: counters and latency histograms, exported as Prometheus text or JSON."""
+import json
+import os
+import threading
+import time
+import logging
+from typing import Callable
+
+logger = logging.getLogger("scia")
+
+# Upper bounds in seconds; fine below 1s for tools and guardrails, coarse above for LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for i, upper in enumerate((*self.buckets, self.max)):
+            in_bucket = self.counts[i]
+            if in_bucket and seen + in_bucket >= rank:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / in_bucket
+            seen += in_bucket
+            lower = upper
+        return self.max
+
+
+class MetricsRegistry:
+    """Thread-safe store of named counters and histograms with string labels.
+
+    Collectors are callables run at export time that return ``(name, labels, value)`` gauge
+    samples, for numbers kept elsewhere (e.g. the LLM cache's hit counters).
+    """
+
+    def __init__(self, prefix: str = "scia"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._help: dict[str, str] = {}
+        self._collectors: list[Callable[[], list[tuple[str, dict, float]]]] = []
+
+    def inc(self, name: str, amount: float = 1, help: str = "", **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    def add_collector(self, collector: Callable[[], list[tuple[str, dict, float]]]) -> None:
+        self._collectors.append(collector)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _gauges(self) -> list[tuple[str, Labels, float]]:
+        samples = []
+        for collector in self._collectors:
+            try:
+                samples += [(name, _labels(labels), value) for name, labels, value in collector()]
+            except Exception as e:
+                logger.debug(f"[METRICS] collector failed: {e}")
+        return samples
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = f"{self.prefix}_{name}"
+                lines += _header(full, "counter", self._help.get(name))
+                lines += [f"{full}{_format(labels)} {value:g}" for labels, value in sorted(series.items())]
+            for name, series in sorted(self._histograms.items()):
+                full = f"{self.prefix}_{name}"
+                lines += _header(full, "histogram", self._help.get(name))
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else f"{bound:g}"
+                        lines.append(f"{full}_bucket{_format((*labels, ('le', le)))} {cumulative}")
+                    lines.append(f"{full}_sum{_format(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{full}_count{_format(labels)} {histogram.count}")
+        gauges: dict[str, list] = {}
+        for name, labels, value in self._gauges():
+            gauges.setdefault(name, []).append((labels, value))
+        for name, series in sorted(gauges.items()):
+            full = f"{self.prefix}_{name}"
+            lines += _header(full, "gauge", None)
+            lines += [f"{full}{_format(labels)} {value:g}" for labels, value in series]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """JSON-friendly summary: counter values and count/mean/p50/p95/p99/max per histogram series."""
+        out = {"counters": {}, "histograms": {}, "gauges": {}}
+        with self._lock:
+            for name, series in self._counters.items():
+                out["counters"][name] = {_key(labels): value for labels, value in series.items()}
+            for name, series in self._histograms.items():
+                out["histograms"][name] = {
+                    _key(labels): {
+                        "count": h.count,
+                        "mean": round(h.sum / h.count, 4) if h.count else 0.0,
+                        "p50": round(h.quantile(0.50), 4),
+                        "p95": round(h.quantile(0.95), 4),
+                        "p99": round(h.quantile(0.99), 4),
+                        "max": round(h.max, 4),
+                    }
+                    for labels, h in series.items()
+                }
+        for name, labels, value in self._gauges():
+            out["gauges"].setdefault(name, {})[_key(labels)] = value
+        return out
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the text format atomically, for node_exporter's textfile collector."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve /metrics (Prometheus) and /metrics.json from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, content_type = json.dumps(registry.summary()).encode(), "application/json"
+                elif self.path.startswith("/metrics"):
+                    body, content_type = registry.to_prometheus().encode(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="scia-metrics", daemon=True).start()
+        logger.info(f"[METRICS] serving on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+class Timer:
+    """Records a duration into a histogram, as a context manager or between start and stop().
+
+    Without a name it only measures.
+    """
+
+    def __init__(self, registry: MetricsRegistry, name: str | None = None, help: str = "", **labels):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def stop(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        if self.name:
+            self.registry.observe(self.name, elapsed, help=self.help, **self.labels)
+        return elapsed
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _key(labels: Labels) -> str:
+    return ",".join(f"{k}={v}" for k, v in labels) or "all"
+
+
+def _header(name: str, kind: str, help: str | None) -> list[str]:
+    return ([f"# HELP {name} {help}"] if help else []) + [f"# TYPE {name} {kind}"]
+
+
+_metrics = MetricsRegistry()
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    return _metrics
+
+
+def start_exporters() -> None:
+    """Start the configured exporters once: the METRICS_PORT endpoint and the built-in collectors."""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    from src.config import METRICS_PORT
+    _metrics.add_collector(_runtime_gauges)
+    if METRICS_PORT:
+        try:
+            _metrics.serve(METRICS_PORT)
+        except OSError as e:
+            logger.warning(f"[METRICS] could not listen on port {METRICS_PORT}: {e}")
+
+
+def _runtime_gauges() -> list[tuple[str, dict, float]]:
+    """LLM cache and rate limiter counters, read at export time."""
+    from src import cache
+    samples = []
+    if cache._llm_cache is not None:
+        store = cache._llm_cache.store
+        samples += [("llm_cache_store_hits", {}, store.hits), ("llm_cache_store_misses", {}, store.misses)]
+    from src.ratelimit import _limiters
+    for provider, limiter in list(_limiters.items()):
+        stats = limiter.stats()
+        samples += [
+            ("rate_limiter_throttled", {"provider": provider}, stats["throttled"]),
+            ("rate_limiter_wait_seconds", {"provider": provider}, stats["waited_seconds"]),
+        ]
+    return samples
@@ -0,0 +1,229 @@
+"""Client-side rate limiting shared by every LLM call to a provider."""
+import asyncio
+import threading
+import time
+import logging
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+logger = logging.getLogger("scia")
+
+DEFAULT_RETRY_AFTER = 5.0  # seconds to pause when a 429 carries no Retry-After header
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``per_minute`` units per minute, holding up to one minute's worth.
+
+    The level may go negative when usage is debited after the fact (token counts are only
+    known once a response arrives); new requests then wait until it is positive again.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        if now <= self.updated:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (call refill first)."""
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def set_rate(self, per_minute: float) -> None:
+        self.rate = per_minute / 60.0
+
+
+class AdaptiveRateLimiter(BaseRateLimiter):
+    """Requests-per-minute and tokens-per-minute limiter for one provider, with adaptive concurrency.
+
+    Every model built by ``get_llm`` for the provider shares the instance, so parallel agent
+    branches draw from the same budget. When the provider throttles, all callers pause until
+    its ``Retry-After`` has passed and the number of calls allowed in flight is halved; each
+    successful call then raises it by one (AIMD) until it is back where it was when throttled.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 check_every_n_seconds: float = 0.05):
+        self.provider = provider
+        self.check_every_n_seconds = check_every_n_seconds
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._blocked_until = 0.0
+        # Calls that acquired a slot and have not reported back yet; cache hits never acquire
+        self._in_flight = 0
+        self._window: int | None = None
+        self._ceiling = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def _reserve(self) -> float:
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._window is not None and self._in_flight >= self._window:
+                return self.check_every_n_seconds
+            wait = 0.0
+            if self._requests:
+                self._requests.refill(now)
+                wait = self._requests.wait_time(1)
+            if self._tokens:
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.wait_time(1e-9))
+            if wait:
+                return wait
+            if self._requests:
+                self._requests.level -= 1
+            self._in_flight += 1
+            return 0.0
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            if not blocking:
+                return False
+            time.sleep(min(max(wait, self.check_every_n_seconds), 1.0))
+        self.waited_seconds += time.monotonic() - started
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            if not blocking:
+                return False
+            await asyncio.sleep(min(max(wait, self.check_every_n_seconds), 1.0))
+        self.waited_seconds += time.monotonic() - started
+        return True
+
+    def record_usage(self, tokens: int) -> None:
+        """Debit the tokens a completed call used and widen the concurrency window."""
+        with self._lock:
+            if not self._in_flight:
+                return
+            self._in_flight -= 1
+            if self._tokens and tokens:
+                self._tokens.refill(time.monotonic())
+                self._tokens.level -= tokens
+            if self._window is not None:
+                self._window += 1
+                if self._window >= self._ceiling:
+                    self._window = None
+
+    def record_throttle(self, retry_after: float | None = None) -> float:
+        """Pause all callers and halve the concurrency window after a 429; return the pause in seconds."""
+        pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+        with self._lock:
+            now = time.monotonic()
+            if self._window is None:
+                self._ceiling = self._window = max(self._in_flight, 1)
+            self._window = max(1, self._window // 2)
+            self._in_flight = max(0, self._in_flight - 1)
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, now + pause)
+            if self._requests:
+                # No burst when the pause ends: refill starts then, from at most one request
+                self._requests.updated = self._blocked_until
+                self._requests.level = min(self._requests.level, 1.0)
+            window = self._window
+        logger.warning(f"[RATE_LIMIT] {self.provider} throttled; pausing {pause:.1f}s, "
+                       f"at most {window} call(s) in flight")
+        return pause
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "in_flight": self._in_flight,
+                "concurrency_window": self._window,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Feeds token usage and 429 responses of a chat model back into its rate limiter."""
+
+    def __init__(self, limiter: AdaptiveRateLimiter):
+        self.limiter = limiter
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        # LangChain reports cache hits here too, but they never acquired a slot or reached the provider
+        if _cache_hit(response):
+            return
+        self.limiter.record_usage(_total_tokens(response))
+
+    def on_llm_error(self, error: BaseException, **kwargs) -> None:
+        if is_rate_limit_error(error):
+            self.limiter.record_throttle(retry_after_seconds(error))
+        else:
+            self.limiter.record_failure()
+
+
+def _cache_hit(response) -> bool:
+    return any((generation.generation_info or {}).get("cache_hit")
+               for generations in response.generations for generation in generations)
+
+
+def _total_tokens(response) -> int:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    total = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            total += metadata.get("total_tokens", 0)
+    return total
+
+
+def _status_code(error: BaseException) -> int | None:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for HTTP 429 errors raised by the provider SDKs."""
+    if _status_code(error) == 429:
+        return True
+    return type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Seconds from the ``Retry-After`` header of a throttled response, if present."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> AdaptiveRateLimiter:
+    """Process-wide limiter for a provider, configured from LLM_RPM and LLM_TPM."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        from src.config import LLM_RPM, LLM_TPM
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limiter = _limiters[provider] = AdaptiveRateLimiter(provider, LLM_RPM, LLM_TPM)
+    return limiter
@@ -0,0 +1,125 @@
+"""Process-wide registry of the compiled workflow, pre-built agents and shared LLM clients."""
+import threading
+import time
+import logging
+
+logger = logging.getLogger("scia")
+
+
+class Registry:
+    """Builds expensive objects once per process and hands out the shared instances.
+
+    LLM clients are pooled per (provider, model, temperature), so their HTTP connections
+    stay alive across requests. Agents and compiled workflows are built on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._llms: dict[tuple, object] = {}
+        self._agents: dict[tuple[str, str], object] = {}
+        self._workflows: dict[tuple, object] = {}
+
+    def llm(self, temperature: float = 0.0, model: str | None = None):
+        from src import config
+        key = (config.LLM_PROVIDER, model or _model_name(), temperature)
+        llm = self._llms.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._llms.get(key)
+                if llm is None:
+                    llm = self._llms[key] = config.get_llm(temperature=temperature, model=model)
+        return llm
+
+    def agent(self, name: str, mode: str | None = None):
+        """The named agent, built for ``mode`` ("react" or "prefetched"; AGENT_MODE if unset)."""
+        from src import config
+        key = (name, mode or config.AGENT_MODE)
+        agent = self._agents.get(key)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(key)
+                if agent is None:
+                    agent = self._agents[key] = _agent_factories()[name](mode=key[1])
+        return agent
+
+    def workflow(self, **options):
+        key = tuple(sorted(options.items()))
+        graph = self._workflows.get(key)
+        if graph is None:
+            with self._lock:
+                graph = self._workflows.get(key)
+                if graph is None:
+                    from src.graph.workflow import build_workflow
+                    graph = self._workflows[key] = build_workflow(**options)
+        return graph
+
+    def warm_up(self, **workflow_options) -> dict[str, float]:
+        """Load the dataset and its aggregates, and build the LLM client, agents and workflow ahead of the first request."""
+        from src.config import SYNTHESIS_MODEL
+        from src.tools.data_loader import _store
+        timings = {}
+        steps = [
+            ("dataset", lambda: _store().load()),
+            ("aggregates", lambda: _store().aggregates()),
+            ("llm", self.llm),
+            *([("llm:synthesis", lambda: self.llm(model=SYNTHESIS_MODEL))] if SYNTHESIS_MODEL else []),
+            *((f"agent:{name}", lambda name=name: self.agent(name, workflow_options.get("agent_mode")))
+              for name in _agent_factories()),
+            ("workflow", lambda: self.workflow(**workflow_options)),
+        ]
+        for step, fn in steps:
+            started = time.perf_counter()
+            fn()
+            timings[step] = round(time.perf_counter() - started, 3)
+        logger.info(f"[REGISTRY] warm-up done: {timings}")
+        return timings
+
+    def health(self) -> dict:
+        """Snapshot of what is built and whether the dataset can be read."""
+        status = {
+            "workflows": len(self._workflows),
+            "agents": [f"{name}:{mode}" for name, mode in sorted(self._agents)],
+            "llm_clients": [f"{p}:{m}@{t}" for p, m, t in self._llms],
+        }
+        try:
+            from src.tools.data_loader import _store
+            store = _store()
+            status["dataset"] = {"path": store.path, "format": store.backend.format, "version": list(store.version)}
+            status["ok"] = True
+        except Exception as e:
+            status["dataset"] = {"error": str(e)}
+            status["ok"] = False
+        from src import config
+        from src.ratelimit import get_rate_limiter
+        status["rate_limiter"] = get_rate_limiter(config.LLM_PROVIDER).stats()
+        return status
+
+
+def _model_name() -> str:
+    from src import config
+    return {
+        "openai": config.OPENAI_MODEL,
+        "anthropic": config.ANTHROPIC_MODEL,
+        "groq": config.GROQ_MODEL,
+    }.get(config.LLM_PROVIDER, config.OLLAMA_MODEL)
+
+
+def _agent_factories():
+    from src.agents import create_demand_analyst, create_inventory_monitor, create_supplier_analyst
+    return {
+        "demand_analyst": create_demand_analyst,
+        "inventory_monitor": create_inventory_monitor,
+        "supplier_analyst": create_supplier_analyst,
+    }
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def get_shared_llm(temperature: float = 0.0, model: str | None = None):
+    """Pooled chat model for the configured provider and temperature; ``model`` overrides the configured model."""
+    return _registry.llm(temperature, model=model)
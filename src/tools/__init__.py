@@ -1,10 +1,58 @@
-from src.tools.data_loader import query_sales_data, get_product_list, get_latest_inventory, get_supplier_summary
-from src.tools.forecasting import forecast_demand, calculate_days_of_supply
-from src.tools.search import web_search
-from src.tools.report_generator import generate_report
-
-DEMAND_TOOLS = [query_sales_data, get_product_list, forecast_demand, generate_report]
-INVENTORY_TOOLS = [get_latest_inventory, get_product_list, calculate_days_of_supply, generate_report]
-SUPPLIER_TOOLS = [get_supplier_summary, query_sales_data, web_search, generate_report]
-ALL_TOOLS = [query_sales_data, get_product_list, get_latest_inventory, get_supplier_summary,
-             forecast_demand, calculate_days_of_supply, web_search, generate_report]
+"""Agent tools and the per-agent tool lists.
+
+The tool modules (and pandas with them) are imported on first access to a tool or list, so
+importing a submodule such as src.tools.results or src.tools.search stays cheap.
+"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.tools.data_loader import query_sales_data, get_product_list, get_latest_inventory, get_supplier_summary
+    from src.tools.forecasting import (
+        forecast_demand, forecast_all_products, calculate_days_of_supply, scan_inventory_risk,
+    )
+    from src.tools.search import web_search
+    from src.tools.report_generator import generate_report
+
+    DEMAND_TOOLS: list
+    INVENTORY_TOOLS: list
+    SUPPLIER_TOOLS: list
+    ALL_TOOLS: list
+
+
+def _load() -> dict:
+    from src.tools.data_loader import query_sales_data, get_product_list, get_latest_inventory, get_supplier_summary
+    from src.tools.forecasting import (
+        forecast_demand, forecast_all_products, calculate_days_of_supply, scan_inventory_risk,
+    )
+    from src.tools.search import web_search
+    from src.tools.report_generator import generate_report
+    from src.tools.async_support import add_async
+
+    all_tools = [query_sales_data, get_product_list, get_latest_inventory, get_supplier_summary,
+                 forecast_demand, forecast_all_products, calculate_days_of_supply, scan_inventory_risk,
+                 web_search, generate_report]
+    for tool in all_tools:
+        add_async(tool)
+    return {
+        **{tool.name: tool for tool in all_tools},
+        "DEMAND_TOOLS": [query_sales_data, get_product_list, forecast_demand, forecast_all_products, generate_report],
+        "INVENTORY_TOOLS": [get_latest_inventory, get_product_list, calculate_days_of_supply, scan_inventory_risk,
+                            generate_report],
+        "SUPPLIER_TOOLS": [get_supplier_summary, query_sales_data, web_search, generate_report],
+        "ALL_TOOLS": all_tools,
+    }
+
+
+_EXPORTS = {
+    "query_sales_data", "get_product_list", "get_latest_inventory", "get_supplier_summary",
+    "forecast_demand", "forecast_all_products", "calculate_days_of_supply", "scan_inventory_risk",
+    "web_search", "generate_report", "DEMAND_TOOLS", "INVENTORY_TOOLS", "SUPPLIER_TOOLS", "ALL_TOOLS",
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    exports = _load()
+    globals().update(exports)
+    return exports[name]
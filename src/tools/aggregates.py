@@ -0,0 +1,183 @@
+"""Precomputed per-product and per-supplier tables, persisted in a sidecar file next to the dataset.
+
+The sidecar is tagged with the source's fingerprint (mtime/size) and a content hash, so the
+data tools can answer inventory and supplier questions from it without reading the history,
+and it is rebuilt only when the source data changes. A sidecar copied along with its dataset
+(e.g. built into a container image) stays valid, because the hash still matches.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from src.tools.storage import COLUMNS, StorageBackend, open_backend
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger("scia")
+
+# Bump when the tables change, so older sidecars are rebuilt
+SIDECAR_VERSION = 1
+# Days of sales averaged into the trailing sales rate
+TRAILING_DAYS = 7
+# Product names listed per supplier in the supplier summary
+MAX_LISTED_PRODUCTS = 10
+
+INVENTORY_COLUMNS = ["product_id", "product_name", "date", "stock_level", "reorder_point", "supplier", "lead_time_days"]
+
+
+@dataclass
+class Aggregates:
+    """Derived tables for one version of the dataset. Shared between callers: treat as read-only."""
+
+    # product_id, product_name in dataset order
+    products: pd.DataFrame
+    # INVENTORY_COLUMNS from each product's latest row, plus its trailing avg_daily_sales, by product_id
+    latest: pd.DataFrame
+    # supplier, product_count, avg_lead_time_days, avg_unit_cost, products
+    suppliers: pd.DataFrame
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        return {"products": self.products, "latest": self.latest, "suppliers": self.suppliers}
+
+
+def build_aggregates(df: pd.DataFrame) -> Aggregates:
+    """Compute the tables from the full dataset in (product_id, date) order."""
+    import pandas as pd
+
+    products = df[["product_id", "product_name"]].drop_duplicates().reset_index(drop=True)
+
+    # Rows are already date-sorted within each product, so the latest snapshot is each product's last row
+    latest = df.groupby("product_id", sort=False).tail(1)[INVENTORY_COLUMNS].reset_index(drop=True)
+    trailing = df.groupby("product_id", sort=False).tail(TRAILING_DAYS).groupby("product_id")["quantity_sold"].mean()
+    latest["avg_daily_sales"] = trailing.reindex(latest["product_id"]).to_numpy()
+
+    rows = []
+    for supplier, group in df.groupby("supplier"):
+        names = group["product_name"].unique().tolist()
+        listed = "; ".join(names[:MAX_LISTED_PRODUCTS])
+        if len(names) > MAX_LISTED_PRODUCTS:
+            listed += f" (+{len(names) - MAX_LISTED_PRODUCTS} more)"
+        rows.append({
+            "supplier": supplier,
+            "product_count": len(names),
+            "avg_lead_time_days": group["lead_time_days"].mean(),
+            "avg_unit_cost": group["unit_cost"].mean(),
+            "products": listed,
+        })
+    suppliers = pd.DataFrame(rows, columns=["supplier", "product_count", "avg_lead_time_days", "avg_unit_cost",
+                                            "products"])
+    return Aggregates(products=products, latest=latest, suppliers=suppliers)
+
+
+def sidecar_path(path: str) -> str:
+    """``data/sales.csv`` -> ``data/sales.aggregates.json``; directories get the suffix appended."""
+    path = path.rstrip("/\\")
+    root, ext = os.path.splitext(path)
+    return f"{root if ext and not os.path.isdir(path) else path}.aggregates.json"
+
+
+def content_digest(path: str) -> str:
+    """SHA-256 of the dataset's bytes (all files under a directory, in path order)."""
+    digest = hashlib.sha256()
+    if os.path.isfile(path):
+        files = [path]
+    else:
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    for file in files:
+        digest.update(os.path.relpath(file, path).encode())
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode(df: pd.DataFrame) -> dict:
+    return json.loads(df.to_json(orient="split", index=False, date_format="iso", double_precision=15))
+
+
+def _decode(table: dict) -> pd.DataFrame:
+    import pandas as pd
+
+    df = pd.DataFrame(table["data"], columns=table["columns"])
+    if "date" in df:
+        df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
+    return df
+
+
+def read_sidecar(backend: StorageBackend) -> Aggregates | None:
+    """The sidecar's tables if it was built from the current data, else None."""
+    path = sidecar_path(backend.path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            sidecar = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"[AGGREGATES] ignoring unreadable {path}: {e}")
+        return None
+    source = sidecar.get("source", {})
+    if sidecar.get("version") != SIDECAR_VERSION:
+        return None
+    fingerprint = list(backend.fingerprint())
+    if source.get("fingerprint") != fingerprint:
+        # Copying or checking out the dataset changes its mtime but not its content
+        if source.get("sha256") != content_digest(backend.path):
+            return None
+        sidecar["source"]["fingerprint"] = fingerprint
+        _write(path, sidecar)
+    try:
+        tables = {name: _decode(table) for name, table in sidecar["tables"].items()}
+        return Aggregates(**tables)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"[AGGREGATES] ignoring malformed {path}: {e}")
+        return None
+
+
+def write_sidecar(backend: StorageBackend, aggregates: Aggregates, fingerprint: tuple[int, ...]) -> str | None:
+    """Persist the tables next to the dataset. Returns the path, or None if it could not be written."""
+    path = sidecar_path(backend.path)
+    sidecar = {
+        "version": SIDECAR_VERSION,
+        "source": {"fingerprint": list(fingerprint), "sha256": content_digest(backend.path)},
+        "tables": {name: _encode(table) for name, table in aggregates.tables().items()},
+    }
+    return path if _write(path, sidecar) else None
+
+
+def _write(path: str, sidecar: dict) -> bool:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except OSError as e:
+        logger.warning(f"[AGGREGATES] could not write {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed aggregates sidecar for a dataset")
+    parser.add_argument("path", help="Dataset: CSV file, or Parquet / Arrow IPC file or directory")
+    parser.add_argument("--format", choices=("csv", "parquet", "ipc"), help="Storage format (inferred if omitted)")
+    args = parser.parse_args()
+    backend = open_backend(args.path, args.format)
+    fingerprint = backend.fingerprint()
+    df = backend.scan(columns=COLUMNS).sort_values(["product_id", "date"], kind="stable", ignore_index=True)
+    path = write_sidecar(backend, build_aggregates(df), fingerprint)
+    if path is None:
+        raise SystemExit(1)
+    print(f"Wrote aggregates for {df['product_id'].nunique()} products to {path}")
+
+
+if __name__ == "__main__":
+    main()
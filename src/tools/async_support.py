@@ -0,0 +1,20 @@
+"""Async entry points for the synchronous tools."""
+import asyncio
+from langchain_core.tools import StructuredTool
+
+
+def add_async(tool: StructuredTool) -> StructuredTool:
+    """Give a sync tool a coroutine that runs it in a worker thread.
+
+    ``ainvoke`` then awaits the coroutine instead of blocking the event loop; context
+    variables (such as the run's tool result table) are carried into the thread.
+    Tools that already define a coroutine are left unchanged.
+    """
+    if tool.coroutine is None:
+        func = tool.func
+
+        async def coroutine(*args, **kwargs):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+        tool.coroutine = coroutine
+    return tool
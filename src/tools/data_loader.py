@@ -1,58 +1,94 @@
-import pandas as pd
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from langchain_core.tools import tool
-from src.config import DATA_DIR
-import os
+from src.config import DATA_PATH, DATA_FORMAT, TOOL_OUTPUT_TOKEN_BUDGET
+from src.tools.aggregates import INVENTORY_COLUMNS
+from src.tools.dataset import DatasetStore, get_store
+from src.tools.formatting import dense_csv, estimate_tokens, fit_lines, paged_table, split_constants, split_lookup
+from src.tools.results import shared_result
 
-_DATA_PATH = os.path.join(DATA_DIR, "sample_data.csv")
+if TYPE_CHECKING:
+    import pandas as pd
+
+_DATA_PATH = DATA_PATH
+
+
+def _store() -> DatasetStore:
+    return get_store(_DATA_PATH, DATA_FORMAT)
 
 
 def _load_df() -> pd.DataFrame:
-    df = pd.read_csv(_DATA_PATH, parse_dates=["date"])
-    return df
+    """Return the cached dataset. The frame is shared, so callers must not mutate it."""
+    return _store().df
 
 
 @tool
-def query_sales_data(product_id: str | None = None, supplier: str | None = None) -> str:
+@shared_result
+def query_sales_data(product_id: str | None = None, supplier: str | None = None, page: int = 1) -> str:
     """Query supply chain sales data. Optionally filter by product_id (e.g. 'P001') or supplier (e.g. 'SupplierA').
-    Returns a summary table of matching records."""
-    df = _load_df()
-    if product_id:
-        df = df[df["product_id"] == product_id]
-    if supplier:
-        df = df[df["supplier"] == supplier]
+    Returns per-product and weekly summaries plus the daily records as compact CSV.
+    Large results are split into pages: pass page=2, 3, ... to see more daily records."""
+    df = _store().query(product_id=product_id or None, supplier=supplier or None)
     if df.empty:
         return "No data found for the given filters."
-    return df.to_string(index=False)
+    budget = TOOL_OUTPUT_TOKEN_BUDGET
+    overview = [
+        f"{len(df)} sales records for {df['product_id'].nunique()} product(s), "
+        f"{df['date'].min():%Y-%m-%d} to {df['date'].max():%Y-%m-%d}."
+    ]
+    lookup, rows = split_lookup(df, "product_id")
+    if not lookup.empty:
+        overview += ["", "Products:", *fit_lines(dense_csv(lookup), budget // 6, "products")]
+    stats = df.groupby("product_id", sort=False)["quantity_sold"].agg(["sum", "min", "max", "mean"]).reset_index()
+    stats.columns = ["product_id", "total_sold", "min_daily", "max_daily", "mean_daily"]
+    overview += ["", "Quantity sold per product:", *fit_lines(dense_csv(stats), budget // 6, "products")]
+    weekly = df.set_index("date")["quantity_sold"].resample("W-MON", label="left", closed="left").sum()
+    weekly = weekly.iloc[::-1].rename_axis("week_start").reset_index()
+    overview += ["", "Weekly quantity sold (most recent first):", *fit_lines(dense_csv(weekly), budget // 8, "weeks")]
+    overview = "\n".join(overview)
+
+    constants, rows = split_constants(rows)
+    title = "Daily records" + (f" ({', '.join(f'{k}={v}' for k, v in constants.items())})" if constants else "") + ":"
+    table = paged_table(rows, page, budget - estimate_tokens(overview), "daily records")
+    if page > 1:
+        return f"{title}\n{table}"
+    return f"{overview}\n\n{title}\n{table}"
 
 
 @tool
-def get_product_list() -> str:
-    """Get a list of all products in the supply chain dataset with their IDs and names."""
-    df = _load_df()
-    products = df[["product_id", "product_name"]].drop_duplicates()
-    return products.to_string(index=False)
+@shared_result
+def get_product_list(page: int = 1) -> str:
+    """Get a list of all products in the supply chain dataset with their IDs and names.
+    Long lists are split into pages: pass page=2, 3, ... to see more."""
+    products = _store().aggregates().products
+    table = paged_table(products, page, TOOL_OUTPUT_TOKEN_BUDGET, "products")
+    return f"{len(products)} products:\n{table}"
 
 
 @tool
-def get_latest_inventory(product_id: str | None = None) -> str:
+@shared_result
+def get_latest_inventory(product_id: str | None = None, page: int = 1) -> str:
     """Get the most recent inventory snapshot for each product. Optionally filter by product_id.
-    Shows stock_level, reorder_point, supplier, and lead_time_days."""
-    df = _load_df()
+    Shows stock_level, reorder_point, supplier, and lead_time_days.
+    Large results are split into pages: pass page=2, 3, ... to see more products."""
+    latest = _store().aggregates().latest[INVENTORY_COLUMNS]
     if product_id:
-        df = df[df["product_id"] == product_id]
-    latest = df.sort_values("date").groupby("product_id").last().reset_index()
-    cols = ["product_id", "product_name", "date", "stock_level", "reorder_point", "supplier", "lead_time_days"]
-    return latest[cols].to_string(index=False)
+        latest = latest[latest["product_id"] == product_id]
+    if latest.empty:
+        return "No data found for the given filters."
+    below = int((latest["stock_level"] <= latest["reorder_point"]).sum())
+    head = f"Latest inventory for {len(latest)} product(s); {below} at or below reorder point."
+    constants, table = split_constants(latest)
+    if constants:
+        head += "\nSame for all rows: " + ", ".join(f"{k}={v}" for k, v in constants.items())
+    return f"{head}\n{paged_table(table, page, TOOL_OUTPUT_TOKEN_BUDGET - estimate_tokens(head), 'products')}"
 
 
 @tool
-def get_supplier_summary() -> str:
-    """Get a summary of all suppliers including products supplied, average lead times, and average unit costs."""
-    df = _load_df()
-    summaries = []
-    for supplier, group in df.groupby("supplier"):
-        products = group["product_name"].unique().tolist()
-        avg_lead = group["lead_time_days"].mean()
-        avg_cost = group["unit_cost"].mean()
-        summaries.append(f"Supplier: {supplier}\n  Products: {', '.join(products)}\n  Avg Lead Time: {avg_lead:.1f} days\n  Avg Unit Cost: ${avg_cost:.2f}")
-    return "\n\n".join(summaries)
+@shared_result
+def get_supplier_summary(page: int = 1) -> str:
+    """Get a summary of all suppliers including products supplied, average lead times, and average unit costs.
+    Long lists are split into pages: pass page=2, 3, ... to see more suppliers."""
+    suppliers = _store().aggregates().suppliers
+    table = paged_table(suppliers, page, TOOL_OUTPUT_TOKEN_BUDGET, "suppliers")
+    return f"{len(suppliers)} suppliers:\n{table}"
@@ -0,0 +1,196 @@
+"""Process-wide dataset store shared by all data tools."""
+from __future__ import annotations
+import threading
+import logging
+from typing import TYPE_CHECKING
+from src.config import AGGREGATES_SIDECAR
+from src.tools.aggregates import Aggregates, build_aggregates, read_sidecar, write_sidecar
+from src.tools.storage import COLUMNS, StorageBackend, filter_frame, open_backend
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger("scia")
+
+
+class DatasetStore:
+    """Loads the sales dataset once and keeps sorted lookups by product and supplier.
+
+    Rows are kept in (product_id, date) order, so per-product slices are date-sorted.
+
+    The data is re-read only when the backend fingerprint (mtime/size) changes. Frames
+    handed out by the store are shared between callers and must be treated as read-only.
+
+    For columnar backends nothing is held in memory: ``query`` pushes filters and column
+    projections down to the scan, and ``df`` materializes the full dataset only on demand.
+
+    Per-product and per-supplier aggregates are served separately by ``aggregates``, from a
+    sidecar file when one matches the data, so they do not require loading the rows.
+    """
+
+    def __init__(self, backend: StorageBackend, sidecar: bool = True):
+        self.backend = backend
+        self.sidecar = sidecar
+        self._lock = threading.Lock()
+        self._aggregates_lock = threading.Lock()
+        self._aggregates: tuple[tuple[int, ...], Aggregates] | None = None
+        self._fingerprint: tuple[int, ...] | None = None
+        self._df: pd.DataFrame | None = None
+        self._by_product: dict[str, pd.DataFrame] = {}
+        self._by_supplier: dict[str, pd.DataFrame] = {}
+
+    @property
+    def path(self) -> str:
+        return self.backend.path
+
+    def _refresh(self) -> None:
+        fingerprint = self.backend.fingerprint()
+        if fingerprint == self._fingerprint:
+            return
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return
+            if self.backend.in_memory:
+                df = _sort(self.backend.scan())
+                self._by_product = {key: group for key, group in df.groupby("product_id", sort=False)}
+                self._by_supplier = {key: group for key, group in df.groupby("supplier", sort=False)}
+                self._df = df
+                logger.info(f"Loaded dataset {self.path} ({len(df)} rows, {len(self._by_product)} products)")
+            else:
+                self._df = None
+                self._by_product = {}
+                self._by_supplier = {}
+            self._fingerprint = fingerprint
+
+    def load(self) -> tuple[int, ...]:
+        """Read the dataset now rather than on the first query. Returns its fingerprint."""
+        self._refresh()
+        return self._fingerprint
+
+    @property
+    def version(self) -> tuple[int, ...]:
+        """Fingerprint of the data on disk. Does not load it."""
+        return self.backend.fingerprint()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The full dataset. For columnar backends this is a full scan."""
+        self._refresh()
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    self._df = _sort(self.backend.scan())
+        return self._df
+
+    def query(
+        self,
+        columns: list[str] | None = None,
+        product_id: str | None = None,
+        supplier: str | None = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Rows matching the filters in (product_id, date) order, restricted to ``columns``."""
+        self._refresh()
+        if not self.backend.in_memory:
+            df = self.backend.scan(columns=None if columns is None else _with_sort_keys(columns),
+                                   product_id=product_id, supplier=supplier, start=start, end=end)
+            df = _sort(df)
+            return df if columns is None else df[columns]
+        if product_id is not None:
+            df = self.product(product_id)
+            return filter_frame(df, columns, supplier=supplier, start=start, end=end)
+        if supplier is not None:
+            return filter_frame(self.supplier(supplier), columns, start=start, end=end)
+        return filter_frame(self._df, columns, start=start, end=end)
+
+    def product(self, product_id: str) -> pd.DataFrame:
+        """Rows for one product, sorted by date. Empty if the product is unknown."""
+        self._refresh()
+        if not self.backend.in_memory:
+            return self.query(product_id=product_id)
+        return self._by_product.get(product_id, self._df.iloc[0:0])
+
+    def supplier(self, supplier: str) -> pd.DataFrame:
+        """Rows for one supplier, sorted by date. Empty if the supplier is unknown."""
+        self._refresh()
+        if not self.backend.in_memory:
+            return self.query(supplier=supplier)
+        return self._by_supplier.get(supplier, self._df.iloc[0:0])
+
+    def product_ids(self) -> list[str]:
+        self._refresh()
+        if not self.backend.in_memory:
+            return self.query(columns=["product_id"])["product_id"].drop_duplicates().tolist()
+        return list(self._by_product)
+
+    def aggregates(self) -> Aggregates:
+        """Precomputed tables for the current data.
+
+        Read from the sidecar file when it matches the data; otherwise computed from the rows
+        and written to the sidecar for the next process. Kept in memory until the data changes.
+        """
+        fingerprint = self.backend.fingerprint()
+        cached = self._aggregates
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        with self._aggregates_lock:
+            cached = self._aggregates
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+            aggregates = read_sidecar(self.backend) if self.sidecar else None
+            if aggregates is not None:
+                logger.info(f"Loaded aggregates for {self.path} from its sidecar ({len(aggregates.latest)} products)")
+            else:
+                aggregates = build_aggregates(self.query(columns=COLUMNS))
+                if self.sidecar and (path := write_sidecar(self.backend, aggregates, fingerprint)):
+                    logger.info(f"Wrote aggregates for {self.path} to {path}")
+            self._aggregates = (fingerprint, aggregates)
+        return aggregates
+
+    def invalidate(self) -> None:
+        """Force a reload on the next access."""
+        with self._lock:
+            self._fingerprint = None
+        with self._aggregates_lock:
+            self._aggregates = None
+
+
+_SORT_KEYS = ["product_id", "date"]
+
+
+def _sort(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(_SORT_KEYS, kind="stable", ignore_index=True)
+
+
+def _with_sort_keys(columns: list[str]) -> list[str]:
+    return [*(k for k in _SORT_KEYS if k not in columns), *columns]
+
+
+_stores: dict[tuple[str, str | None], DatasetStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str, format: str | None = None) -> DatasetStore:
+    """Return the shared store for a dataset path, creating it on first use.
+
+    The store reads and writes the aggregates sidecar unless AGGREGATES_SIDECAR is disabled.
+    """
+    key = (path, format)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = DatasetStore(open_backend(path, format), sidecar=AGGREGATES_SIDECAR)
+    return store
+
+
+def set_backend(path: str, format: str | None, backend: StorageBackend) -> DatasetStore:
+    """Serve the dataset at ``path`` from ``backend`` instead of the one open_backend() would pick.
+
+    Used by the query server's workers to read the shared-memory copy of the dataset.
+    """
+    with _stores_lock:
+        store = _stores[(path, format)] = DatasetStore(backend, sidecar=AGGREGATES_SIDECAR)
+    return store
@@ -1,14 +1,19 @@
+import numpy as np
 import pandas as pd
 from langchain_core.tools import tool
-from src.tools.data_loader import _load_df
+from src.config import TOOL_OUTPUT_TOKEN_BUDGET
+from src.models import DemandForecast, InventoryAlert
+from src.tools.data_loader import _store
+from src.tools.formatting import dense_csv, estimate_tokens, fit_lines
+from src.tools.results import shared_result
 
 
 @tool
+@shared_result
 def forecast_demand(product_id: str, window: int = 7) -> str:
     """Forecast demand for a product using moving average over the given window (default 7 days).
     Returns current average daily sales, 7-day forecast, and trend direction."""
-    df = _load_df()
-    product_df = df[df["product_id"] == product_id].sort_values("date")
+    product_df = _store().query(columns=["date", "product_name", "quantity_sold"], product_id=product_id)
     if product_df.empty:
         return f"No data found for product {product_id}."
 
@@ -39,16 +44,17 @@ def forecast_demand(product_id: str, window: int = 7) -> str:
 
 
 @tool
+@shared_result
 def calculate_days_of_supply(product_id: str) -> str:
     """Calculate days of supply remaining for a product based on current stock and recent sales rate."""
-    df = _load_df()
-    product_df = df[df["product_id"] == product_id].sort_values("date")
-    if product_df.empty:
+    latest = _store().aggregates().latest
+    latest = latest[latest["product_id"] == product_id]
+    if latest.empty:
         return f"No data found for product {product_id}."
 
-    product_name = product_df["product_name"].iloc[0]
-    latest = product_df.iloc[-1]
-    avg_daily_sales = product_df["quantity_sold"].tail(7).mean()
+    latest = latest.iloc[0]
+    product_name = latest["product_name"]
+    avg_daily_sales = latest["avg_daily_sales"]
     stock = latest["stock_level"]
     reorder_point = latest["reorder_point"]
 
@@ -66,6 +72,307 @@ def calculate_days_of_supply(product_id: str) -> str:
         f"Current Stock: {stock} units\n"
         f"Reorder Point: {reorder_point} units\n"
         f"Avg Daily Sales (7d): {avg_daily_sales:.1f} units\n"
-        f"Days of Supply: {days_of_supply:.1f} days\n"
+        f"Days of Supply: {format_days(days_of_supply)}\n"
         f"Risk Level: {risk}"
     )
+
+
+# --- Batch forecasting across all SKUs ---
+
+def _group_positions(product_ids: pd.Series, dates: pd.Series | None = None):
+    """Codes, unique ids, group lengths and each row's position from the start and end of its group.
+
+    Rows must already be grouped by product (the store's (product_id, date) order); when ``dates``
+    is given they must also be date-sorted within each product. Raises ValueError otherwise.
+    """
+    codes, uniques = pd.factorize(product_ids, sort=False)
+    steps = np.diff(codes)
+    if (steps < 0).any():
+        raise ValueError("rows must be grouped by product_id, in (product_id, date) order")
+    if dates is not None and ((steps == 0) & (np.diff(dates.to_numpy()) < np.timedelta64(0))).any():
+        raise ValueError("rows must be date-sorted within each product, in (product_id, date) order")
+    lengths = np.bincount(codes, minlength=len(uniques))
+    pos = np.arange(len(codes)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    pos_from_end = lengths[codes] - 1 - pos
+    return codes, uniques, lengths, pos, pos_from_end
+
+
+def _group_means(codes: np.ndarray, values: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+    sums = np.bincount(codes[mask], weights=values[mask], minlength=n)
+    counts = np.bincount(codes[mask], minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def forecast_frame(
+    df: pd.DataFrame,
+    window: int = 7,
+    season_length: int = 7,
+    alpha: float = 0.3,
+    beta: float = 0.05,
+    gamma: float = 0.2,
+    horizon: int = 7,
+) -> pd.DataFrame:
+    """Forecast every product in ``df`` in one vectorized pass.
+
+    ``df`` needs product_id, product_name and quantity_sold rows in (product_id, date) order;
+    each product's rows are treated as consecutive daily observations. Products with at least
+    two full seasons get additive Holt-Winters with a ``season_length`` cycle, shorter histories
+    fall back to simple exponential smoothing. The moving-average columns match ``forecast_demand``.
+    """
+    codes, product_ids, lengths, pos, pos_from_end = _group_positions(df["product_id"], df.get("date"))
+    n = len(product_ids)
+    qty = df["quantity_sold"].to_numpy(dtype=float)
+
+    recent_avg = _group_means(codes, qty, pos_from_end < window, n)
+    earlier_avg = _group_means(codes, qty, pos < window, n)
+    names = df["product_name"].to_numpy()[np.cumsum(lengths) - lengths]
+
+    # Right-aligned (n, T) matrix: column T-1 holds each product's latest observation
+    T = int(lengths.max()) if n else 0
+    matrix = np.full((n, T), np.nan)
+    matrix[codes, T - 1 - pos_from_end] = qty
+    offset = T - lengths
+
+    m = season_length
+    rows = np.arange(n)
+    seasonal = lengths >= 2 * m
+    first = np.full((n, m), np.nan)
+    head = pos < m
+    first[codes[head], pos[head]] = qty[head]
+    level = np.where(seasonal, np.nanmean(first, axis=1) if n else 0.0, matrix[rows, offset] if n else 0.0)
+    trend = np.zeros(n)
+    season = np.where(seasonal[:, None], np.nan_to_num(first - level[:, None]), 0.0)
+    start = np.where(seasonal, m, 1)
+    beta_eff = np.where(seasonal, beta, 0.0)
+
+    for t in range(int(offset.min() + 1) if n else 0, T):
+        y = matrix[:, t]
+        k = t - offset
+        active = (k >= start) & ~np.isnan(y)
+        if not active.any():
+            continue
+        s_idx = k % m
+        s = season[rows, s_idx]
+        new_level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        new_trend = beta_eff * (new_level - level) + (1 - beta_eff) * trend
+        update_season = active & seasonal
+        season[rows[update_season], s_idx[update_season]] = (
+            gamma * (y - new_level) + (1 - gamma) * s
+        )[update_season]
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+
+    steps = np.arange(1, horizon + 1)
+    future_idx = (lengths[:, None] - 1 + steps[None, :]) % m
+    path = level[:, None] + trend[:, None] * steps[None, :] + season[rows[:, None], future_idx]
+    forecast = np.clip(path, 0, None).sum(axis=1)
+
+    trend_label = np.select(
+        [recent_avg > earlier_avg * 1.05, recent_avg < earlier_avg * 0.95], ["up", "down"], "stable"
+    )
+    return pd.DataFrame({
+        "product_id": np.asarray(product_ids),
+        "product_name": names,
+        "observations": lengths,
+        "recent_avg": recent_avg,
+        "earlier_avg": earlier_avg,
+        "ma_forecast": recent_avg * horizon,
+        "forecast": forecast,
+        "method": np.where(seasonal, "holt-winters", "exp-smoothing"),
+        "trend": trend_label,
+    })
+
+
+def batch_forecast(
+    product_ids: list[str] | None = None,
+    window: int = 7,
+    season_length: int = 7,
+    alpha: float = 0.3,
+    beta: float = 0.05,
+    gamma: float = 0.2,
+) -> list[DemandForecast]:
+    """Forecast the next 7 days for every product (or the given ones) in a single pass."""
+    df = _store().query(columns=["product_id", "product_name", "quantity_sold"])
+    if product_ids is not None:
+        df = df[df["product_id"].isin(product_ids)]
+    frame = forecast_frame(df, window=window, season_length=season_length, alpha=alpha, beta=beta, gamma=gamma)
+    return [
+        DemandForecast(
+            product_id=row.product_id,
+            product_name=row.product_name,
+            current_avg_daily_sales=round(float(row.recent_avg), 2),
+            forecast_next_7d=round(float(row.forecast), 1),
+            trend=row.trend,
+            notes=f"{row.method}; {window}-day moving-average forecast: {row.ma_forecast:.0f} units",
+        )
+        for row in frame.itertuples(index=False)
+    ]
+
+
+@tool
+@shared_result
+def forecast_all_products(window: int = 7, top_n: int = 20) -> str:
+    """Forecast next-7-day demand for ALL products at once (Holt-Winters with weekly seasonality,
+    plus the moving average over the given window). Use this instead of calling forecast_demand per product.
+    Returns trend counts and the top_n products by forecast volume."""
+    df = _store().query(columns=["product_id", "product_name", "quantity_sold"])
+    if df.empty:
+        return "No data found."
+    frame = forecast_frame(df, window=window).sort_values("forecast", ascending=False)
+    counts = frame["trend"].value_counts()
+    lines = [
+        f"Products forecast: {len(frame)} "
+        f"(up: {counts.get('up', 0)}, down: {counts.get('down', 0)}, stable: {counts.get('stable', 0)})"
+    ]
+    shown = frame.head(top_n)
+    table = pd.DataFrame({
+        "product_id": shown["product_id"],
+        "product_name": shown["product_name"],
+        f"avg_daily_{window}d": shown["recent_avg"].round(1),
+        "ma_forecast_7d": shown["ma_forecast"].round(0),
+        "forecast_7d": shown["forecast"].round(0),
+        "trend": shown["trend"],
+    })
+    if len(frame) > top_n:
+        lines.append(f"(showing top {top_n} of {len(frame)} products by forecast volume)")
+    budget = TOOL_OUTPUT_TOKEN_BUDGET - estimate_tokens("\n".join(lines))
+    lines[1:1] = fit_lines(dense_csv(table), budget, "products")
+    return "\n".join(lines)
+
+
+# --- Fleet-wide stockout risk scan ---
+
+RISK_LEVELS = ["critical", "warning", "healthy"]
+RISK_COLUMNS = [
+    "product_id", "product_name", "quantity_sold", "stock_level", "reorder_point", "supplier", "lead_time_days",
+]
+
+
+def risk_frame(df: pd.DataFrame, sales_window: int = 7, lead_time_adjusted: bool = False) -> pd.DataFrame:
+    """Latest stock, trailing sales rate, days of supply and risk level for every product in one pass.
+
+    ``df`` needs RISK_COLUMNS in (product_id, date) order. The base risk rules match
+    ``calculate_days_of_supply``; see ``classify_risk`` for ``lead_time_adjusted``.
+    """
+    codes, product_ids, lengths, _, pos_from_end = _group_positions(df["product_id"], df.get("date"))
+    n = len(product_ids)
+    last = np.cumsum(lengths) - 1
+    return classify_risk(pd.DataFrame({
+        "product_id": np.asarray(product_ids),
+        "product_name": df["product_name"].to_numpy()[last],
+        "supplier": df["supplier"].to_numpy()[last],
+        "current_stock": df["stock_level"].to_numpy()[last],
+        "reorder_point": df["reorder_point"].to_numpy()[last],
+        "lead_time_days": df["lead_time_days"].to_numpy(dtype=float)[last],
+        "avg_daily_sales": _group_means(
+            codes, df["quantity_sold"].to_numpy(dtype=float), pos_from_end < sales_window, n),
+    }), lead_time_adjusted)
+
+
+def classify_risk(snapshot: pd.DataFrame, lead_time_adjusted: bool = False) -> pd.DataFrame:
+    """Add days_of_supply, risk_level and risk_rank to one row per product.
+
+    ``snapshot`` needs current_stock, reorder_point, lead_time_days and avg_daily_sales. With
+    ``lead_time_adjusted`` a product is also critical when it will run out before a reorder placed
+    today arrives, and a warning within twice the lead time.
+    """
+    stock = snapshot["current_stock"].to_numpy()
+    reorder_point = snapshot["reorder_point"].to_numpy()
+    lead_time = snapshot["lead_time_days"].to_numpy(dtype=float)
+    avg_sales = snapshot["avg_daily_sales"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days_of_supply = np.where(avg_sales > 0, stock / avg_sales, np.inf)
+
+    conditions = [stock <= 0, stock < reorder_point]
+    if lead_time_adjusted:
+        conditions = [stock <= 0, days_of_supply <= lead_time, (stock < reorder_point) | (days_of_supply <= 2 * lead_time)]
+        choices = ["critical", "critical", "warning"]
+    else:
+        choices = ["critical", "warning"]
+    risk = np.select(conditions, choices, "healthy")
+
+    return snapshot.assign(
+        lead_time_days=lead_time,
+        days_of_supply=days_of_supply,
+        risk_level=risk,
+        risk_rank=pd.Categorical(risk, categories=RISK_LEVELS).codes,
+    )
+
+
+def format_days(days_of_supply: float) -> str:
+    """``12.5 days``, or ``no recent sales`` for the infinite days of supply of an unsold product."""
+    return f"{days_of_supply:.1f} days" if np.isfinite(days_of_supply) else "no recent sales"
+
+
+def risk_recommendation(row) -> str:
+    """Reorder advice for a risk_frame row."""
+    if row.current_stock <= 0:
+        return f"Out of stock. Expedite an order from {row.supplier} (lead time {row.lead_time_days:.0f} days)."
+    if row.risk_level == "healthy":
+        return "No action needed."
+    if not np.isfinite(row.days_of_supply):
+        return f"Below the reorder point with no recent sales. Reorder from {row.supplier} if demand resumes."
+    if row.days_of_supply <= row.lead_time_days:
+        return (f"Reorder immediately from {row.supplier}: stock runs out in {row.days_of_supply:.1f} days, "
+                f"before a new order can arrive ({row.lead_time_days:.0f} days).")
+    return f"Place a reorder with {row.supplier} within {row.days_of_supply - row.lead_time_days:.0f} days."
+
+
+def _scan(top_k: int, supplier: str | None, lead_time_adjusted: bool, include_healthy: bool) -> pd.DataFrame:
+    latest = _store().aggregates().latest
+    if supplier:
+        latest = latest[latest["supplier"] == supplier]
+    snapshot = latest[["product_id", "product_name", "supplier", "stock_level", "reorder_point", "lead_time_days",
+                       "avg_daily_sales"]].rename(columns={"stock_level": "current_stock"})
+    frame = classify_risk(snapshot.reset_index(drop=True), lead_time_adjusted)
+    if not include_healthy:
+        frame = frame[frame["risk_level"] != "healthy"]
+    return frame.sort_values(["risk_rank", "days_of_supply"], kind="stable").head(top_k)
+
+
+def scan_stockout_risk(
+    top_k: int = 10,
+    supplier: str | None = None,
+    lead_time_adjusted: bool = False,
+    include_healthy: bool = False,
+) -> list[InventoryAlert]:
+    """Rank every product by stockout risk and return the top_k most critical as InventoryAlerts."""
+    frame = _scan(top_k, supplier, lead_time_adjusted, include_healthy)
+    return [
+        InventoryAlert(
+            product_id=row.product_id,
+            product_name=row.product_name,
+            current_stock=int(row.current_stock),
+            reorder_point=int(row.reorder_point),
+            avg_daily_sales=round(float(row.avg_daily_sales), 2),
+            days_of_supply=round(float(row.days_of_supply), 1),
+            risk_level=row.risk_level,
+            recommendation=risk_recommendation(row),
+        )
+        for row in frame.itertuples(index=False)
+    ]
+
+
+@tool
+@shared_result
+def scan_inventory_risk(top_k: int = 10, supplier: str | None = None, lead_time_adjusted: bool = False) -> str:
+    """Scan ALL products at once for stockout risk and return the top_k most at-risk items, critical first.
+    Optionally restrict to one supplier. Set lead_time_adjusted=True to also flag products whose days of supply
+    are shorter than their supplier lead time. Use this instead of calling calculate_days_of_supply per product."""
+    frame = _scan(top_k, supplier, lead_time_adjusted, include_healthy=False)
+    if frame.empty:
+        scope = f" for supplier {supplier}" if supplier else ""
+        return f"No products at risk of stockout{scope}."
+    days = frame["days_of_supply"]
+    table = pd.DataFrame({
+        "product_id": frame["product_id"],
+        "product_name": frame["product_name"],
+        "stock": frame["current_stock"],
+        "reorder_point": frame["reorder_point"],
+        "avg_daily_sales_7d": frame["avg_daily_sales"].round(1),
+        "days_of_supply": days.round(1).where(np.isfinite(days), "no recent sales"),
+        "lead_time_days": frame["lead_time_days"].astype(int),
+        "risk": frame["risk_level"],
+    })
+    return "\n".join(fit_lines(dense_csv(table), TOOL_OUTPUT_TOKEN_BUDGET, "products"))
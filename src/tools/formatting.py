@@ -0,0 +1,100 @@
+"""Compact, token-budgeted text rendering of DataFrames for tool outputs."""
+from __future__ import annotations
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rough size of an LLM token in characters of English text or CSV
+CHARS_PER_TOKEN = 4
+# Rows rendered to estimate a table's row length when paging it
+SAMPLE_ROWS = 500
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def dense_csv(df: pd.DataFrame) -> list[str]:
+    """Header and rows as CSV lines: dates without times, floats rounded to 2 decimals."""
+    import pandas as pd
+
+    if df.empty:
+        return [",".join(df.columns)]
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+    return out.to_csv(index=False, float_format="%.2f", lineterminator="\n").rstrip("\n").split("\n")
+
+
+def split_constants(df: pd.DataFrame) -> tuple[dict, pd.DataFrame]:
+    """Move columns that hold a single value into a dict, so it is stated once instead of per row."""
+    import pandas as pd
+
+    if len(df) < 2:
+        return {}, df
+    constant = [col for col in df.columns if df[col].nunique(dropna=False) == 1]
+    values = {col: df[col].iloc[0] for col in constant}
+    for col, value in values.items():
+        if isinstance(value, pd.Timestamp):
+            values[col] = value.strftime("%Y-%m-%d")
+    return values, df.drop(columns=constant)
+
+
+def split_lookup(df: pd.DataFrame, key: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Dictionary-encode the columns that are fixed per ``key`` (e.g. a product's name and supplier).
+
+    Returns a lookup table with one row per key and the rows without those columns.
+    """
+    if df.empty or key not in df.columns:
+        return df.iloc[:0], df
+    per_key = df.groupby(key, sort=False).nunique(dropna=False)
+    fixed = [col for col in per_key.columns if (per_key[col] <= 1).all()]
+    if not fixed or df[key].nunique() == len(df):
+        return df.iloc[:0], df
+    lookup = df[[key, *fixed]].drop_duplicates(key)
+    return lookup, df.drop(columns=fixed)
+
+
+def paged_table(df: pd.DataFrame, page: int, budget: int, what: str = "rows") -> str:
+    """Render ``df`` as CSV limited to ``budget`` tokens per page.
+
+    Page size is derived from the average row length of an evenly spaced sample, so the same page
+    always holds the same rows, and only the requested page's rows are rendered. When rows are
+    left out the output says so and names the page to ask for next.
+    """
+    header = dense_csv(df.iloc[:0])[0]
+    if df.empty:
+        return header
+    sample = dense_csv(df.iloc[::max(1, len(df) // SAMPLE_ROWS)])[1:]
+    row_chars = sum(len(row) + 1 for row in sample) / len(sample)
+    room = max(budget * CHARS_PER_TOKEN - len(header) - 200, 0)
+    per_page = max(1, int(room // row_chars))
+    pages = math.ceil(len(df) / per_page)
+    if page < 1 or page > pages:
+        return f"Page {page} is out of range: there are {pages} page(s) of {what}."
+    start = (page - 1) * per_page
+    shown = dense_csv(df.iloc[start:start + per_page])
+    text = "\n".join(shown)
+    if pages > 1:
+        end = start + len(shown) - 1
+        text += f"\n[Truncated: showing {what} {start + 1}-{end} of {len(df)} (page {page} of {pages}) " \
+                f"to stay within the tool output token budget."
+        text += f" Call again with page={page + 1} for more.]" if page < pages else "]"
+    return text
+
+
+def fit_lines(lines: list[str], budget: int, what: str = "lines") -> list[str]:
+    """Keep leading ``lines`` that fit in ``budget`` tokens and note how many were dropped."""
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line + "\n")
+        if used + cost > budget:
+            kept.append(f"[... {len(lines) - i} more {what} omitted to stay within the token budget]")
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
@@ -0,0 +1,167 @@
+"""Run-scoped tool result table that deduplicates identical tool calls across agents."""
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+logger = logging.getLogger("scia")
+
+
+class ToolResultTable:
+    """Results of tool calls made during one graph run, keyed by tool name and arguments.
+
+    The first call for a key runs the tool; later and concurrent calls with the same
+    arguments wait for and reuse that result. Failed calls are not kept.
+
+    Calls made inside ``speculative()`` (see src/graph/speculation.py) prefetch a result
+    before any agent asked for it. They are tracked separately: an agent call that finds one
+    counts as ``prefetched`` and saves the time the prefetch had already run; prefetches no
+    agent used are wasted work.
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        self._results: dict[tuple[str, str], Future] = {}
+        # key -> [started, finished or None, used] for speculative calls
+        self._speculated: dict[tuple[str, str], list] = {}
+        self.calls = 0
+        self.executed = 0
+        self.deduplicated = 0
+        self.waited = 0
+        self.prefetched = 0
+        self.seconds_saved = 0.0
+        self.speculative_failed = 0
+
+    def call(self, name: str, arguments: dict, fn):
+        key = (name, json.dumps(arguments, sort_keys=True, default=str))
+        speculative = _speculative.get()
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if speculative and not owner:
+                return None  # already fetched or in flight
+            if owner:
+                future = self._results[key] = Future()
+                if speculative:
+                    self._speculated[key] = [time.perf_counter(), None, False]
+                else:
+                    self.calls += 1
+                    self.executed += 1
+            else:
+                self.calls += 1
+                prefetch = self._speculated.get(key)
+                if prefetch is not None and not prefetch[2]:
+                    prefetch[2] = True
+                    self.prefetched += 1
+                    self.seconds_saved += (prefetch[1] or time.perf_counter()) - prefetch[0]
+                else:
+                    self.deduplicated += 1
+                if not future.done():
+                    self.waited += 1
+        if not owner:
+            logger.debug(f"[TOOL_DEDUP] {name}{key[1]} reused (run_id={self.run_id})")
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._results.pop(key, None)
+                if self._speculated.pop(key, None) is not None:
+                    self.speculative_failed += 1
+            future.set_exception(e)
+            raise
+        if speculative:
+            with self._lock:
+                self._speculated[key][1] = time.perf_counter()
+        future.set_result(result)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.perf_counter()
+            unused = [(finished or now) - started for started, finished, used in self._speculated.values() if not used]
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+                "waited": self.waited,
+                "speculated": len(self._speculated) + self.speculative_failed,
+                "prefetched": self.prefetched,
+                "speculative_wasted": len(unused) + self.speculative_failed,
+                "seconds_saved": round(self.seconds_saved, 3),
+                "seconds_wasted": round(sum(unused), 3),
+            }
+
+
+_current_table: contextvars.ContextVar[ToolResultTable | None] = contextvars.ContextVar(
+    "scia_tool_results", default=None
+)
+_speculative: contextvars.ContextVar[bool] = contextvars.ContextVar("scia_speculative", default=False)
+# Tables of runs that never reached release_table (e.g. failed runs) are evicted oldest-first
+MAX_OPEN_TABLES = 256
+_tables: OrderedDict[str, ToolResultTable] = OrderedDict()
+_tables_lock = threading.Lock()
+
+
+def get_table(run_id: str) -> ToolResultTable:
+    """Return the result table for a run, creating it on first use."""
+    with _tables_lock:
+        table = _tables.get(run_id)
+        if table is None:
+            table = _tables[run_id] = ToolResultTable(run_id)
+            while len(_tables) > MAX_OPEN_TABLES:
+                _tables.popitem(last=False)
+        return table
+
+
+def release_table(run_id: str) -> dict:
+    """Drop a run's table and return its counters."""
+    with _tables_lock:
+        table = _tables.pop(run_id, None)
+    return table.stats() if table else {}
+
+
+@contextmanager
+def use_table(run_id: str | None):
+    """Route deduplicated tool calls made in this context through the run's table."""
+    token = _current_table.set(get_table(run_id) if run_id else None)
+    try:
+        yield
+    finally:
+        _current_table.reset(token)
+
+
+@contextmanager
+def speculative():
+    """Mark tool calls made in this context as speculative prefetches for the active table."""
+    token = _speculative.set(True)
+    try:
+        yield
+    finally:
+        _speculative.reset(token)
+
+
+def shared_result(fn):
+    """Decorator for tool functions whose result can be shared within a run.
+
+    Apply it beneath ``@tool``. Outside a run (no active table) the function runs as usual.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        table = _current_table.get()
+        if table is None:
+            return fn(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return table.call(fn.__name__, dict(bound.arguments), lambda: fn(*args, **kwargs))
+
+    return wrapper
@@ -1,19 +1,213 @@
+"""Web search: pluggable backends behind a disk cache, with parallel queries and a hard deadline."""
+import hashlib
+import json
+from abc import ABC, abstractmethod
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
 from langchain_core.tools import tool
+from src.config import (
+    SEARCH_BACKEND, SEARCH_CACHE, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL, SEARCH_MAX_PARALLEL, SEARCH_TIMEOUT,
+    SEARCH_URL, TOOL_OUTPUT_TOKEN_BUDGET,
+)
+from src.cache import SQLiteStore
+from src.observability.metrics import get_metrics
+from src.tools.formatting import fit_lines
+from src.tools.results import shared_result
+
+logger = logging.getLogger("scia")
+
+MAX_RESULTS = 5
+# Queries accepted by one web_search call; the rest are ignored
+MAX_QUERIES = 8
+
+
+class SearchBackend(ABC):
+    """Runs one query against a search provider."""
+
+    name = ""
+
+    @abstractmethod
+    def search(self, query: str, max_results: int, timeout: float) -> list[dict]:
+        """Results as dicts with ``title``, ``snippet`` and ``url``."""
+
+
+class DuckDuckGoBackend(SearchBackend):
+    name = "duckduckgo"
+
+    def search(self, query: str, max_results: int, timeout: float) -> list[dict]:
+        from duckduckgo_search import DDGS
+        with DDGS(timeout=max(1, int(timeout))) as ddgs:
+            results = ddgs.text(query, max_results=max_results) or []
+        return [{"title": r.get("title", ""), "snippet": r.get("body", ""), "url": r.get("href", "")} for r in results]
+
+
+class HTTPBackend(SearchBackend):
+    """JSON search endpoint: ``GET <url>?q=<query>&format=json``.
+
+    The response is either a list of results or SearxNG's ``{"results": [...]}``, with
+    ``title``, ``content`` (or ``snippet``/``body``) and ``url`` (or ``href``) fields. Point it
+    at a local stub server to run the agents without network access.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def search(self, query: str, max_results: int, timeout: float) -> list[dict]:
+        separator = "&" if "?" in self.url else "?"
+        request = Request(f"{self.url}{separator}{urlencode({'q': query, 'format': 'json'})}",
+                          headers={"Accept": "application/json"})
+        with urlopen(request, timeout=timeout) as response:
+            data = json.load(response)
+        items = data.get("results", []) if isinstance(data, dict) else data
+        return [
+            {
+                "title": r.get("title", ""),
+                "snippet": r.get("content") or r.get("snippet") or r.get("body", ""),
+                "url": r.get("url") or r.get("href", ""),
+            }
+            for r in items[:max_results]
+        ]
+
+
+def open_search_backend(name: str | None = None, url: str | None = None) -> SearchBackend:
+    """Create the configured backend. ``name`` and ``url`` override SEARCH_BACKEND and SEARCH_URL."""
+    name = name or SEARCH_BACKEND
+    if name == "duckduckgo":
+        return DuckDuckGoBackend()
+    if name == "http":
+        return HTTPBackend(url or SEARCH_URL)
+    raise ValueError(f"Unsupported search backend: {name}")
+
+
+_backend: SearchBackend | None = None
+_store: SQLiteStore | None = None
+_lock = threading.Lock()
+
+
+def get_search_backend() -> SearchBackend:
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = open_search_backend()
+    return _backend
+
+
+def set_search_backend(backend: SearchBackend | None) -> SearchBackend | None:
+    """Replace the process-wide backend (None restores the configured one). Returns the previous one."""
+    global _backend
+    with _lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def _cache() -> SQLiteStore | None:
+    global _store
+    if not SEARCH_CACHE:
+        return None
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = SQLiteStore(SEARCH_CACHE_PATH, "search_results", ttl_seconds=SEARCH_CACHE_TTL)
+    return _store
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+def _cache_key(backend: SearchBackend, query: str, max_results: int) -> str:
+    raw = "\x00".join((backend.name, str(max_results), normalize_query(query)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fetch(backend: SearchBackend, query: str, max_results: int, deadline: float) -> list[dict]:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("deadline passed before the search started")
+    results = backend.search(query, max_results, remaining)
+    store = _cache()
+    if store is not None:
+        store.set(_cache_key(backend, query, max_results), json.dumps(results))
+    return results
+
+
+def run_searches(queries: list[str], max_results: int = MAX_RESULTS, timeout: float | None = None) -> dict:
+    """Search all ``queries`` concurrently, returning whatever finished within ``timeout`` seconds.
+
+    Maps each distinct query (by normalized text) to its results, or to an error message when
+    its search failed or missed the deadline. Cached results are used without a request.
+
+    Each call gets its own pool, so a search abandoned at the deadline only holds its own
+    thread (until the backend's timeout, at most the remaining deadline, ends it) and never
+    delays a later call. If it completes, its result still lands in the cache.
+    """
+    timeout = SEARCH_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    backend = get_search_backend()
+    store = _cache()
+    metrics = get_metrics()
+    distinct: dict[str, str] = {}
+    for query in queries:
+        if query.strip():
+            distinct.setdefault(normalize_query(query), query.strip())
+
+    results, misses = {}, []
+    for query in distinct.values():
+        cached = store.get(_cache_key(backend, query, max_results)) if store is not None else None
+        if cached is not None:
+            results[query] = json.loads(cached)
+            metrics.inc("search_requests_total", help="Web search queries", status="cached")
+        else:
+            misses.append(query)
+    futures = {}
+    if misses:
+        pool = ThreadPoolExecutor(max_workers=min(SEARCH_MAX_PARALLEL, len(misses)), thread_name_prefix="scia-search")
+        futures = {pool.submit(_fetch, backend, query, max_results, deadline): query for query in misses}
+        wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        pool.shutdown(wait=False, cancel_futures=True)
+    for future, query in futures.items():
+        if future.cancelled() or not future.done():
+            results[query] = f"Search failed: timed out after {timeout:g}s"
+            metrics.inc("search_requests_total", help="Web search queries", status="timeout")
+        elif future.exception() is not None:
+            logger.warning(f"[SEARCH] {query!r} failed: {future.exception()}")
+            results[query] = f"Search failed: {future.exception()}"
+            metrics.inc("search_requests_total", help="Web search queries", status="error")
+        else:
+            results[query] = future.result()
+            metrics.inc("search_requests_total", help="Web search queries", status="ok")
+    return {query: results[query] for query in distinct.values()}
+
+
+def _format_results(results) -> str:
+    if isinstance(results, str):
+        return results
+    if not results:
+        return "No search results found."
+    return "\n\n".join(f"Title: {r['title']}\nSnippet: {r['snippet']}\nURL: {r['url']}" for r in results)
 
 
 @tool
-def web_search(query: str) -> str:
+@shared_result
+def web_search(query: str = "", queries: list[str] | None = None) -> str:
     """Search the web for supply chain news, market trends, or supplier information.
-    Returns top search results with titles, snippets, and URLs."""
-    try:
-        from duckduckgo_search import DDGS
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=5))
-        if not results:
-            return "No search results found."
-        formatted = []
-        for r in results:
-            formatted.append(f"Title: {r['title']}\nSnippet: {r['body']}\nURL: {r['href']}")
-        return "\n\n".join(formatted)
-    except Exception as e:
-        return f"Search failed: {e}"
+    Pass one query, or several in queries (e.g. one per supplier) to run them in parallel in a single call.
+    Returns top search results with titles, snippets, and URLs for each query."""
+    wanted = ([query] if query else []) + list(queries or [])
+    if not wanted:
+        return "No query given."
+    found = run_searches(wanted[:MAX_QUERIES])
+    if len(found) == 1:
+        text = _format_results(next(iter(found.values())))
+    else:
+        text = "\n\n".join(f"## {q}\n{_format_results(r)}" for q, r in found.items())
+    if len(wanted) > MAX_QUERIES:
+        text += f"\n\n(Only the first {MAX_QUERIES} queries were searched.)"
+    return "\n".join(fit_lines(text.split("\n"), TOOL_OUTPUT_TOKEN_BUDGET, "lines"))
@@ -0,0 +1,122 @@
+"""The sales dataset published once in shared memory for the query server's worker processes.
+
+The server process reads the source, sorts it and writes it as one uncompressed Arrow IPC file
+on a tmpfs (``/dev/shm`` where available). A small pointer file names the current segment and
+the source fingerprint it was built from. Workers memory-map the segment, so they all read the
+same physical pages, and each scan converts only the rows and columns it selects to pandas.
+When the source changes the server publishes a new segment and moves the pointer.
+"""
+from __future__ import annotations
+import json
+import os
+import tempfile
+import threading
+import logging
+from src.tools.aggregates import build_aggregates, read_sidecar, write_sidecar
+from src.tools.storage import COLUMNS, ColumnarBackend, _write_table, open_backend
+
+logger = logging.getLogger("scia")
+
+SEGMENT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedDataset:
+    """Publisher side, owned by the server process."""
+
+    def __init__(self, path: str, format: str | None = None, sidecar: bool = True, directory: str = SEGMENT_DIR):
+        self.backend = open_backend(path, format)
+        self.sidecar = sidecar
+        self.prefix = os.path.join(directory, f"scia-{os.getpid()}")
+        self.pointer = f"{self.prefix}.json"
+        self.segment: str | None = None
+        self.fingerprint: tuple[int, ...] | None = None
+        self._generation = 0
+        self._retired: list[str] = []
+
+    def publish(self) -> bool:
+        """Publish the source if it changed since the last call. Returns True if a new segment was written.
+
+        A replaced segment is removed only at the following publish, so a worker that read the
+        old pointer just before it moved can still open it.
+        """
+        import pyarrow as pa
+
+        fingerprint = self.backend.fingerprint()
+        if fingerprint == self.fingerprint:
+            return False
+        df = self.backend.scan(columns=COLUMNS).sort_values(["product_id", "date"], kind="stable", ignore_index=True)
+        self._generation += 1
+        segment = f"{self.prefix}-{self._generation}.arrow"
+        _write_table(pa.Table.from_pandas(df, preserve_index=False), segment, "ipc")
+        if self.sidecar and read_sidecar(self.backend) is None:
+            # Built here once rather than by every worker on its first aggregates() call
+            write_sidecar(self.backend, build_aggregates(df), fingerprint)
+        _write_pointer(self.pointer, {"segment": segment, "fingerprint": list(fingerprint)})
+
+        for old in self._retired:
+            _remove(old)
+        self._retired = [self.segment] if self.segment else []
+        self.segment, self.fingerprint = segment, fingerprint
+        logger.info(f"[SHARED] published {self.backend.path} ({len(df)} rows, "
+                    f"{os.path.getsize(segment) / 1e6:.1f} MB) to {segment}")
+        return True
+
+    def close(self) -> None:
+        """Remove the pointer and all segments."""
+        for path in (self.pointer, self.segment, *self._retired):
+            if path:
+                _remove(path)
+        self.segment, self.fingerprint, self._retired = None, None, []
+
+
+class SharedMemoryBackend(ColumnarBackend):
+    """Worker side: scans the segment named by a SharedDataset's pointer file.
+
+    ``path`` stays the source's path and ``fingerprint`` the source's fingerprint, so the
+    aggregates sidecar and the dataset version (and with it the LLM cache keys) are the same
+    as when the worker reads the source itself.
+    """
+
+    def __init__(self, path: str, pointer: str):
+        super().__init__(path, format="ipc")
+        self.format = "shm"
+        self.pointer = pointer
+        self._segment: str | None = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> tuple[str, tuple[int, ...]]:
+        with open(self.pointer, encoding="utf-8") as f:
+            pointer = json.load(f)
+        return pointer["segment"], tuple(pointer["fingerprint"])
+
+    def fingerprint(self) -> tuple[int, ...]:
+        return self._current()[1]
+
+    def _get_dataset(self):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        segment, fingerprint = self._current()
+        if segment != self._segment:
+            with self._lock:
+                if segment != self._segment:
+                    # The table's buffers point into the mapping: nothing is copied here
+                    table = pa.ipc.open_file(pa.memory_map(segment)).read_all()
+                    self._dataset = ds.dataset(table)
+                    self._dataset_fingerprint = fingerprint
+                    self._segment = segment
+        return self._dataset
+
+
+def _write_pointer(path: str, pointer: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(pointer, f)
+    os.replace(tmp, path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,256 @@
+"""Storage backends for the sales dataset: row-oriented CSV and columnar Parquet / Arrow IPC.
+
+pandas (and pyarrow for the columnar formats) is imported on the first scan, so opening a
+backend and reading its fingerprint stay cheap.
+"""
+from __future__ import annotations
+import argparse
+import os
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUMNS = [
+    "date", "product_id", "product_name", "quantity_sold", "stock_level",
+    "reorder_point", "supplier", "lead_time_days", "unit_cost",
+]
+
+COLUMNAR_FORMATS = ("parquet", "ipc")
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+}
+
+
+class StorageBackend(ABC):
+    """Reads the dataset with optional column projection and row filters.
+
+    In-memory backends are loaded whole by the DatasetStore and filtered through its
+    indexes; the others are scanned lazily on every query with filters pushed down.
+    """
+
+    format = ""
+    in_memory = False
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def fingerprint(self) -> tuple[int, ...]:
+        """Cheap change marker for the data on disk (mtime/size, no reads)."""
+
+    @abstractmethod
+    def scan(
+        self,
+        columns: list[str] | None = None,
+        product_id: str | None = None,
+        supplier: str | None = None,
+        start=None,
+        end=None,
+    ) -> pd.DataFrame:
+        """Rows matching the filters, restricted to ``columns``."""
+
+
+class CSVBackend(StorageBackend):
+    format = "csv"
+    in_memory = True
+
+    def fingerprint(self) -> tuple[int, ...]:
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def scan(self, columns=None, product_id=None, supplier=None, start=None, end=None) -> pd.DataFrame:
+        import pandas as pd
+
+        df = pd.read_csv(self.path, parse_dates=["date"])
+        return filter_frame(df, columns, product_id, supplier, start, end)
+
+
+class ColumnarBackend(StorageBackend):
+    """Partitioned Parquet or Arrow IPC dataset read through pyarrow.dataset.
+
+    Arrow IPC files are memory-mapped, so repeated scans read from the page cache
+    instead of copying file contents into Python buffers.
+
+    A scan reads the files as of the latest ``fingerprint()`` call, so a query that checks the
+    fingerprint and then scans walks the directory once. The DatasetStore, the monitor and the
+    shared-memory publisher all check it before scanning.
+    """
+
+    in_memory = False
+
+    def __init__(self, path: str, format: str = "parquet"):
+        super().__init__(path)
+        if format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {format}")
+        self.format = format
+        self._dataset = None
+        self._dataset_fingerprint = None
+        self._checked: tuple[int, ...] | None = None
+
+    def fingerprint(self) -> tuple[int, ...]:
+        if os.path.isfile(self.path):
+            st = os.stat(self.path)
+            fingerprint = st.st_mtime_ns, st.st_size, 1
+        else:
+            latest, total, count = 0, 0, 0
+            for root, _, files in os.walk(self.path):
+                for name in files:
+                    st = os.stat(os.path.join(root, name))
+                    latest = max(latest, st.st_mtime_ns)
+                    total += st.st_size
+                    count += 1
+            fingerprint = latest, total, count
+        self._checked = fingerprint
+        return fingerprint
+
+    def _get_dataset(self):
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        fingerprint = self._checked or self.fingerprint()
+        if self._dataset is None or fingerprint != self._dataset_fingerprint:
+            filesystem = fs.LocalFileSystem(use_mmap=self.format == "ipc")
+            self._dataset = ds.dataset(
+                os.path.abspath(self.path), format=self.format, partitioning="hive", filesystem=filesystem
+            )
+            self._dataset_fingerprint = fingerprint
+        return self._dataset
+
+    def scan(self, columns=None, product_id=None, supplier=None, start=None, end=None) -> pd.DataFrame:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset = self._get_dataset()
+        predicate = None
+        conditions = []
+        if product_id is not None:
+            conditions.append(ds.field("product_id") == product_id)
+        if supplier is not None:
+            conditions.append(ds.field("supplier") == supplier)
+        if start is not None:
+            conditions.append(ds.field("date") >= pa.scalar(pd.Timestamp(start).to_pydatetime()))
+        if end is not None:
+            conditions.append(ds.field("date") <= pa.scalar(pd.Timestamp(end).to_pydatetime()))
+        for condition in conditions:
+            predicate = condition if predicate is None else predicate & condition
+
+        names = dataset.schema.names
+        projected = [c for c in (columns or COLUMNS) if c in names]
+        table = dataset.to_table(columns=projected, filter=predicate)
+        df = table.to_pandas()
+        for column in ("product_id", "supplier"):
+            if column in df and isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(str)
+        return df
+
+
+def filter_frame(df: pd.DataFrame, columns=None, product_id=None, supplier=None, start=None, end=None) -> pd.DataFrame:
+    """Apply the scan filters to an in-memory frame."""
+    import pandas as pd
+
+    if product_id is not None:
+        df = df[df["product_id"] == product_id]
+    if supplier is not None:
+        df = df[df["supplier"] == supplier]
+    if start is not None:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    if columns is not None:
+        df = df[columns]
+    return df
+
+
+def detect_format(path: str) -> str:
+    """Infer the storage format from the path; directories are treated as Parquet datasets."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in _EXTENSIONS:
+        return _EXTENSIONS[ext]
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in files:
+                fmt = _EXTENSIONS.get(os.path.splitext(name)[1].lower())
+                if fmt in COLUMNAR_FORMATS:
+                    return fmt
+        return "parquet"
+    return "csv"
+
+
+def open_backend(path: str, format: str | None = None) -> StorageBackend:
+    """Create the backend for a dataset path. ``format`` overrides auto-detection."""
+    format = format or detect_format(path)
+    if format == "csv":
+        return CSVBackend(path)
+    return ColumnarBackend(path, format=format)
+
+
+def convert_csv_to_columnar(
+    csv_path: str,
+    dest: str,
+    format: str = "parquet",
+    partition_by: tuple[str, ...] = ("supplier",),
+) -> str:
+    """One-shot conversion of the CSV layout into a hive-partitioned columnar dataset.
+
+    Each partition is written as a single ``<col>=<value>/part-0.<ext>`` file, sorted
+    by product and date. Existing files under ``dest`` are replaced.
+    """
+    import shutil
+    import pandas as pd
+    import pyarrow as pa
+
+    if format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {format}")
+    df = pd.read_csv(csv_path, parse_dates=["date"]).sort_values(["product_id", "date"], kind="stable")
+    if os.path.isdir(dest):
+        shutil.rmtree(dest)
+    os.makedirs(dest)
+
+    partition_by = list(partition_by)
+    groups = df.groupby(partition_by, sort=True) if partition_by else [((), df)]
+    ext = "parquet" if format == "parquet" else "arrow"
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        part_dir = os.path.join(dest, *(f"{col}={quote(str(value), safe='')}" for col, value in zip(partition_by, key)))
+        os.makedirs(part_dir, exist_ok=True)
+        columns = [c for c in COLUMNS if c not in partition_by]
+        table = pa.Table.from_pandas(group[columns], preserve_index=False)
+        _write_table(table, os.path.join(part_dir, f"part-0.{ext}"), format)
+    return dest
+
+
+def _write_table(table, path: str, format: str) -> None:
+    import pyarrow as pa
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the CSV dataset into a columnar layout")
+    parser.add_argument("csv_path", help="Source CSV file")
+    parser.add_argument("dest", help="Destination dataset directory")
+    parser.add_argument("--format", choices=COLUMNAR_FORMATS, default="parquet")
+    parser.add_argument("--partition-by", default="supplier",
+                        help="Comma-separated partition columns (empty for none)")
+    args = parser.parse_args()
+    partition_by = tuple(c.strip() for c in args.partition_by.split(",") if c.strip())
+    convert_csv_to_columnar(args.csv_path, args.dest, format=args.format, partition_by=partition_by)
+    print(f"Wrote {args.format} dataset to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
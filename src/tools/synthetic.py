@@ -0,0 +1,129 @@
+"""Synthetic sales datasets in the sample_data.csv schema, at any scale."""
+import argparse
+import os
+import string
+import numpy as np
+import pandas as pd
+from src.tools.storage import COLUMNS
+
+BRANDS = ["Lay's", "Pepsi", "Doritos", "Gatorade", "Quaker", "Tropicana", "Cheetos", "Mountain Dew", "Ruffles", "Tostitos"]
+ITEMS = ["Classic Chips", "Cola 12-Pack", "Nacho Cheese", "Lemon-Lime", "Oats Granola", "Orange Juice", "Puffs",
+         "Soda 2L", "Sour Cream & Onion", "Salsa Con Queso", "Protein Bar", "Sparkling Water"]
+
+# Days a supply disruption holds back deliveries
+_DISRUPTION_MIN_DAYS = 7
+_DISRUPTION_MAX_DAYS = 21
+
+
+def supplier_name(index: int) -> str:
+    """SupplierA ... SupplierZ, SupplierAA, SupplierAB, ..."""
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = string.ascii_uppercase[rem] + letters
+    return f"Supplier{letters}"
+
+
+def generate_dataset(
+    skus: int = 100,
+    suppliers: int = 5,
+    days: int = 365,
+    start: str = "2024-01-01",
+    seasonality: float = 0.3,
+    stockouts: float = 1.0,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Daily sales and stock for ``skus`` products over ``days`` days, in (product_id, date) order.
+
+    Demand per product follows its own base rate with a weekend lift, an annual cycle of
+    relative amplitude ``seasonality`` and Poisson noise. Stock is simulated with a reorder-point
+    policy: an order of about a month's demand is placed when stock drops below the reorder
+    point and arrives after the supplier's lead time. ``stockouts`` is the expected number of
+    supply disruptions per product per year; each holds back deliveries for one to three weeks,
+    so sales are capped by the stock on hand and the product can run out.
+    """
+    rng = np.random.default_rng(seed)
+    width = max(3, len(str(skus)))
+    product_ids = np.array([f"P{i:0{width}d}" for i in range(1, skus + 1)], dtype=object)
+    names = np.array([
+        f"{BRANDS[i % len(BRANDS)]} {ITEMS[(i // len(BRANDS)) % len(ITEMS)]}"
+        + (f" #{i // (len(BRANDS) * len(ITEMS)) + 1}" if i >= len(BRANDS) * len(ITEMS) else "")
+        for i in range(skus)
+    ], dtype=object)
+    supplier_of = rng.integers(0, suppliers, skus)
+    supplier_lead = rng.integers(2, 15, suppliers)
+    lead_time = supplier_lead[supplier_of]
+    unit_cost = np.round(rng.lognormal(0.8, 0.5, skus), 2)
+
+    base = rng.lognormal(np.log(80), 0.6, skus)
+    t = np.arange(days)
+    weekday = (pd.Timestamp(start).dayofweek + t) % 7
+    weekly = np.where(weekday >= 5, 1.25, 0.95)
+    phase = rng.uniform(0, 2 * np.pi, skus)
+    annual = 1 + seasonality * np.sin(2 * np.pi * t[:, None] / 365.25 + phase)
+    demand = rng.poisson(base * weekly[:, None] * annual)  # (days, skus)
+
+    reorder_point = np.ceil(base * (lead_time + 3) / 100) * 100
+    order_qty = np.ceil(base * 30 / 100) * 100
+    stock = reorder_point * 2 + rng.integers(0, 20, skus) * 100
+    pending = np.zeros(skus)
+    arrival = np.zeros(skus, dtype=np.int64)
+    blocked_until = np.full(skus, -1)
+    disruption = rng.random((days, skus)) < stockouts / 365
+    sold = np.empty((days, skus), dtype=np.int64)
+    level = np.empty((days, skus), dtype=np.int64)
+
+    for day in range(days):
+        hit = disruption[day]
+        blocked_until[hit] = day + rng.integers(_DISRUPTION_MIN_DAYS, _DISRUPTION_MAX_DAYS + 1, int(hit.sum()))
+        arriving = (pending > 0) & (arrival <= day) & (blocked_until < day)
+        stock = stock + np.where(arriving, pending, 0)
+        pending[arriving] = 0
+        sold[day] = np.minimum(demand[day], stock)
+        stock = stock - sold[day]
+        level[day] = stock
+        order = (stock < reorder_point) & (pending == 0)
+        pending[order] = order_qty[order]
+        arrival[order] = day + lead_time[order]
+
+    dates = pd.date_range(start, periods=days, freq="D")
+    return pd.DataFrame({
+        "date": np.tile(dates.values, skus),
+        "product_id": np.repeat(product_ids, days),
+        "product_name": np.repeat(names, days),
+        "quantity_sold": sold.T.ravel(),
+        "stock_level": level.T.ravel(),
+        "reorder_point": np.repeat(reorder_point.astype(np.int64), days),
+        "supplier": np.repeat(np.array([supplier_name(i) for i in supplier_of], dtype=object), days),
+        "lead_time_days": np.repeat(lead_time, days),
+        "unit_cost": np.repeat(unit_cost, days),
+    })[COLUMNS]
+
+
+def write_dataset(df: pd.DataFrame, path: str) -> str:
+    """Write the frame as CSV in the sample_data.csv layout."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_csv(path, index=False, date_format="%Y-%m-%d", float_format="%.2f")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales dataset in the sample_data.csv schema")
+    parser.add_argument("dest", help="Destination CSV file")
+    parser.add_argument("--skus", type=int, default=100)
+    parser.add_argument("--suppliers", type=int, default=5)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", default="2024-01-01", help="First date (YYYY-MM-DD)")
+    parser.add_argument("--seasonality", type=float, default=0.3, help="Relative amplitude of the annual demand cycle")
+    parser.add_argument("--stockouts", type=float, default=1.0,
+                        help="Expected supply disruptions per product per year")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    df = generate_dataset(args.skus, args.suppliers, args.days, args.start, args.seasonality, args.stockouts, args.seed)
+    write_dataset(df, args.dest)
+    print(f"Wrote {len(df)} rows for {args.skus} products to {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
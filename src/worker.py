@@ -0,0 +1,327 @@
+"""Warm worker: a long-lived process that runs CLI queries handed to it over a Unix socket.
+
+``python app.py --serve`` loads the dataset, agents, LLM client and workflow once and then
+serves requests; later ``python app.py "query"`` calls find the socket and only pay for a
+connection instead of the imports and warm-up. ``--serve --processes N`` runs N worker processes
+behind the same socket, sharing one memory-mapped copy of the dataset, so concurrent queries
+(e.g. from several Streamlit sessions) are not serialized on one interpreter. The protocol is
+one JSON request line from the client, answered by JSON event lines (see ``handle``). Only the
+client half is imported by the CLI and the Streamlit app, so it stays free of LangChain and pandas.
+"""
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+logger = logging.getLogger("scia")
+
+# Seconds to wait for the worker to accept a connection before running locally
+CONNECT_TIMEOUT = 1.0
+# A worker process that exits sooner than this after starting stops the server instead of being restarted
+MIN_WORKER_UPTIME = 30.0
+
+
+class WorkerUnavailable(Exception):
+    """No worker is listening on the socket."""
+
+
+def connect(path: str) -> socket.socket:
+    """Open a connection to the worker, or raise WorkerUnavailable."""
+    if not path or not os.path.exists(path):
+        raise WorkerUnavailable(f"no worker socket at {path!r}")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError as e:
+        sock.close()
+        raise WorkerUnavailable(f"worker at {path} is not accepting connections: {e}") from e
+    sock.settimeout(None)
+    return sock
+
+
+def submit(sock: socket.socket, query: str | None, run_id: str | None = None, stream: bool = True) -> Iterator[dict]:
+    """Send one query (``None`` resumes ``run_id``) and yield the worker's events until the last one."""
+    return _exchange(sock, {"query": query, "run_id": run_id, "stream": stream})
+
+
+def report(sock: socket.socket, op: str) -> dict:
+    """The serving worker's ``"health"`` or ``"metrics"`` report."""
+    events = _exchange(sock, {"op": op})
+    try:
+        return next(events)
+    finally:
+        events.close()
+
+
+def _exchange(sock: socket.socket, request: dict) -> Iterator[dict]:
+    with sock, sock.makefile("rwb") as conn:
+        conn.write(json.dumps(request).encode() + b"\n")
+        conn.flush()
+        for line in conn:
+            event = json.loads(line)
+            yield event
+            if event["event"] in ("done", "error"):
+                return
+    raise ConnectionError("worker closed the connection before the run finished")
+
+
+# --- Server side ---
+
+def handle(request: dict, send: Callable[[dict], None]) -> None:
+    """Run one request on this process's workflow, reporting through ``send``.
+
+    Events: ``{"event": "progress", "text"}`` as nodes finish, ``{"event": "token", "text"}`` for
+    streamed report text, then ``{"event": "done", "run_id", "final_report", "agent_outputs",
+    "guardrail_blocked", "elapsed", "ttft_seconds"}`` or ``{"event": "error", "run_id", "error",
+    "resumable"}``. A request with ``"op": "health"`` or ``"op": "metrics"`` is answered with
+    one ``{"event": "done", "pid", ...}`` carrying the serving process's report instead.
+    """
+    from src.registry import get_registry
+
+    op = request.get("op", "query")
+    if op == "health":
+        send({"event": "done", "pid": os.getpid(), "health": get_registry().health()})
+        return
+    if op == "metrics":
+        from src.observability.metrics import get_metrics
+        send({"event": "done", "pid": os.getpid(), "metrics": get_metrics().summary()})
+        return
+
+    from src.graph.checkpoint import initial_state, invoke_run, new_run_id, pending_nodes
+    from src.graph.streaming import describe, stream_workflow
+
+    graph = get_registry().workflow()
+    query = request.get("query")
+    run_id = request.get("run_id") or new_run_id()
+    started = time.perf_counter()
+    ttft = None
+    try:
+        if request.get("stream", True):
+            result = {}
+            state = initial_state(query, run_id) if query is not None else None
+            for event in stream_workflow(graph, state, run_id=run_id):
+                if event.kind == "progress":
+                    send({"event": "progress", "text": describe(event)})
+                elif event.kind == "token":
+                    send({"event": "token", "text": event.text})
+                else:
+                    result, ttft = event.update, event.metrics["ttft_seconds"]
+        else:
+            result = invoke_run(graph, query, run_id)
+    except (BrokenPipeError, ConnectionResetError):
+        raise
+    except Exception as e:
+        logger.error(f"[WORKER] run {run_id} failed: {type(e).__name__}: {e}")
+        send({"event": "error", "run_id": run_id, "error": f"{type(e).__name__}: {e}",
+              "resumable": bool(pending_nodes(graph, run_id))})
+        return
+    send({"event": "done", "run_id": run_id, "final_report": result.get("final_report", ""),
+          "agent_outputs": result.get("agent_outputs", {}), "guardrail_blocked": result.get("guardrail_blocked", False),
+          "elapsed": time.perf_counter() - started, "ttft_seconds": ttft})
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            return  # a liveness probe: connected and closed without a request
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self._send({"event": "error", "run_id": None, "error": f"Bad request: {e}", "resumable": False})
+                return
+            handle(request, self._send)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("[WORKER] client disconnected before the run finished")
+
+    def _send(self, event: dict) -> None:
+        self.wfile.write(json.dumps(event).encode() + b"\n")
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _listen(path: str) -> socket.socket:
+    """Bind the socket at ``path``, replacing one left behind by a worker that did not shut down cleanly."""
+    try:
+        connect(path).close()
+        raise SystemExit(f"A worker is already listening on {path}")
+    except WorkerUnavailable:
+        pass
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)  # socket readable and writable by this user only
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(128)
+    return listener
+
+
+def _server(listener: socket.socket) -> _Server:
+    """A threaded server accepting on an already bound socket (shared by all worker processes)."""
+    server = _Server(listener.getsockname(), _RequestHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listener
+    return server
+
+
+def serve(path: str, processes: int = 1) -> None:
+    """Serve queries on the Unix socket at ``path`` until interrupted.
+
+    With one process, requests run on threads of this process. With more, the dataset is
+    published once in shared memory and ``processes`` worker processes, each with its own warm
+    workflow, accept connections from the same socket; a worker that dies is restarted.
+    """
+    listener = _listen(path)
+    signal.signal(signal.SIGTERM, _interrupt)  # stop cleanly under docker/systemd too
+    try:
+        if processes > 1:
+            _supervise(listener, processes)
+        else:
+            from src.registry import get_registry
+            timings = get_registry().warm_up()
+            print(f"Worker ready on {path} (warm-up {sum(timings.values()):.1f}s). Press Ctrl+C to stop.",
+                  file=sys.stderr)
+            _server(listener).serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.", file=sys.stderr)
+    finally:
+        listener.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _supervise(listener: socket.socket, processes: int) -> None:
+    import multiprocessing
+    from src.config import AGGREGATES_SIDECAR, DATA_FORMAT, DATA_PATH, SERVER_DATA_POLL
+    from src.tools.shared_dataset import SharedDataset
+
+    shared = SharedDataset(DATA_PATH, DATA_FORMAT, sidecar=AGGREGATES_SIDECAR)
+    # Fresh interpreters rather than forks: the workers then never inherit locks or threads
+    context = multiprocessing.get_context("spawn")
+
+    def start(index: int):
+        process = context.Process(target=_worker_main, name=f"scia-worker-{index}", daemon=True,
+                                  args=(listener, shared.pointer))
+        with _environ(_worker_env(index, processes)):  # inherited by the new interpreter
+            process.start()
+        return process, time.monotonic()
+
+    workers = []
+    try:
+        shared.publish()
+        workers = [start(i) for i in range(processes)]
+        print(f"Serving on {listener.getsockname()} with {processes} worker processes "
+              f"(dataset in {shared.segment}). Press Ctrl+C to stop.", file=sys.stderr)
+        next_poll = time.monotonic() + SERVER_DATA_POLL
+        while True:
+            time.sleep(1)
+            for i, (process, started) in enumerate(workers):
+                if process.is_alive():
+                    continue
+                if time.monotonic() - started < MIN_WORKER_UPTIME:
+                    raise SystemExit(f"{process.name} exited with code {process.exitcode} right after starting")
+                logger.warning(f"[WORKER] {process.name} exited with code {process.exitcode}; restarting it")
+                workers[i] = start(i)
+            if time.monotonic() >= next_poll:
+                try:
+                    shared.publish()
+                except Exception as e:
+                    logger.error(f"[SHARED] could not publish the changed dataset: {type(e).__name__}: {e}")
+                next_poll = time.monotonic() + SERVER_DATA_POLL
+    finally:
+        for process, _ in workers:
+            process.terminate()
+        for process, _ in workers:
+            process.join(timeout=5)
+        shared.close()
+
+
+def _worker_env(index: int, processes: int) -> dict[str, str]:
+    """Settings that must differ per worker: each gets an equal share of the provider rate limits,
+    and its own metrics port and file."""
+    from src.config import LLM_RPM, LLM_TPM, METRICS_FILE, METRICS_PORT
+
+    env = {"LLM_RPM": str(LLM_RPM / processes), "LLM_TPM": str(LLM_TPM / processes)}
+    if METRICS_PORT:
+        env["METRICS_PORT"] = str(METRICS_PORT + index)
+    if METRICS_FILE:
+        root, ext = os.path.splitext(METRICS_FILE)
+        env["METRICS_FILE"] = f"{root}.{index}{ext}"
+    return env
+
+
+@contextmanager
+def _environ(env: dict[str, str]):
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _worker_main(listener: socket.socket, pointer: str) -> None:
+    """Entry point of a worker process: read the shared dataset, warm up, then accept connections."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C reaches the whole group; the server stops the workers
+    from src.config import DATA_FORMAT, DATA_PATH, SERVER_THREADS
+    from src.registry import get_registry
+    from src.tools.dataset import set_backend
+    from src.tools.shared_dataset import SharedMemoryBackend
+
+    set_backend(DATA_PATH, DATA_FORMAT, SharedMemoryBackend(DATA_PATH, pointer))
+    timings = get_registry().warm_up()
+    logger.info(f"[WORKER] process {os.getpid()} ready (warm-up {sum(timings.values()):.1f}s)")
+    _accept_loop(_server(listener), SERVER_THREADS)
+
+
+def _accept_loop(server: _Server, limit: int) -> None:
+    """Serve connections on threads, accepting only while fewer than ``limit`` are in flight.
+
+    The kernel hands each connection to one process blocked in accept(), so a busy worker
+    leaves new queries to the others instead of taking them all.
+    """
+    slots = threading.BoundedSemaphore(max(1, limit))
+
+    def run(request, address):
+        try:
+            server.finish_request(request, address)
+        except Exception:
+            server.handle_error(request, address)
+        finally:
+            server.shutdown_request(request)
+            slots.release()
+
+    while True:
+        slots.acquire()
+        try:
+            request, address = server.socket.accept()
+        except OSError as e:
+            slots.release()
+            logger.warning(f"[WORKER] accept failed: {e}")
+            time.sleep(0.1)
+            continue
+        threading.Thread(target=run, args=(request, address), daemon=True).start()
@@ -1,7 +1,6 @@
 """Streamlit UI for Supply Chain Intelligence Agents."""
 import os
 import streamlit as st
-from langchain_core.messages import HumanMessage
 
 # Load Streamlit secrets into env vars (for Streamlit Cloud deployment)
 for key in ("LLM_PROVIDER", "GROQ_API_KEY", "GROQ_MODEL", "OPENAI_API_KEY", "OPENAI_MODEL",
@@ -10,6 +9,34 @@ for key in ("LLM_PROVIDER", "GROQ_API_KEY", "GROQ_MODEL", "OPENAI_API_KEY", "OPE
         os.environ[key] = st.secrets[key]
 
 st.set_page_config(page_title="Supply Chain Intelligence Agents", page_icon="📦", layout="wide")
+
+
+@st.cache_resource(show_spinner="Warming up agents...")
+def get_warm_registry():
+    """Build the workflow, agents and LLM client once per server process."""
+    from src.registry import get_registry
+    registry = get_registry()
+    registry.warm_up()
+    return registry
+
+
+def query_server():
+    """A connection to the local query server (``python app.py --serve``), or None to run the agents here."""
+    from src.config import WORKER_SOCKET
+    from src.worker import WorkerUnavailable, connect
+    try:
+        return connect(WORKER_SOCKET)
+    except WorkerUnavailable:
+        return None
+
+
+# With a query server up this app is a thin client: runs go to its worker processes instead
+# of this script's thread, and nothing heavy is loaded here
+server = query_server()
+if server is not None:
+    server.close()  # only a probe; each request opens its own connection
+registry = None if server is not None else get_warm_registry()
+
 st.title("Supply Chain Intelligence Agents")
 st.caption("Multi-agent system for CPG supply chain analysis powered by LangGraph")
 
@@ -31,6 +58,22 @@ with st.sidebar:
     st.code("Analyze demand trends for all products")
     st.code("Give me a full supply chain report")
     st.code("How are our suppliers performing?")
+    st.divider()
+    if registry is None:
+        from src.worker import report
+        st.caption("Runs on the local query server")
+        for title, op in (("System health", "health"), ("Metrics (one worker process)", "metrics")):
+            with st.expander(title, expanded=False):
+                if (server := query_server()) is not None:
+                    st.json(report(server, op))
+                else:
+                    st.warning("The query server stopped; reload the page to run the agents in this app")
+    else:
+        with st.expander("System health", expanded=False):
+            st.json(registry.health())
+        with st.expander("Metrics", expanded=False):
+            from src.observability.metrics import get_metrics
+            st.json(get_metrics().summary())
 
 # Chat state
 if "messages" not in st.session_state:
@@ -41,34 +84,80 @@ for msg in st.session_state.messages:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
 
-# Chat input
-if prompt := st.chat_input("Ask about your supply chain..."):
-    st.session_state.messages.append({"role": "user", "content": prompt})
-    with st.chat_message("user"):
-        st.markdown(prompt)
+# Chat input; a failed run can be retried from its last checkpoint
+prompt = st.chat_input("Ask about your supply chain...")
+resume_run = st.session_state.pop("resume_run", None)
+if prompt or resume_run:
+    if prompt:
+        st.session_state.pop("failed_run", None)
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("Agents working..."):
-            from src.graph import build_workflow
-            graph = build_workflow()
-            result = graph.invoke({
-                "messages": [HumanMessage(content=prompt)],
-                "next_agents": [],
-                "agent_outputs": {},
-                "final_report": "",
-                "guardrail_blocked": False,
-            })
-
-            if result.get("guardrail_blocked"):
-                st.warning(result["final_report"])
-            else:
-                # Show agent trace in expander
-                with st.expander("Agent Trace", expanded=False):
-                    for agent_name, output in result.get("agent_outputs", {}).items():
-                        st.subheader(agent_name.replace("_", " ").title())
-                        st.markdown(output)
-
-                # Show final report
-                st.markdown(result["final_report"])
-
-    st.session_state.messages.append({"role": "assistant", "content": result["final_report"]})
+        result = {}
+        status = st.status("Resuming run..." if resume_run else "Agents working...", expanded=False)
+        if registry is None:
+            import uuid
+            from src.worker import submit
+            run_id = resume_run or uuid.uuid4().hex
+
+            def report_tokens():
+                """Yield report text for st.write_stream, logging progress into the status box."""
+                global result
+                sock = query_server()
+                if sock is None:
+                    raise RuntimeError("the query server stopped; retry to run the agents in this app")
+                for event in submit(sock, prompt or None, run_id=run_id):
+                    if event["event"] == "progress":
+                        status.write(event["text"])
+                    elif event["event"] == "token":
+                        yield event["text"]
+                    elif event["event"] == "done":
+                        result = event
+                        status.update(label=f"Done in {event['elapsed']:.1f}s "
+                                            f"(first token after {event['ttft_seconds']}s)", state="complete")
+                    else:
+                        raise RuntimeError(event["error"])
+        else:
+            from src.graph.checkpoint import initial_state, new_run_id
+            from src.graph.streaming import describe, stream_workflow
+            graph = registry.workflow()
+            run_id = resume_run or new_run_id()
+            events = stream_workflow(graph, initial_state(prompt, run_id) if prompt else None, run_id=run_id)
+
+            def report_tokens():
+                """Yield report text for st.write_stream, logging progress into the status box."""
+                global result
+                for event in events:
+                    if event.kind == "progress":
+                        status.write(describe(event))
+                    elif event.kind == "token":
+                        yield event.text
+                    else:
+                        result = event.update
+                        ttft = event.metrics["ttft_seconds"]
+                        status.update(label=f"Done in {event.elapsed:.1f}s (first token after {ttft}s)",
+                                      state="complete")
+
+        try:
+            st.write_stream(report_tokens())
+        except Exception as e:
+            status.update(label="Run failed", state="error")
+            st.error(f"The run failed: {e}")
+            st.session_state.failed_run = run_id
+
+        if not result.get("guardrail_blocked") and result.get("agent_outputs"):
+            # Show agent trace in expander
+            with st.expander("Agent Trace", expanded=False):
+                for agent_name, output in result["agent_outputs"].items():
+                    st.subheader(agent_name.replace("_", " ").title())
+                    st.markdown(output)
+
+    if result:
+        st.session_state.messages.append({"role": "assistant", "content": result.get("final_report", "")})
+
+if st.session_state.get("failed_run"):
+    if st.button("Retry from the last completed step"):
+        st.session_state.resume_run = st.session_state.pop("failed_run")
+        st.rerun()
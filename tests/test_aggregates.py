@@ -0,0 +1,69 @@
+import json
+import os
+import pandas as pd
+import pytest
+from src.tools.aggregates import SIDECAR_VERSION, read_sidecar, sidecar_path
+from src.tools.dataset import DatasetStore
+from src.tools.storage import open_backend
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+@pytest.fixture
+def path(tmp_path):
+    return write_dataset(generate_dataset(skus=6, suppliers=2, days=15, seed=2), str(tmp_path / "sales.csv"))
+
+
+def _without_scans(store: DatasetStore, monkeypatch) -> DatasetStore:
+    monkeypatch.setattr(store.backend, "scan", lambda *args, **kwargs: pytest.fail("read the rows"))
+    return store
+
+
+def _touch(path: str) -> None:
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_sidecar_is_written_once_and_read_by_the_next_store(path, monkeypatch):
+    built = DatasetStore(open_backend(path)).aggregates()
+    assert os.path.exists(sidecar_path(path))
+
+    loaded = _without_scans(DatasetStore(open_backend(path)), monkeypatch).aggregates()
+
+    for name, table in built.tables().items():
+        pd.testing.assert_frame_equal(loaded.tables()[name], table, check_dtype=False)
+
+
+def test_sidecar_survives_a_new_mtime_when_the_content_hash_matches(path, monkeypatch):
+    DatasetStore(open_backend(path)).aggregates()
+    _touch(path)
+    backend = open_backend(path)
+
+    assert _without_scans(DatasetStore(backend), monkeypatch).aggregates() is not None
+    with open(sidecar_path(path)) as f:
+        assert json.load(f)["source"]["fingerprint"] == list(backend.fingerprint())  # re-tagged, not rebuilt
+
+
+def test_sidecar_is_rebuilt_when_the_data_changes(path):
+    DatasetStore(open_backend(path)).aggregates()
+    write_dataset(generate_dataset(skus=7, suppliers=2, days=15, seed=2), path)
+    _touch(path)
+
+    assert read_sidecar(open_backend(path)) is None
+    assert len(DatasetStore(open_backend(path)).aggregates().latest) == 7
+    assert len(read_sidecar(open_backend(path)).latest) == 7
+
+
+@pytest.mark.parametrize("contents", ["{not json", json.dumps({"version": SIDECAR_VERSION - 1})])
+def test_unreadable_or_outdated_sidecars_are_ignored(path, contents):
+    with open(sidecar_path(path), "w") as f:
+        f.write(contents)
+
+    assert read_sidecar(open_backend(path)) is None
+    assert len(DatasetStore(open_backend(path)).aggregates().latest) == 6
+    assert read_sidecar(open_backend(path)) is not None
+
+
+def test_disabled_sidecar_is_neither_read_nor_written(path):
+    DatasetStore(open_backend(path), sidecar=False).aggregates()
+
+    assert not os.path.exists(sidecar_path(path))
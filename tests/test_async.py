@@ -0,0 +1,54 @@
+import asyncio
+import time
+from langchain_core.tools import tool
+from src.graph import workflow
+from src.tools.async_support import add_async
+from src.tools.results import release_table, shared_result, use_table
+
+executed = []
+
+
+@tool
+@shared_result
+def slow_lookup(product_id: str) -> str:
+    """Look up a product slowly."""
+    executed.append(product_id)
+    time.sleep(0.1)
+    return f"stock for {product_id}"
+
+
+def test_async_tool_calls_run_in_threads_and_keep_the_run_table():
+    async_lookup = add_async(slow_lookup)
+
+    async def agents():
+        with use_table("async-run"):
+            return await asyncio.gather(*(async_lookup.ainvoke({"product_id": "P001"}) for _ in range(3)),
+                                        async_lookup.ainvoke({"product_id": "P002"}))
+
+    started = time.perf_counter()
+    results = asyncio.run(agents())
+
+    assert results == ["stock for P001"] * 3 + ["stock for P002"]
+    assert sorted(executed) == ["P001", "P002"]  # deduplicated through the table in the worker threads
+    assert time.perf_counter() - started < 0.3  # P001 and P002 ran side by side
+    assert release_table("async-run")["waited"] == 2
+
+
+def test_llm_slot_bounds_concurrent_llm_nodes(monkeypatch):
+    monkeypatch.setattr(workflow, "LLM_MAX_CONCURRENCY", 2)
+    running, peak = 0, 0
+
+    async def node():
+        nonlocal running, peak
+        async with workflow._llm_slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+    async def run():
+        await asyncio.gather(*(node() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert peak == 2
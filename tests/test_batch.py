@@ -0,0 +1,52 @@
+import asyncio
+import io
+import json
+from src.batch import read_queries, run_batch
+
+
+class EchoGraph:
+    """Stands in for the compiled workflow: answers every query with its own text."""
+
+    async def ainvoke(self, state, config=None):
+        query = state["messages"][-1].content
+        return {"final_report": f"report: {query}", "agent_outputs": {"inventory_monitor": query},
+                "guardrail_blocked": False}
+
+
+def _write(tmp_path, lines: list[str]) -> str:
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_queries_reports_bad_lines_and_keeps_going(tmp_path):
+    path = _write(tmp_path, [
+        '"Which products are at risk?"',
+        '{"id": "q2", "query": "How are our suppliers doing?"',  # truncated JSON
+        '{"id": "q3", "question": "no query field"}',
+        '[1, 2]',
+        '{"id": "q5", "query": "Forecast demand for P001"}',
+    ])
+    items = list(read_queries(path))
+
+    assert [(item.id, item.query) for item in items if not item.error] == [
+        ("1", "Which products are at risk?"), ("q5", "Forecast demand for P001"),
+    ]
+    errors = {item.id: item.error for item in items if item.error}
+    assert set(errors) == {"2", "q3", "4"}
+    assert errors["2"].startswith("line 2: invalid JSON")
+    assert "query" in errors["q3"]
+
+
+def test_run_batch_writes_an_error_record_per_bad_line(tmp_path):
+    path = _write(tmp_path, ['"Which products are at risk?"', "{not json", '{"id": "q3", "query": "Forecast P001"}'])
+    out = io.StringIO()
+    report = asyncio.run(run_batch(read_queries(path), EchoGraph(), out, workers=2))
+
+    records = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert set(records) == {"1", "2", "q3"}
+    assert records["2"]["error"].startswith("line 2: invalid JSON") and records["2"]["final_report"] is None
+    assert records["1"]["final_report"] == "report: Which products are at risk?"
+    assert records["q3"]["error"] is None
+    assert (report.total, report.succeeded, report.failed) == (3, 2, 1)
+    assert len(report.latencies) == 2
@@ -0,0 +1,15 @@
+from langchain_core.load import dumps
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.cache import normalize_prompt
+
+
+def _prompt(question: str) -> str:
+    return dumps([SystemMessage(content="You are a demand analyst."), HumanMessage(content=question)])
+
+
+def test_prompts_differing_only_in_whitespace_share_a_key():
+    assert normalize_prompt(_prompt("Forecast  demand for P001\n")) == normalize_prompt(_prompt("Forecast demand for P001"))
+
+
+def test_case_is_kept_because_product_ids_are_case_sensitive():
+    assert normalize_prompt(_prompt("Forecast p001")) != normalize_prompt(_prompt("Forecast P001"))
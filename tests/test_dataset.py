@@ -0,0 +1,56 @@
+import os
+import pandas as pd
+from src.tools.dataset import DatasetStore
+from src.tools.storage import open_backend
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+def _rewrite(path: str, df: pd.DataFrame) -> None:
+    """Write new contents with a later mtime, as an upstream export would."""
+    mtime = os.stat(path).st_mtime_ns
+    write_dataset(df, path)
+    os.utime(path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+
+
+def test_store_serves_sorted_indexes_from_one_load(tmp_path):
+    df = generate_dataset(skus=5, suppliers=2, days=10, seed=0)
+    store = DatasetStore(open_backend(write_dataset(df.sample(frac=1, random_state=0), str(tmp_path / "sales.csv"))),
+                         sidecar=False)
+
+    product = store.product("P002")
+    assert product["date"].is_monotonic_increasing
+    assert len(product) == 10
+    assert store.product("P404").empty
+    assert set(store.supplier(product["supplier"].iloc[0])["product_id"]) >= {"P002"}
+    assert store.product_ids() == [f"P{i:03d}" for i in range(1, 6)]
+    assert store.product("P002") is product  # served from the index, not re-read
+
+
+def test_store_reloads_when_the_file_changes(tmp_path):
+    df = generate_dataset(skus=5, suppliers=2, days=10, seed=0)
+    path = write_dataset(df, str(tmp_path / "sales.csv"))
+    store = DatasetStore(open_backend(path), sidecar=False)
+    before = store.load()
+    assert len(store.df) == 50
+
+    _rewrite(path, generate_dataset(skus=6, suppliers=2, days=10, seed=0))
+
+    assert store.version != before
+    assert len(store.df) == 60
+    assert len(store.product("P006")) == 10
+    assert store.load() == store.version
+
+
+def test_invalidate_forces_a_reload(tmp_path, monkeypatch):
+    path = write_dataset(generate_dataset(skus=3, suppliers=1, days=5, seed=0), str(tmp_path / "sales.csv"))
+    store = DatasetStore(open_backend(path), sidecar=False)
+    store.load()
+    scans = []
+    scan = store.backend.scan
+    monkeypatch.setattr(store.backend, "scan", lambda *args, **kwargs: scans.append(1) or scan(*args, **kwargs))
+
+    store.query(product_id="P001")
+    store.invalidate()
+    store.query(product_id="P001")
+
+    assert len(scans) == 1
@@ -0,0 +1,80 @@
+import re
+import pytest
+from src.tools import data_loader
+from src.tools.forecasting import (
+    RISK_COLUMNS, calculate_days_of_supply, forecast_demand, forecast_frame, risk_frame, risk_recommendation,
+    scan_inventory_risk,
+)
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    df = generate_dataset(skus=15, suppliers=3, days=40, stockouts=2, seed=3)
+    # P004 stops selling for its last week while below its reorder point
+    p004 = df.index[df["product_id"] == "P004"]
+    df.loc[p004[-7:], "quantity_sold"] = 0
+    df.loc[p004[-1], "stock_level"] = df.loc[p004[-1], "reorder_point"] - 1
+    return df
+
+
+@pytest.fixture
+def store_path(dataset, tmp_path, monkeypatch):
+    path = write_dataset(dataset, str(tmp_path / "sales.csv"))
+    monkeypatch.setattr(data_loader, "_DATA_PATH", path)
+    return path
+
+
+def _field(text: str, label: str) -> str:
+    return re.search(rf"^{re.escape(label)}: (.+)$", text, re.MULTILINE).group(1)
+
+
+def test_forecast_frame_matches_forecast_demand(dataset, store_path):
+    frame = forecast_frame(dataset[["product_id", "product_name", "quantity_sold"]])
+
+    assert len(frame) == dataset["product_id"].nunique()
+    for row in frame.itertuples(index=False):
+        text = forecast_demand.invoke({"product_id": row.product_id})
+        assert _field(text, "Avg Daily Sales (last 7 days)") == f"{row.recent_avg:.1f} units"
+        assert _field(text, "Avg Daily Sales (first 7 days)") == f"{row.earlier_avg:.1f} units"
+        assert _field(text, "7-Day Forecast") == f"{row.ma_forecast:.0f} units"
+        assert _field(text, "Trend") == row.trend
+
+
+def test_risk_frame_matches_calculate_days_of_supply(dataset, store_path):
+    frame = risk_frame(dataset[["date", *RISK_COLUMNS]])
+
+    assert "warning" in set(frame["risk_level"]) and "healthy" in set(frame["risk_level"])
+    for row in frame.itertuples(index=False):
+        text = calculate_days_of_supply.invoke({"product_id": row.product_id})
+        assert _field(text, "Current Stock") == f"{row.current_stock} units"
+        assert _field(text, "Avg Daily Sales (7d)") == f"{row.avg_daily_sales:.1f} units"
+        assert _field(text, "Risk Level") == row.risk_level
+        if row.product_id != "P004":
+            assert _field(text, "Days of Supply") == f"{row.days_of_supply:.1f} days"
+
+
+def test_zero_recent_sales_read_as_no_recent_sales(dataset, store_path):
+    row = next(risk_frame(dataset[["date", *RISK_COLUMNS]]).query("product_id == 'P004'").itertuples())
+
+    assert row.risk_level == "warning"
+    assert "inf" not in risk_recommendation(row)
+    assert "no recent sales" in risk_recommendation(row)
+    assert _field(calculate_days_of_supply.invoke({"product_id": "P004"}), "Days of Supply") == "no recent sales"
+    assert "inf" not in scan_inventory_risk.invoke({"top_k": 50})
+
+
+def test_unsorted_rows_are_rejected(dataset):
+    shuffled = dataset.sample(frac=1, random_state=0)
+    by_date = dataset.sort_values(["date", "product_id"])
+    newest_first = dataset.sort_values(["product_id", "date"], ascending=[True, False])
+
+    for df in (shuffled, by_date):
+        with pytest.raises(ValueError, match="grouped by product_id"):
+            forecast_frame(df)
+        with pytest.raises(ValueError, match="grouped by product_id"):
+            risk_frame(df)
+    with pytest.raises(ValueError, match="date-sorted"):
+        forecast_frame(newest_first)
+    with pytest.raises(ValueError, match="date-sorted"):
+        risk_frame(newest_first)
@@ -0,0 +1,46 @@
+import pandas as pd
+import src.tools.formatting as formatting
+from src.tools.formatting import estimate_tokens, paged_table
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "product_id": [f"P{i % 50:04d}" for i in range(rows)],
+        "quantity_sold": [i % 97 for i in range(rows)],
+        "unit_cost": [1.5 + (i % 7) / 3 for i in range(rows)],
+    })
+
+
+def test_pages_cover_every_row_once_within_the_budget():
+    df = _frame(5_000)
+    budget = 500
+    first = paged_table(df, 1, budget, "records")
+    pages = int(first.rsplit("page 1 of ", 1)[1].split(")")[0])
+    seen = []
+    for page in range(1, pages + 1):
+        text = paged_table(df, page, budget, "records")
+        assert estimate_tokens(text) <= budget
+        lines = text.split("\n")
+        assert lines[0] == "date,product_id,quantity_sold,unit_cost"
+        seen += lines[1:-1]
+    assert len(seen) == len(df)
+    assert seen[0].startswith("2024-01-01,P0000,0,1.50")
+    assert "out of range" in paged_table(df, pages + 1, budget, "records")
+
+
+def test_only_the_requested_page_is_rendered(monkeypatch):
+    rendered = []
+    dense_csv = formatting.dense_csv
+    monkeypatch.setattr(formatting, "dense_csv", lambda df: rendered.append(len(df)) or dense_csv(df))
+    paged_table(_frame(200_000), 3, 2000, "records")
+    assert sum(rendered) < 2 * formatting.SAMPLE_ROWS
+
+
+def test_catalog_wide_tools_stay_within_the_token_budget(monkeypatch):
+    import src.tools.forecasting as forecasting
+    monkeypatch.setattr(forecasting, "TOOL_OUTPUT_TOKEN_BUDGET", 60)
+    for tool in (forecasting.forecast_all_products, forecasting.scan_inventory_risk):
+        text = tool.func()
+        assert estimate_tokens(text) <= 80, tool.name
+        assert "omitted to stay within the token budget" in text, tool.name
@@ -0,0 +1,69 @@
+import os
+import pandas as pd
+import pyarrow as pa
+from src.guardrails import MAX_INPUT_LENGTH, check_input
+from src.models import InventoryAlert
+from src.monitor import ScanTailer, alert_query
+from src.tools.storage import COLUMNS, _write_table, convert_csv_to_columnar, open_backend
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+def _alert(i: int, risk_level: str, days: float) -> InventoryAlert:
+    return InventoryAlert(product_id=f"P{i:04d}", product_name=f"Synthetic Product Number {i}", current_stock=10 * i,
+                          reorder_point=1000, avg_daily_sales=50.0, days_of_supply=days, risk_level=risk_level)
+
+
+def test_alert_query_lists_every_alert_when_they_fit():
+    alerts = [_alert(1, "warning", 6.0), _alert(2, "critical", 1.5)]
+    query = alert_query(alerts)
+    assert "P0001" in query and "P0002" in query
+    assert "more products" not in query
+    assert query.index("P0002") < query.index("P0001")  # critical first
+
+
+def test_alert_query_for_a_broad_stockout_passes_the_input_guardrail():
+    alerts = [_alert(i, "warning" if i % 3 else "critical", i / 10) for i in range(57)]
+    query = alert_query(alerts)
+
+    assert len(query) <= MAX_INPUT_LENGTH
+    assert check_input(query).passed
+    listed = [a for a in alerts if f"({a.product_id})" in query]
+    hidden = len(alerts) - len(listed)
+    assert listed and hidden
+    assert f"...and {hidden} more products" in query
+    assert all(a.risk_level == "critical" for a in listed)  # the most severe are the ones shown
+    critical_hidden = sum(a.risk_level == "critical" for a in alerts) - len(listed)
+    assert f"({critical_hidden} critical, {hidden - critical_hidden} warning)" in query
+
+
+def _append(dataset: str, rows, name: str) -> str:
+    """Add a file of rows to the dataset's supplier partition, as an upstream writer would."""
+    supplier = rows["supplier"].iloc[0]
+    path = os.path.join(dataset, f"supplier={supplier}", name)
+    columns = [c for c in COLUMNS if c != "supplier"]
+    _write_table(pa.Table.from_pandas(rows[columns], preserve_index=False), path, "parquet")
+    return path
+
+
+def test_scan_tailer_picks_up_rows_appended_for_a_lagging_product(tmp_path):
+    df = generate_dataset(skus=6, suppliers=2, days=20, seed=0)
+    lagging = (df["product_id"] == "P001") & (df["date"] > df["date"].min() + pd.Timedelta(days=14))
+    csv = write_dataset(df[~lagging], str(tmp_path / "sales.csv"))
+    dataset = convert_csv_to_columnar(csv, str(tmp_path / "sales"), format="parquet")
+    tailer = ScanTailer(open_backend(dataset, "parquet"))
+
+    first, reset = tailer.read_new()
+    assert len(first) == len(df) - lagging.sum() and not reset
+    assert tailer.read_new()[0].empty
+
+    # P001's missing days are all older than the other products' latest date
+    appended = _append(dataset, df[lagging], "part-1.parquet")
+    new, reset = tailer.read_new()
+    assert not reset
+    assert sorted(new["date"]) == sorted(df.loc[lagging, "date"])
+    assert set(new["product_id"]) == {"P001"}
+
+    os.remove(appended)
+    rewritten, reset = tailer.read_new()
+    assert reset
+    assert len(rewritten) == len(first)
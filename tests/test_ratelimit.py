@@ -0,0 +1,56 @@
+import threading
+import time
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.cache import LLMResponseCache, SQLiteStore
+from src.ratelimit import AdaptiveRateLimiter, UsageCallback
+
+TOKENS_PER_CALL = 1000
+
+
+class SlowModel(BaseChatModel):
+    """Answers after ``release`` is set (when given), reporting TOKENS_PER_CALL tokens of usage."""
+
+    release: threading.Event | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        message = AIMessage(content=f"answer to {messages[-1].content}",
+                            usage_metadata={"input_tokens": 900, "output_tokens": 100, "total_tokens": TOKENS_PER_CALL})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _model(limiter, cache, release=None) -> SlowModel:
+    return SlowModel(release=release, cache=cache, rate_limiter=limiter, callbacks=[UsageCallback(limiter)])
+
+
+def test_cache_hits_do_not_release_slots_or_debit_tokens(tmp_path):
+    limiter = AdaptiveRateLimiter("fake", tokens_per_minute=6000)
+    cache = LLMResponseCache(SQLiteStore(str(tmp_path / "cache.sqlite"), "llm_cache"), "fake", version_fn=lambda: "v1")
+    _model(limiter, cache).invoke("cached question")  # fills the cache
+    assert limiter.stats()["in_flight"] == 0
+    level_before = limiter._tokens.level
+
+    release = threading.Event()
+    uncached = threading.Thread(target=lambda: _model(limiter, cache, release).invoke("new question"))
+    uncached.start()
+    try:
+        while limiter.stats()["in_flight"] == 0:  # the uncached call has acquired its slot
+            time.sleep(0.01)
+        for _ in range(3):
+            _model(limiter, cache).invoke("cached question")
+        assert limiter.stats()["in_flight"] == 1
+        assert limiter._tokens.level >= level_before  # refilled only; nothing debited for the hits
+    finally:
+        release.set()
+        uncached.join()
+
+    assert limiter.stats()["in_flight"] == 0
+    # Both uncached calls were debited (less what refilled in the meantime)
+    assert limiter._tokens.level < limiter._tokens.capacity - TOKENS_PER_CALL
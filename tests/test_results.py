@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.tools.results import release_table, shared_result, use_table
+
+calls: list[tuple] = []
+
+
+@shared_result
+def lookup(product_id: str, window: int = 7) -> str:
+    calls.append((product_id, window))
+    time.sleep(0.05)
+    return f"{product_id}/{window}"
+
+
+@shared_result
+def broken(product_id: str) -> str:
+    calls.append((product_id,))
+    raise RuntimeError("backend down")
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    calls.clear()
+    yield
+    release_table("dedup-run")
+
+
+def test_identical_calls_in_a_run_share_one_result():
+    with use_table("dedup-run"):
+        first = lookup("P001")
+        assert lookup("P001", window=7) == first  # defaults are bound, so this is the same call
+        assert lookup(product_id="P001") == first
+        lookup("P002")
+
+    assert calls == [("P001", 7), ("P002", 7)]
+    stats = release_table("dedup-run")
+    assert (stats["calls"], stats["executed"], stats["deduplicated"]) == (4, 2, 2)
+
+
+def test_concurrent_callers_wait_for_the_call_in_flight():
+    def agent(_):
+        with use_table("dedup-run"):
+            return lookup("P001")
+
+    with ThreadPoolExecutor(4) as pool:
+        assert set(pool.map(agent, range(4))) == {"P001/7"}
+
+    assert len(calls) == 1
+    assert release_table("dedup-run")["waited"] >= 1
+
+
+def test_calls_outside_a_run_and_across_runs_are_not_shared():
+    lookup("P001")
+    lookup("P001")
+    with use_table("dedup-run"):
+        lookup("P001")
+    with use_table("other-run"):
+        lookup("P001")
+    release_table("other-run")
+
+    assert len(calls) == 4
+
+
+def test_failed_calls_are_retried_not_shared():
+    with use_table("dedup-run"):
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                broken("P001")
+
+    assert len(calls) == 2
+
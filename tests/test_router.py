@@ -0,0 +1,45 @@
+import pytest
+from src.graph.router import AGENT_NAMES, ROUTER_EXAMPLES, FastRouter, RuleClassifier, TfidfRouter
+
+
+@pytest.mark.parametrize("query, agents", [
+    ("What products are at risk of stockout?", ["inventory_monitor"]),
+    ("Forecast demand for P001", ["demand_analyst"]),
+    ("How reliable are our suppliers on lead time?", ["supplier_analyst"]),
+    ("Give me a full supply chain report", AGENT_NAMES),
+])
+def test_unambiguous_queries_are_routed_by_the_rules(query, agents):
+    decision = RuleClassifier().classify(query)
+
+    assert decision.agents == agents
+    assert decision.confidence == 1.0
+
+
+def test_weak_or_missing_signals_are_not_confident():
+    rules = RuleClassifier()
+
+    assert rules.classify("What is the weather like?").agents == []
+    weak = rules.classify("sales risk")
+    assert weak.agents == ["demand_analyst", "inventory_monitor"]
+    assert weak.confidence < 0.75
+
+
+def test_tfidf_router_covers_queries_the_rules_miss(tmp_path):
+    path = str(tmp_path / "router.json")
+    TfidfRouter.train(ROUTER_EXAMPLES).save(path)
+    router = FastRouter(threshold=0.75, model_path=path)
+
+    decision = router.classify("which items should be reordered soon")
+
+    assert RuleClassifier().classify("which items should be reordered soon").agents == []
+    assert decision.source == "tfidf"
+    assert decision.agents == ["inventory_monitor"]
+
+
+def test_fast_router_falls_back_to_the_llm_below_the_threshold():
+    router = FastRouter(threshold=0.75)
+
+    assert router.route("Forecast demand for P001") == ["demand_analyst"]
+    assert router.route("sales risk") is None
+    assert router.route("Tell me something") is None
+    assert router.stats.as_dict() == {"fast_hits": 1, "llm_fallbacks": 2, "hit_rate": 0.333}
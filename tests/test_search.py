@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from src.cache import SQLiteStore
+from src.tools import search
+from src.tools.search import HTTPBackend, SearchBackend, run_searches, set_search_backend, web_search
+
+
+class StubBackend(SearchBackend):
+    """Answers instantly, except for queries listed in ``slow`` (which sleep) and ``broken`` (which raise)."""
+
+    name = "stub"
+
+    def __init__(self, slow: dict[str, float] | None = None, broken: tuple[str, ...] = ()):
+        self.slow = slow or {}
+        self.broken = broken
+        self.calls: list[tuple[str, float]] = []
+
+    def search(self, query: str, max_results: int, timeout: float) -> list[dict]:
+        self.calls.append((query, timeout))
+        if query in self.broken:
+            raise ConnectionError("backend unreachable")
+        time.sleep(min(self.slow.get(query, 0.0), timeout))
+        return [{"title": f"About {query}", "snippet": "...", "url": f"https://example.com/{len(self.calls)}"}]
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_CACHE", True)
+    monkeypatch.setattr(search, "_store", SQLiteStore(str(tmp_path / "search.sqlite"), "search_results", ttl_seconds=60))
+    stub = StubBackend()
+    previous = set_search_backend(stub)
+    yield stub
+    set_search_backend(previous)
+
+
+def test_repeated_query_is_served_from_the_cache(backend):
+    first = run_searches(["SupplierA delivery news"])
+    second = run_searches(["SupplierA delivery news"])
+
+    assert second == first
+    assert len(backend.calls) == 1
+
+
+def test_cached_results_expire_after_the_ttl(backend, monkeypatch, tmp_path):
+    monkeypatch.setattr(search, "_store", SQLiteStore(str(tmp_path / "ttl.sqlite"), "search_results", ttl_seconds=0.05))
+    run_searches(["SupplierA delivery news"])
+    time.sleep(0.1)
+    run_searches(["SupplierA delivery news"])
+
+    assert len(backend.calls) == 2
+
+
+def test_queries_that_normalize_alike_are_searched_once(backend):
+    found = run_searches(["SupplierA  news", "supplierA news ", "SupplierB news"])
+
+    assert list(found) == ["SupplierA  news", "SupplierB news"]
+    assert [query for query, _ in backend.calls] == ["SupplierA  news", "SupplierB news"]
+
+
+def test_deadline_returns_partial_results_and_frees_the_next_call(backend, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_MAX_PARALLEL", 1)
+    backend.slow = {"slow": 2.0}
+
+    started = time.monotonic()
+    found = run_searches(["slow", "queued"], timeout=0.3)
+
+    assert time.monotonic() - started < 1.0
+    assert found["slow"].startswith("Search failed: timed out")
+    assert found["queued"].startswith("Search failed: timed out")
+    assert backend.calls[0][1] <= 0.3  # the backend gets the remaining deadline, not more
+    # The abandoned search still holds its thread; a new call must not queue behind it
+    assert isinstance(run_searches(["fast"], timeout=0.5)["fast"], list)
+
+
+def test_failed_query_is_reported_without_losing_the_others(backend):
+    backend.broken = ("broken",)
+
+    found = run_searches(["broken", "working"])
+
+    assert found["broken"] == "Search failed: backend unreachable"
+    assert found["working"][0]["title"] == "About working"
+
+
+def test_search_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SearchBackend()
+
+
+@pytest.fixture
+def stub_server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)["q"][0]
+            body = json.dumps({"results": [
+                {"title": f"{query} result {i}", "content": "snippet", "url": f"https://example.com/{i}"} for i in range(8)
+            ]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/search"
+    server.shutdown()
+
+
+def test_http_backend_reads_a_searxng_style_endpoint(stub_server, backend):
+    set_search_backend(HTTPBackend(stub_server))
+
+    text = web_search.invoke({"queries": ["SupplierA news", "SupplierB news"]})
+
+    assert "## SupplierA news" in text and "## SupplierB news" in text
+    assert "Title: SupplierB news result 4" in text
+    assert "SupplierA news result 5" not in text  # MAX_RESULTS per query
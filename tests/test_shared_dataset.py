@@ -0,0 +1,63 @@
+import os
+import pandas as pd
+import pytest
+from src.tools.dataset import DatasetStore
+from src.tools.shared_dataset import SharedDataset, SharedMemoryBackend
+from src.tools.storage import open_backend
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+@pytest.fixture
+def shared(tmp_path):
+    path = write_dataset(generate_dataset(skus=8, suppliers=2, days=20, seed=4), str(tmp_path / "sales.csv"))
+    dataset = SharedDataset(path, directory=str(tmp_path))
+    yield dataset
+    dataset.close()
+
+
+def test_worker_reads_the_published_segment(shared):
+    assert shared.publish()
+    assert not shared.publish()  # unchanged source: nothing new to write
+
+    backend = SharedMemoryBackend(shared.backend.path, shared.pointer)
+    source = DatasetStore(open_backend(shared.backend.path), sidecar=False)
+    worker = DatasetStore(backend, sidecar=False)
+
+    assert backend.fingerprint() == shared.backend.fingerprint()
+    for filters in ({}, {"product_id": "P003"}, {"supplier": "SupplierA", "start": "2024-01-10"}):
+        pd.testing.assert_frame_equal(worker.query(**filters).reset_index(drop=True),
+                                      source.query(**filters).reset_index(drop=True), check_dtype=False)
+
+
+def _rewrite(path: str, skus: int) -> None:
+    write_dataset(generate_dataset(skus=skus, suppliers=2, days=20, seed=4), path)
+    mtime = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_republished_segment_replaces_the_old_one(shared):
+    shared.publish()
+    backend = SharedMemoryBackend(shared.backend.path, shared.pointer)
+    first = shared.segment
+    assert len(backend.scan(columns=["product_id"])) == 160
+
+    _rewrite(shared.backend.path, skus=9)
+    assert shared.publish()
+
+    assert len(backend.scan(columns=["product_id"])) == 180
+    assert backend.fingerprint() == shared.backend.fingerprint()
+    assert os.path.exists(first)  # kept for a worker that read the old pointer
+
+    _rewrite(shared.backend.path, skus=10)
+    shared.publish()
+
+    assert not os.path.exists(first)
+
+
+def test_close_removes_the_pointer_and_segments(shared):
+    shared.publish()
+    files = [shared.pointer, shared.segment]
+
+    shared.close()
+
+    assert not any(os.path.exists(path) for path in files)
@@ -0,0 +1,32 @@
+import threading
+import time
+from src.graph import speculation
+from src.tools import results
+from src.tools.results import use_table
+
+
+def test_finish_waits_for_a_running_prefetch_before_releasing_the_table():
+    started = threading.Event()
+
+    def late_prefetch():
+        started.set()
+        time.sleep(0.2)
+        with use_table("late-prefetch"):  # opens the run's table after finish() was called
+            pass
+
+    future = speculation._pool().submit(late_prefetch)
+    started.wait()
+    speculation._pending["late-prefetch"] = [({"inventory_monitor"}, future)]
+
+    speculation.finish("late-prefetch")
+
+    assert future.done()
+    assert "late-prefetch" not in results._tables
+    assert "late-prefetch" not in speculation._pending
+
+
+def test_finish_is_safe_to_repeat():
+    results.get_table("finished-run")
+
+    assert "calls" in speculation.finish("finished-run")
+    assert speculation.finish("finished-run") == {}
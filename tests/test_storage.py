@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+import pytest
+from src.tools import storage
+from src.tools.aggregates import build_aggregates
+from src.tools.dataset import DatasetStore
+from src.tools.storage import COLUMNS, StorageBackend, convert_csv_to_columnar, open_backend
+from src.tools.synthetic import generate_dataset, write_dataset
+
+
+@pytest.fixture(scope="module")
+def datasets(tmp_path_factory):
+    root = tmp_path_factory.mktemp("datasets")
+    csv = write_dataset(generate_dataset(skus=12, suppliers=3, days=60, seed=1), str(root / "sales.csv"))
+    return {
+        "csv": csv,
+        "parquet": convert_csv_to_columnar(csv, str(root / "parquet"), format="parquet"),
+        "ipc": convert_csv_to_columnar(csv, str(root / "ipc"), format="ipc", partition_by=("supplier", "product_id")),
+    }
+
+
+FILTERS = [
+    {},
+    {"product_id": "P003"},
+    {"supplier": "SupplierB"},
+    {"start": "2024-01-20", "end": "2024-02-10"},
+    {"product_id": "P007", "start": "2024-02-01"},
+    {"product_id": "P404"},
+]
+
+
+@pytest.mark.parametrize("format", ["parquet", "ipc"])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_columnar_scans_match_the_csv(datasets, format, filters):
+    columns = ["product_id", "date", "supplier", "stock_level"]
+    expected = DatasetStore(open_backend(datasets["csv"]), sidecar=False).query(columns=columns, **filters)
+    actual = DatasetStore(open_backend(datasets[format]), sidecar=False).query(columns=columns, **filters)
+
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_columnar_query_walks_the_dataset_once(datasets, monkeypatch):
+    store = DatasetStore(open_backend(datasets["parquet"]), sidecar=False)
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(storage.os, "walk", lambda *args, **kwargs: walks.append(args) or walk(*args, **kwargs))
+
+    store.query(product_id="P001")
+    store.query(product_id="P002")
+
+    assert len(walks) == 2
+
+
+def test_latest_inventory_is_each_products_last_row(datasets):
+    df = DatasetStore(open_backend(datasets["csv"]), sidecar=False).query(columns=COLUMNS)
+
+    latest = build_aggregates(df).latest
+
+    expected = df.sort_values("date").groupby("product_id").last().reset_index()
+    pd.testing.assert_frame_equal(latest[expected.columns.intersection(latest.columns)],
+                                  expected[expected.columns.intersection(latest.columns)])
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend("data.csv")